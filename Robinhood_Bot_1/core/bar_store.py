@@ -0,0 +1,234 @@
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Column names double as .npy file names
+COLUMN_NAME = re.compile(r'[A-Za-z0-9_][A-Za-z0-9_ .-]*')
+
+class BarStore:
+    """Columnar on-disk store of price bars, partitioned by interval, symbol and year.
+
+    Each partition directory holds a CURRENT pointer to a version directory
+    of one .npy file per column plus an int64 nanosecond index. Loads
+    memory-map the files, read only the years overlapping the requested
+    date range and slice them by binary search on the index, so a range
+    within one year is returned without copying. Writes build a new
+    version beside the old one and swap CURRENT with an atomic rename;
+    readers holding the old version's maps are unaffected.
+    """
+
+    def __init__(self, root: str = 'data/store'):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def symbols(self, interval: str = '1d') -> List[str]:
+        directory = self.root / interval
+        return sorted(p.name for p in directory.iterdir() if p.is_dir()) if directory.exists() else []
+
+    def years(self, symbol: str, interval: str = '1d') -> List[int]:
+        directory = self._symbol_dir(symbol, interval)
+        if not directory.exists():
+            return []
+        return sorted(int(p.name) for p in directory.iterdir()
+                      if p.name.isdigit() and (p / 'CURRENT').exists())
+
+    def last_timestamp(self, symbol: str, interval: str = '1d') -> Optional[pd.Timestamp]:
+        years = self.years(symbol, interval)
+        if not years:
+            return None
+        index, _, meta = self._read_partition(symbol, interval, years[-1], columns=[])
+        return _timestamps(index[-1:], meta)[0] if len(index) else None
+
+    def load(self, symbol: str, interval: str = '1d', start=None, end=None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Bars with start <= timestamp <= end, or None when the symbol is not stored.
+
+        Only partitions overlapping the range are opened. The result is
+        backed by read-only memory maps when it falls within one year.
+        """
+        stored = self.years(symbol, interval)
+        if not stored:
+            return None
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+
+        parts = []
+        for year in stored:
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            index, values, meta = self._read_partition(symbol, interval, year, columns)
+            lo = 0 if start is None else np.searchsorted(index, _nanoseconds(start, meta), 'left')
+            hi = len(index) if end is None else np.searchsorted(index, _nanoseconds(end, meta), 'right')
+            if hi > lo:
+                parts.append((index[lo:hi], {name: column[lo:hi] for name, column in values.items()}))
+        if not parts:
+            index, values, meta = self._read_partition(symbol, interval, stored[-1], columns)
+            parts.append((index[:0], {name: column[:0] for name, column in values.items()}))
+
+        if len(parts) == 1:
+            index, values = parts[0]
+        else:
+            index = np.concatenate([part[0] for part in parts])
+            values = {name: np.concatenate([part[1][name] for part in parts]) for name in values}
+        return pd.DataFrame(values, index=_timestamps(index, meta), copy=False)
+
+    def write(self, symbol: str, data: pd.DataFrame, interval: str = '1d'):
+        """Replace everything stored for symbol with data"""
+        data = _prepare(data)
+        with self._lock:
+            keep = set(data.index.year)
+            for year in self.years(symbol, interval):
+                if year not in keep:
+                    shutil.rmtree(self._partition_dir(symbol, interval, year))
+            for year, frame in data.groupby(data.index.year):
+                self._write_partition(symbol, interval, int(year), frame)
+
+    def append(self, symbol: str, bars: pd.DataFrame, interval: str = '1d') -> int:
+        """Merge new bars into their year partitions, later bars replacing equal timestamps.
+
+        Only the partitions the bars fall in are rewritten, each swapped in
+        atomically. Returns the number of rows added.
+        """
+        bars = _prepare(bars)
+        added = 0
+        with self._lock:
+            stored = set(self.years(symbol, interval))
+            for year, frame in bars.groupby(bars.index.year):
+                year = int(year)
+                if year in stored:
+                    index, values, meta = self._read_partition(symbol, interval, year)
+                    existing = pd.DataFrame(values, index=_timestamps(index, meta))
+                    frame = pd.concat([existing, frame])
+                    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+                    added += len(frame) - len(existing)
+                else:
+                    added += len(frame)
+                self._write_partition(symbol, interval, year, frame)
+        return added
+
+    def _write_partition(self, symbol: str, interval: str, year: int, frame: pd.DataFrame):
+        partition = self._partition_dir(symbol, interval, year)
+        partition.mkdir(parents=True, exist_ok=True)
+        version = f'v{uuid.uuid4().hex}'
+        target = partition / version
+        target.mkdir()
+
+        index = frame.index
+        meta = {'columns': list(frame.columns), 'dtypes': {},
+                'index_name': index.name, 'unit': index.unit,
+                'tz': None if index.tz is None else str(index.tz)}
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        np.save(target / 'index.npy', index.as_unit('ns').asi8)
+        for name in frame.columns:
+            values = frame[name].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            meta['dtypes'][name] = values.dtype.str
+            np.save(target / f'{name}.npy', values)
+        (target / 'meta.json').write_text(json.dumps(meta))
+
+        pointer = partition / f'CURRENT.{version}'
+        pointer.write_text(version)
+        os.replace(pointer, partition / 'CURRENT')
+        for old in partition.iterdir():
+            if old.is_dir() and old.name != version:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _read_partition(self, symbol: str, interval: str, year: int,
+                        columns: Optional[List[str]] = None):
+        """Memory-mapped (index, {column: values}, meta) of a partition's current version"""
+        # A concurrent write may remove the version between reading CURRENT and opening it
+        for attempt in range(3):
+            version = self._version_dir(symbol, interval, year)
+            try:
+                meta = json.loads((version / 'meta.json').read_text())
+                values = {name: np.load(version / f'{name}.npy', mmap_mode='r')
+                          for name in (meta['columns'] if columns is None else columns)}
+                return np.load(version / 'index.npy', mmap_mode='r'), values, meta
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+
+    def _version_dir(self, symbol: str, interval: str, year: int) -> Path:
+        partition = self._partition_dir(symbol, interval, year)
+        return partition / (partition / 'CURRENT').read_text().strip()
+
+    def _partition_dir(self, symbol: str, interval: str, year: int) -> Path:
+        return self._symbol_dir(symbol, interval) / str(year)
+
+    def _symbol_dir(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / symbol.upper()
+
+def migrate_csv(store: BarStore, csv_dir: str = 'data/historical', interval: str = '1d',
+                remove: bool = False) -> Dict[str, int]:
+    """One-shot import of per-symbol CSVs into the store, returning rows per symbol.
+
+    The timestamp comes from a Date/Datetime column or the first column.
+    """
+    migrated = {}
+    for path in sorted(Path(csv_dir).glob('*.csv')):
+        data = pd.read_csv(path)
+        column = next((name for name in ('Date', 'Datetime', 'date', 'datetime')
+                       if name in data.columns), data.columns[0])
+        data = data.set_index(pd.DatetimeIndex(pd.to_datetime(data.pop(column)), name='Date'))
+        store.write(path.stem, data, interval)
+        migrated[path.stem.upper()] = len(data)
+        if remove:
+            path.unlink()
+    return migrated
+
+def period_start(last: pd.Timestamp, period: str) -> Optional[pd.Timestamp]:
+    """Start of a yfinance period ('5d', '1mo', '1y', 'ytd', 'max') ending at last"""
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return last.normalize().replace(month=1, day=1)
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if match is None:
+        raise ValueError(f"Unknown history period: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    offset = {'d': pd.DateOffset(days=count), 'wk': pd.DateOffset(weeks=count),
+              'mo': pd.DateOffset(months=count), 'y': pd.DateOffset(years=count)}[unit]
+    return last - offset
+
+def flatten_columns(data: pd.DataFrame) -> pd.DataFrame:
+    """Drop the ticker level of yfinance's (Price, Ticker) columns for one symbol"""
+    if not isinstance(data.columns, pd.MultiIndex):
+        return data
+    single = [level for level in range(data.columns.nlevels)
+              if data.columns.get_level_values(level).nunique() == 1]
+    if len(single) != data.columns.nlevels - 1:
+        raise ValueError(f"Cannot flatten columns {list(data.columns)} to one symbol's bars")
+    return data.droplevel(single, axis=1)
+
+def _prepare(data: pd.DataFrame) -> pd.DataFrame:
+    if not isinstance(data.index, pd.DatetimeIndex):
+        raise ValueError("Bars need a DatetimeIndex")
+    data = flatten_columns(data)
+    for name in data.columns:
+        # Column names become file names
+        if not isinstance(name, str) or not COLUMN_NAME.fullmatch(name) or name in ('index', 'meta'):
+            raise ValueError(f"Invalid column name for storage: {name!r}")
+    data = data[~data.index.duplicated(keep='last')]
+    return data if data.index.is_monotonic_increasing else data.sort_index()
+
+def _nanoseconds(timestamp: pd.Timestamp, meta: Dict) -> int:
+    if meta['tz'] is not None:
+        timestamp = (timestamp.tz_localize(meta['tz']) if timestamp.tz is None else timestamp)
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    elif timestamp.tz is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp.as_unit('ns').value
+
+def _timestamps(index: np.ndarray, meta: Dict) -> pd.DatetimeIndex:
+    timestamps = pd.DatetimeIndex(np.asarray(index).view('datetime64[ns]'),
+                                  name=meta['index_name']).as_unit(meta['unit'])
+    return timestamps.tz_localize('UTC').tz_convert(meta['tz']) if meta['tz'] else timestamps
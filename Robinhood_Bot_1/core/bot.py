@@ -1,12 +1,19 @@
 import logging
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import yaml
+import pandas as pd
+from pathlib import Path
 from .execution import ExecutionEngine
 from .risk_management import RiskManager
 from .data_handler import DataHandler
-from .strategies import IronCondor, IronButterfly, TrendFollowing
+from .vol_surface import VolSurface
+from .pricing_cache import pricing_cache
+from .pricing_context import PricingContext
+from .pricing_dispatcher import pricing_dispatcher
+from .strategies import create_strategies
+from .strategies.registry import MarketSnapshot, build_fetch_plan
 from .utils.helpers import calculate_portfolio_value
 from .utils.logger import setup_logger
 
@@ -17,8 +24,12 @@ class TradingBot:
         self.config = self._load_config(config_path)
         self.execution_engine = ExecutionEngine(self.config)
         self.risk_manager = RiskManager(self.config)
-        self.data_handler = DataHandler(offline_mode=self.config.get('offline_mode', False))
+        self.data_handler = DataHandler(offline_mode=self.config.get('offline_mode', False),
+                                        cache=self.config.get('data_cache'))
+        pricing_cache.configure(**self.config.get('pricing', {}).get('cache', {}))
+        pricing_dispatcher.configure(self.config.get('pricing', {}))
         self.strategies = self._initialize_strategies()
+        self.vol_surfaces = {}
         self.portfolio = self._initialize_portfolio()
         self.emergency_stop = False
 
@@ -27,11 +38,7 @@ class TradingBot:
             return yaml.safe_load(f)
 
     def _initialize_strategies(self) -> Dict:
-        return {
-            'iron_condor': IronCondor(self.config['strategies']['iron_condor']),
-            'iron_butterfly': IronButterfly(self.config['strategies']['iron_butterfly']),
-            'trend_following': TrendFollowing(self.config['strategies']['trend_following'])
-        }
+        return create_strategies(self.config['strategies'])
 
     def _initialize_portfolio(self) -> Dict:
         return {
@@ -56,8 +63,12 @@ class TradingBot:
                     time.sleep(60)
                     continue
                 
+                pricing_dispatcher.begin_cycle()
                 opportunities = self._find_opportunities(market_data)
                 self._process_opportunities(opportunities)
+                logger.debug(f"Pricing cache: {pricing_cache.info()}")
+                logger.debug(f"Data cache: {self.data_handler.cache.info()}")
+                logger.debug(f"Pricing engines: {pricing_dispatcher.stats()}")
                 
                 cycle_time = time.time() - start_time
                 sleep_time = max(0, self.config['polling_interval'] - cycle_time)
@@ -71,41 +82,91 @@ class TradingBot:
             self._shutdown()
 
     def _find_opportunities(self, market_data: Dict) -> List[Dict]:
-        """Find trading opportunities across all strategies"""
-        opportunities = []
+        """Find trading opportunities across all strategies.
+
+        The data every enabled strategy declares it needs is merged into one
+        fetch plan and fetched in bulk into a read-only snapshot. Strategies
+        then prepare against the snapshot, registering their option legs with
+        a shared context that prices them all in one cycle-wide batch before
+        the opportunities are completed.
+        """
         symbols = self.config['watchlist']
+        strategies = [strategy for strategy in self.strategies.values() if strategy.enabled]
+        settings = self.config.get('pricing', {}).get('vol_surface', {})
+        extra = [{'kind': 'quote'}, {'kind': 'chain', 'max_dte': settings.get('max_dte', 60)}] \
+            if settings.get('enabled', False) else []
+        
+        try:
+            plan = build_fetch_plan(strategies, extra)
+            data = self.data_handler.fetch(plan, symbols, market_data)
+        except Exception as e:
+            logger.error(f"Error fetching market data: {str(e)}")
+            return []
+        logger.debug(f"Fetch plan {plan}: {self.data_handler.fetch_stats}")
         
-        for symbol in symbols:
+        surfaces = {}
+        for symbol, chain in data['chains'].items():
+            price = data['quotes'].get(symbol)
+            if not price:
+                continue
             try:
-                # Get current market data for symbol
-                price = market_data['prices'].get(symbol)
-                iv = market_data['iv'].get(symbol)
-                
-                if not price or not iv:
-                    continue
-                    
-                # Generate opportunities from all strategies
-                if self.strategies['iron_condor'].enabled:
-                    opportunities.append(
-                        self.strategies['iron_condor'].analyze(symbol, price, iv)
-                    )
-                    
-                if self.strategies['iron_butterfly'].enabled:
-                    opportunities.append(
-                        self.strategies['iron_butterfly'].analyze(symbol, price, iv)
-                    )
-                    
-                if self.strategies['trend_following'].enabled:
-                    hist_data = self.data_handler.get_historical(symbol)
-                    opportunities.append(
-                        self.strategies['trend_following'].analyze(hist_data)
-                    )
-                    
+                surfaces[symbol] = self._update_vol_surface(symbol, price, chain)
             except Exception as e:
                 logger.error(f"Error processing {symbol}: {str(e)}")
+        snapshot = MarketSnapshot(**data, surfaces=surfaces)
+        
+        context = PricingContext(pricing_dispatcher)
+        prepared = []
+        for strategy in strategies:
+            try:
+                prepared.append((strategy, strategy.prepare(snapshot, context)))
+            except Exception as e:
+                logger.error(f"Error preparing {strategy.name}: {str(e)}")
+            self._log_strategy_errors(strategy)
+            
+        try:
+            context.resolve()
+        except Exception as e:
+            # Plans whose legs went unpriced fail individually in complete()
+            logger.error(f"Error pricing option legs: {str(e)}")
+        logger.debug(f"Leg pricing: {context.stats['requested']} requested, "
+                     f"{context.stats['priced']} priced in {context.stats['batches']} batches")
+        
+        opportunities = []
+        for strategy, items in prepared:
+            try:
+                opportunities.extend(strategy.complete(items, context))
+            except Exception as e:
+                logger.error(f"Error completing {strategy.name}: {str(e)}")
+            self._log_strategy_errors(strategy)
                 
         return [opp for opp in opportunities if opp is not None]
 
+    def _log_strategy_errors(self, strategy):
+        for symbol, error in getattr(strategy, 'errors', []):
+            logger.error(f"Error processing {symbol}: {error}")
+
+    def _update_vol_surface(self, symbol: str, price: float,
+                            chain: Optional[pd.DataFrame]) -> Optional[VolSurface]:
+        """Refresh the symbol's IV surface with only the quotes that changed"""
+        settings = self.config.get('pricing', {}).get('vol_surface', {})
+        if not settings.get('enabled', False):
+            return None
+            
+        if chain is None:
+            return self.vol_surfaces.get(symbol)
+        # The shared chain reaches the longest strategy expiry
+        chain = chain[chain['T'] <= settings.get('max_dte', 60) / 365.25]
+            
+        if symbol not in self.vol_surfaces:
+            self.vol_surfaces[symbol] = VolSurface(
+                symbol, smoothing=settings.get('smoothing', 'spline')
+            )
+        surface = self.vol_surfaces[symbol]
+        solved = surface.update_from_chain(chain, price)
+        logger.debug(f"{symbol} vol surface: re-solved {solved} of {len(chain)} quotes")
+        return surface if surface.expirations else None
+    
     def _process_opportunities(self, opportunities: List[Dict]):
         """Validate and execute trading opportunities"""
         for opportunity in opportunities:
@@ -134,4 +195,7 @@ class TradingBot:
     def _shutdown(self):
         """Clean shutdown procedure"""
         logger.info("Shutting down trading bot")
+        self.data_handler.save_indicators()
+        self.data_handler.cache.close()
+        pricing_dispatcher.close()
         self.execution_engine.close()
\ No newline at end of file
@@ -0,0 +1,193 @@
+import re
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Seconds per bar for each yfinance interval unit
+INTERVAL_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'wk': 7 * 86400, 'mo': 30 * 86400}
+
+def interval_ttl(interval: str) -> float:
+    """Length of one bar of a yfinance interval ('5m', '1h', '1d', '1wk', ...) in seconds"""
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo)', interval)
+    if match is None:
+        raise ValueError(f"Unknown bar interval: {interval}")
+    return int(match.group(1)) * INTERVAL_SECONDS[match.group(2)]
+
+class DataCache:
+    """Thread-safe TTL/LRU cache for market data under a memory budget.
+
+    Keys are tuples whose first element names the kind of data: quotes
+    ('quote', symbol) and chains ('chain', symbol, max_dte) expire after
+    quote_ttl and chain_ttl seconds, history ('history', symbol, interval,
+    period) after one bar of its interval. An expired entry is still served
+    for stale_factor more TTLs while a background worker reloads it; past
+    that it is reloaded in the caller. The least recently used entries are
+    evicted once their measured size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2, quote_ttl: float = 5.0,
+                 chain_ttl: float = 60.0, default_ttl: float = 60.0,
+                 stale_factor: float = 1.0, workers: int = 2):
+        self.max_bytes = max_bytes
+        self.ttls = {'quote': quote_ttl, 'chain': chain_ttl}
+        self.default_ttl = default_ttl
+        self.stale_factor = stale_factor
+        self.workers = workers
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._executor = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0,
+                      'expirations': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def ttl(self, key: Hashable) -> float:
+        """Lifetime of a key, from its kind (and bar interval for history)"""
+        kind = key[0] if isinstance(key, tuple) and key else None
+        if kind == 'history':
+            return interval_ttl(key[2])
+        return self.ttls.get(kind, self.default_ttl)
+
+    def get(self, key: Hashable, loader: Optional[Callable[[], Any]] = None,
+            ttl: Optional[float] = None) -> Any:
+        """Cached value for key, loading it on a miss when a loader is given.
+
+        A loader returning None is not cached.
+        """
+        value = self.lookup(key, loader, ttl)
+        if value is not None or loader is None:
+            return value
+        value = loader()
+        if value is not None:
+            self.put(key, value, ttl)
+        return value
+
+    def lookup(self, key: Hashable, refresh: Optional[Callable[[], Any]] = None,
+               ttl: Optional[float] = None, fresh_only: bool = False) -> Any:
+        """Fresh or stale value for key without loading it (None on a miss).
+
+        Serving a stale value schedules refresh in the background; with
+        fresh_only a stale entry counts as a miss for the caller to reload.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                self._drop(key)
+                self.stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[2]
+            if fresh_only:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['stale_hits'] += 1
+            schedule = refresh is not None and key not in self._refreshing
+            if schedule:
+                self._refreshing.add(key)
+
+        if schedule:
+            self._submit(key, refresh, ttl)
+        return entry[2]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value for ttl seconds (the key's default when None)"""
+        ttl = self.ttl(key) if ttl is None else ttl
+        size = _nbytes(value)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (now + ttl, now + ttl*(1 + self.stale_factor), value, size)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self):
+        """Stop the background refresh workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def info(self) -> Dict:
+        """Current usage, hit rate and eviction counters"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['stale_hits'] + self.stats['misses']
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'refreshing': len(self._refreshing),
+                'hit_rate': (self.stats['hits'] + self.stats['stale_hits']) / lookups
+                if lookups else 0.0,
+                **self.stats
+            }
+
+    def _submit(self, key: Hashable, refresh: Callable[[], Any], ttl: Optional[float]):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='data-cache')
+        try:
+            self._executor.submit(self._refresh, key, refresh, ttl)
+        except RuntimeError:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh(self, key: Hashable, refresh: Callable[[], Any], ttl: Optional[float]):
+        try:
+            value = refresh()
+            if value is not None:
+                self.put(key, value, ttl)
+            with self._lock:
+                self.stats['refreshes' if value is not None else 'refresh_errors'] += 1
+        except Exception:
+            # The stale value stays until it expires outright
+            with self._lock:
+                self.stats['refresh_errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _drop(self, key: Hashable):
+        size = self._entries.pop(key)[3]
+        self._bytes -= size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry[3]
+            self.stats['evictions'] += 1
+
+def _nbytes(value) -> int:
+    """Memory held by a cached value, measured deeply for pandas objects"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(k) + _nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value)
+    return sys.getsizeof(value)
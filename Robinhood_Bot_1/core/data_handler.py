@@ -1,14 +1,28 @@
 import pandas as pd
 import robin_stocks as rs
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from .bar_store import BarStore, flatten_columns, period_start
+from .data_cache import DataCache
+from .implied_vol import atm_implied_vol
+from .indicators import IndicatorState
+from .market_calendar import is_trading_session
+
+# Trading days each yfinance period covers, smallest first
+HISTORY_PERIODS = (('1mo', 21), ('3mo', 63), ('6mo', 126), ('1y', 252), ('2y', 504), ('5y', 1260))
 
 class DataHandler:
-    def __init__(self, offline_mode: bool = False):
+    def __init__(self, offline_mode: bool = False, indicator_dir: str = 'data/indicators',
+                 cache: Optional[Dict] = None, store_dir: str = 'data/store'):
         self.offline_mode = offline_mode
-        self.cache = {}
+        self.cache = DataCache(**(cache or {}))
+        self.store = BarStore(store_dir)
+        self.indicator_dir = indicator_dir
+        self.indicators = {}
+        self.fetch_stats = {}
         
     def get_market_state(self) -> Dict:
         """Get current market conditions"""
@@ -29,52 +43,316 @@ class DataHandler:
             print(f"Error fetching market state: {str(e)}")
             return {}
     
-    def get_historical(self, symbol: str, interval: str = '1d', 
-                      period: str = '1y') -> Optional[pd.DataFrame]:
-        """Get historical price data"""
-        cache_key = f"{symbol}_{interval}_{period}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+    def fetch(self, plan: Dict, symbols: List[str], market_data: Optional[Dict] = None,
+              workers: int = 8) -> Dict:
+        """Execute a strategy fetch plan for every symbol in bulk.
+
+        Quotes missing from market_data come from one batched quote request,
+        history from one multi-ticker download per interval, and chains are
+        fetched concurrently once per symbol. IV missing from market_data is
+        read off each symbol's chain at the quote. Returns the MarketSnapshot fields.
+        """
+        market_data = market_data or {}
+        data = {'symbols': list(symbols), 'quotes': {}, 'iv': {}, 'chains': {}, 'history': {},
+                'indicators': {}}
+        self.fetch_stats = {'quote_requests': 0, 'history_requests': 0, 'chain_requests': 0}
+        
+        for interval, bars in plan['history'].items():
+            period = next((name for name, days in HISTORY_PERIODS if bars <= days), 'max')
+            for symbol, frame in self.get_historical_bulk(symbols, interval, period).items():
+                data['history'][(symbol, interval)] = frame
+                
+        # IV is solved from the chain at the quote, so it needs both
+        if plan['quote'] or plan['iv']:
+            known = {symbol: price for symbol, price in market_data.get('prices', {}).items()
+                     if symbol in symbols and price}
+            data['quotes'] = {**self.get_quotes([s for s in symbols if s not in known]), **known}
+        max_dte = plan['chain'] or (60 if plan['iv'] else None)
+            
+        if max_dte is not None:
+            with ThreadPoolExecutor(max_workers=max(min(workers, len(symbols)), 1)) as pool:
+                chains = list(pool.map(lambda s: self.get_option_chain(s, max_dte), symbols))
+            data['chains'] = {symbol: chain for symbol, chain in zip(symbols, chains)
+                              if chain is not None}
+            
+        if plan['iv']:
+            data['iv'] = {symbol: iv for symbol, iv in market_data.get('iv', {}).items()
+                          if symbol in symbols and iv}
+            for symbol in symbols:
+                price, chain = data['quotes'].get(symbol), data['chains'].get(symbol)
+                if symbol in data['iv'] or not price or chain is None:
+                    continue
+                try:
+                    iv = atm_implied_vol(chain, price)
+                except Exception as e:
+                    print(f"Error solving ATM IV for {symbol}: {str(e)}")
+                    continue
+                if iv:
+                    data['iv'][symbol] = iv
+            
+        for interval in plan['indicators']:
+            for symbol in symbols:
+                price = data['quotes'].get(symbol)
+                state = self.update_bar(symbol, price, interval=interval) if price \
+                    else self.get_indicators(symbol, interval)
+                if state is not None:
+                    data['indicators'][(symbol, interval)] = state
+        return data
+    
+    def get_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """Latest prices for many symbols, requesting the uncached ones in one call"""
+        quotes = {}
+        for symbol in symbols:
+            # Expired quotes are never served stale; they reload in the batch below
+            price = self.cache.lookup(('quote', symbol), fresh_only=True)
+            if price is not None:
+                quotes[symbol] = price
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if not missing:
+            return quotes
             
         try:
-            if self.offline_mode:
-                data = self._load_from_disk(symbol)
+            loaded = self._load_quotes(missing)
+        except Exception as e:
+            print(f"Error fetching quotes: {str(e)}")
+            return quotes
+        for symbol, price in loaded.items():
+            self.cache.put(('quote', symbol), price)
+        return {**quotes, **loaded}
+    
+    def get_historical_bulk(self, symbols: List[str], interval: str = '1d',
+                            period: str = '1y') -> Dict[str, pd.DataFrame]:
+        """Historical data for many symbols, downloading only the uncached ones in one call"""
+        frames = {}
+        missing = []
+        for symbol in symbols:
+            cached = self.cache.lookup(('history', symbol, interval, period),
+                                       lambda s=symbol: self._refresh_history(s, interval, period))
+            if cached is not None:
+                frames[symbol] = cached
             else:
-                data = yf.download(symbol, period=period, interval=interval)
-                
+                missing.append(symbol)
+        if not missing:
+            return frames
+            
+        if self.offline_mode or len(missing) == 1:
+            for symbol in missing:
+                data = self.get_historical(symbol, interval, period)
+                if data is not None:
+                    frames[symbol] = data
+            return frames
+            
+        try:
+            self.fetch_stats['history_requests'] = self.fetch_stats.get('history_requests', 0) + 1
+            raw = yf.download(missing, period=period, interval=interval, group_by='ticker',
+                              progress=False)
+            for symbol in missing:
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                data = raw[symbol].dropna(how='all')
+                if data.empty:
+                    continue
+                self._persist(symbol, data, interval)
+                data = self._calculate_indicators(data, symbol, interval)
+                self.cache.put(('history', symbol, interval, period), data)
+                frames[symbol] = data
+        except Exception as e:
+            print(f"Error fetching historical data: {str(e)}")
+        return frames
+    
+    def get_historical(self, symbol: str, interval: str = '1d', 
+                      period: str = '1y') -> Optional[pd.DataFrame]:
+        """Get historical price data, refreshed once per bar of the interval"""
+        key = ('history', symbol, interval, period)
+        data = self.cache.lookup(key, lambda: self._refresh_history(symbol, interval, period))
+        if data is not None:
+            return data
+        data = self._load_history(symbol, interval, period)
+        if data is not None:
+            self.cache.put(key, data)
+        return data
+    
+    def _load_history(self, symbol: str, interval: str, period: str,
+                      seed: bool = True) -> Optional[pd.DataFrame]:
+        try:
+            data = self._download(symbol, interval, period)
             if data.empty:
                 return None
                 
             # Calculate technical indicators
-            data = self._calculate_indicators(data)
-            self.cache[cache_key] = data
-            return data
+            if not seed:
+                return IndicatorState(symbol, interval).backfill(data)
+            return self._calculate_indicators(data, symbol, interval)
             
         except Exception as e:
             print(f"Error fetching historical data: {str(e)}")
             return None
     
-    def _calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Add technical indicators to data"""
-        data['sma_20'] = data['Close'].rolling(20).mean()
-        data['sma_50'] = data['Close'].rolling(50).mean()
-        data['rsi'] = self._calculate_rsi(data['Close'])
+    def _refresh_history(self, symbol: str, interval: str, period: str) -> Optional[pd.DataFrame]:
+        """Background reload of a stale history entry.
+
+        Runs on the cache's worker threads, so it only adds indicator
+        columns to the frame: the live IndicatorState and its file belong
+        to the calling thread, which keeps them current with update_bar.
+        """
+        return self._load_history(symbol, interval, period, seed=False)
+    
+    def get_indicators(self, symbol: str, interval: str = '1d') -> Optional[IndicatorState]:
+        """Incremental indicator state, restored from disk when saved by a previous run.
+
+        A restored state only folds in the bars newer than its last one;
+        history is recomputed when no usable saved state exists or the
+        bars since it no longer fit in the catch-up download.
+        """
+        key = (symbol, interval)
+        if key in self.indicators:
+            return self.indicators[key]
+            
+        path = self._indicator_path(symbol, interval)
+        if not os.path.exists(path):
+            return self._rebuild_indicators(symbol, interval)
+            
+        try:
+            state = IndicatorState.load(path)
+        except (ValueError, KeyError, TypeError) as e:
+            # Only an unparseable file is discarded
+            print(f"Discarding corrupt indicator state {path}: {str(e)}")
+            os.remove(path)
+            return self._rebuild_indicators(symbol, interval)
+            
+        try:
+            data = self._download(symbol, interval, '1mo')
+        except Exception as e:
+            # Keep the saved state for the next attempt rather than resuming with a gap
+            print(f"Error restoring indicators: {str(e)}")
+            return None
+        if data.empty or state.last_timestamp is None or \
+                data.index[0] > pd.Timestamp(state.last_timestamp):
+            # Bars between the saved state and the download would be skipped
+            return self._rebuild_indicators(symbol, interval)
+        # Re-reads the saved bar too, since it may have been partial
+        state.catch_up(data)
+        self.indicators[key] = state
+        return state
+    
+    def _rebuild_indicators(self, symbol: str, interval: str) -> Optional[IndicatorState]:
+        """Indicator state backfilled from the symbol's full history"""
+        data = self.get_historical(symbol, interval)
+        if data is None:
+            return None
+        if (symbol, interval) not in self.indicators:
+            # A cached frame was served without seeding a state
+            self._calculate_indicators(data, symbol, interval)
+        return self.indicators[(symbol, interval)]
+    
+    def update_bar(self, symbol: str, close: float, high: Optional[float] = None,
+                   low: Optional[float] = None, interval: str = '1d',
+                   timestamp=None) -> Optional[IndicatorState]:
+        """Fold a new bar or tick into the symbol's indicators in O(1).
+
+        timestamp defaults to the start of today's bar, so repeated daily
+        ticks revise the same bar; off-session days have no bar to fold into.
+        """
+        state = self.get_indicators(symbol, interval)
+        if state is None:
+            return None
+        if timestamp is None and interval == '1d':
+            timestamp = pd.Timestamp.now().normalize()
+            if not is_trading_session(timestamp):
+                return state
+        state.update(close, high, low, timestamp=timestamp)
+        return state
+    
+    def save_indicators(self):
+        """Persist every indicator state so the next run resumes without recomputing"""
+        for (symbol, interval), state in self.indicators.items():
+            state.save(self._indicator_path(symbol, interval))
+    
+    def get_option_chain(self, symbol: str, max_dte: int = 60) -> Optional[pd.DataFrame]:
+        """Get calls and puts for every expiration within max_dte days"""
+        return self.cache.get(('chain', symbol, max_dte),
+                              lambda: self._load_option_chain(symbol, max_dte))
+    
+    def _load_option_chain(self, symbol: str, max_dte: int) -> Optional[pd.DataFrame]:
+        try:
+            self.fetch_stats['chain_requests'] = self.fetch_stats.get('chain_requests', 0) + 1
+            ticker = yf.Ticker(symbol)
+            now = datetime.now()
+            frames = []
+            for expiration in ticker.options:
+                # Contracts stop trading at the 16:00 close on expiration day
+                expiry = datetime.strptime(expiration, '%Y-%m-%d') + timedelta(hours=16)
+                T = (expiry - now).total_seconds() / (365.25 * 24 * 3600)
+                if not 0 < T <= max_dte / 365.25:
+                    continue
+                    
+                chain = ticker.option_chain(expiration)
+                for option_type, data in (('call', chain.calls), ('put', chain.puts)):
+                    frames.append(
+                        data[['strike', 'bid', 'ask', 'lastPrice']]
+                        .assign(expiration=expiration, T=T, type=option_type)
+                    )
+                    
+            return pd.concat(frames, ignore_index=True) if frames else None
+            
+        except Exception as e:
+            print(f"Error fetching option chain: {str(e)}")
+            return None
+    
+    def _load_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        if self.offline_mode:
+            frames = {symbol: self.get_historical(symbol) for symbol in symbols}
+            return {symbol: float(frame['Close'].iloc[-1])
+                    for symbol, frame in frames.items() if frame is not None}
+        self.fetch_stats['quote_requests'] = self.fetch_stats.get('quote_requests', 0) + 1
+        prices = rs.get_latest_price(symbols)
+        return {symbol: float(price) for symbol, price in zip(symbols, prices) if price}
+    
+    def _download(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
+        if self.offline_mode:
+            return self._load_from_disk(symbol, interval, period)
+        # yfinance returns (Price, Ticker) columns even for one symbol
+        data = flatten_columns(yf.download(symbol, period=period, interval=interval))
+        if not data.empty:
+            self._persist(symbol, data, interval)
         return data
     
-    def _calculate_rsi(self, series: pd.Series, window: int = 14) -> pd.Series:
-        """Calculate Relative Strength Index"""
-        delta = series.diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(window).mean()
-        avg_loss = loss.rolling(window).mean()
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+    def _persist(self, symbol: str, data: pd.DataFrame, interval: str):
+        """Append downloaded bars newer than the store's last one so offline runs see them.
+
+        The last stored bar may have been forming when saved, so it is
+        rewritten only if the download revised it.
+        """
+        try:
+            last = self.store.last_timestamp(symbol, interval)
+            if last is not None and (last.tz is None) == (data.index.tz is None):
+                data = data[data.index >= last]
+                stored = self.store.load(symbol, interval, start=last)
+                if data.empty or (len(data) == 1 and data.columns.equals(stored.columns) and
+                                  (data.to_numpy() == stored.to_numpy()).all()):
+                    return
+            self.store.append(symbol, data, interval)
+        except Exception as e:
+            print(f"Error storing historical data: {str(e)}")
+    
+    def _calculate_indicators(self, data: pd.DataFrame, symbol: str,
+                              interval: str = '1d') -> pd.DataFrame:
+        """Add technical indicators to data in one vectorized pass, seeding the incremental state"""
+        state = IndicatorState(symbol, interval)
+        data = state.backfill(data)
+        self.indicators[(symbol, interval)] = state
+        state.save(self._indicator_path(symbol, interval))
+        return data
+    
+    def _indicator_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.indicator_dir, f"{symbol}_{interval}.json")
     
-    def _load_from_disk(self, symbol: str) -> pd.DataFrame:
-        """Load historical data from local storage"""
+    def _load_from_disk(self, symbol: str, interval: str = '1d',
+                        period: str = 'max') -> pd.DataFrame:
+        """Load the period's bars from the columnar store, or a legacy CSV not yet migrated"""
+        last = self.store.last_timestamp(symbol, interval)
+        if last is not None:
+            return self.store.load(symbol, interval, start=period_start(last, period))
         path = f"data/historical/{symbol}.csv"
         if os.path.exists(path):
             df = pd.read_csv(path, parse_dates=['Date'], index_col='Date')
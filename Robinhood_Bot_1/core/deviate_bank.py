@@ -0,0 +1,107 @@
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from scipy.stats import qmc
+from typing import Dict, Optional
+from .fast_math import norm_ppf
+
+class DeviateBank:
+    """Process-wide store of scrambled Sobol standard-normal deviates.
+
+    Deviates are keyed by (dimension, log2 size, scramble seed), generated
+    once and handed out read-only. Memory is bounded by LRU eviction and,
+    when a cache directory is set, banks are persisted as .npy files and
+    memory-mapped back so warm starts skip Sobol generation and the inverse CDF.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2, cache_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._banks = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'disk_loads': 0}
+
+    def get(self, dimension: int, log2_size: int, seed: int = 0,
+            rescramble: bool = False) -> np.ndarray:
+        """Return a read-only (2**log2_size, dimension) array of N(0,1) deviates.
+
+        rescramble=True draws a fresh random scrambling that bypasses the bank.
+        """
+        if rescramble:
+            return self._generate(dimension, log2_size, None)
+
+        key = (dimension, log2_size, seed)
+        with self._lock:
+            if key in self._banks:
+                self._banks.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._banks[key]
+            self.stats['misses'] += 1
+
+        deviates = self._load_or_generate(*key)
+        with self._lock:
+            if key not in self._banks:
+                self._banks[key] = deviates
+                self._bytes += deviates.nbytes
+                self._evict()
+            return self._banks[key]
+
+    def clear(self):
+        """Drop every in-memory bank (persisted files are kept)"""
+        with self._lock:
+            self._banks.clear()
+            self._bytes = 0
+
+    def info(self) -> Dict:
+        """Current bank usage and hit/miss counters"""
+        with self._lock:
+            return {'banks': len(self._banks), 'bytes': self._bytes, **self.stats}
+
+    def _evict(self):
+        # Always keep the most recent bank even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._banks) > 1:
+            _, deviates = self._banks.popitem(last=False)
+            self._bytes -= deviates.nbytes
+            self.stats['evictions'] += 1
+
+    def _path(self, dimension: int, log2_size: int, seed: int) -> Path:
+        return self.cache_dir / f"sobol_normals_d{dimension}_m{log2_size}_s{seed}.npy"
+
+    def _load_or_generate(self, dimension: int, log2_size: int, seed: int) -> np.ndarray:
+        if self.cache_dir is None:
+            return self._generate(dimension, log2_size, seed)
+
+        path = self._path(dimension, log2_size, seed)
+        if path.exists():
+            self.stats['disk_loads'] += 1
+            return np.load(path, mmap_mode='r')
+
+        deviates = self._generate(dimension, log2_size, seed)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, deviates)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode='r')
+
+    @staticmethod
+    def _generate(dimension: int, log2_size: int, seed: Optional[int]) -> np.ndarray:
+        u = qmc.Sobol(d=dimension, scramble=True, seed=seed).random_base2(m=log2_size)
+        deviates = norm_ppf(u)
+        deviates.setflags(write=False)
+        return deviates
+
+deviate_bank = DeviateBank(cache_dir=os.getenv('QMC_DEVIATE_CACHE'))
+
+def log2_size(n_simulations: int) -> int:
+    """Smallest m with 2**m >= n_simulations"""
+    return int(np.ceil(np.log2(max(n_simulations, 2))))
+
+def sobol_normals(n_simulations: int, dimension: int = 1, seed: int = 0,
+                  rescramble: bool = False) -> np.ndarray:
+    """Banked Sobol normals for n_simulations rounded up to a power of 2"""
+    deviates = deviate_bank.get(dimension, log2_size(n_simulations), seed, rescramble)
+    return deviates[:, 0] if dimension == 1 else deviates
@@ -0,0 +1,95 @@
+import numpy as np
+from .fast_math import norm_cdf, norm_pdf
+from typing import Dict, Optional
+
+# The one chain IV solver in the repo: Robinhood_Bot_2 and options_tradingV2.py import it too
+SIGMA_MIN = 1e-4
+SIGMA_MAX = 5.0
+
+def initial_guess(price, S, K, T, r, sign) -> np.ndarray:
+    """Corrado-Miller rational approximation, evaluated on call-equivalent prices"""
+    X = K * np.exp(-r*T)
+    call = np.where(sign > 0, price, price + S - X)  # put-call parity
+    half_gap = call - (S - X)/2
+    radicand = np.maximum(half_gap**2 - (S - X)**2/np.pi, 0)
+    guess = np.sqrt(2*np.pi/T) / (S + X) * (half_gap + np.sqrt(radicand))
+    return np.clip(np.nan_to_num(guess, nan=0.3), 0.05, 2.0)
+
+def implied_volatility(price, S, K, T, r, option_type='call',
+                       tol: float = 1e-8, max_iter: int = 20) -> Dict:
+    """Invert Black-Scholes for a whole chain at once.
+
+    Starts from a Corrado-Miller guess and runs Halley steps on arrays. Each
+    contract keeps a [lo, hi] bracket that shrinks with the sign of the
+    pricing error; steps that leave it (or stall on tiny vega) fall back to
+    bisection. Prices outside the no-arbitrage bounds come back as NaN, and
+    contracts still unconverged after max_iter are flagged.
+    """
+    price, S, K, T, r = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (price, S, K, T, r))
+    )
+    sign = np.broadcast_to(np.where(np.asarray(option_type) == 'call', 1.0, -1.0), price.shape)
+
+    discount = np.exp(-r*T)
+    intrinsic = np.maximum(sign*(S - K*discount), 0)
+    upper = np.where(sign > 0, S, K*discount)
+    valid = (price > intrinsic) & (price < upper) & (T > 0)
+
+    sigma = initial_guess(price, S, K, T, r, sign)
+    lo = np.full(price.shape, SIGMA_MIN)
+    hi = np.full(price.shape, SIGMA_MAX)
+    sqrt_t = np.sqrt(T)
+    converged = ~valid
+    iterations = 0
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for iterations in range(1, max_iter + 1):
+            vol_t = sigma * sqrt_t
+            d1 = (np.log(S/K) + (r + sigma**2/2)*T) / vol_t
+            d2 = d1 - vol_t
+            model = sign * (S*norm_cdf(sign*d1) - K*discount*norm_cdf(sign*d2))
+            diff = model - price
+
+            converged = converged | (np.abs(diff) <= tol*price + 1e-12)
+            if converged.all():
+                break
+
+            # Price is increasing in sigma, so the error sign tightens the bracket
+            hi = np.where(diff > 0, np.minimum(hi, sigma), hi)
+            lo = np.where(diff < 0, np.maximum(lo, sigma), lo)
+
+            vega = S * norm_pdf(d1) * sqrt_t
+            volga = vega * d1 * d2 / sigma
+            newton = diff / vega
+            step = newton / (1 - 0.5*newton*volga/vega)
+            candidate = sigma - step
+
+            safe = np.isfinite(candidate) & (candidate > lo) & (candidate < hi)
+            candidate = np.where(safe, candidate, 0.5*(lo + hi))
+            sigma = np.where(converged, sigma, candidate)
+
+    return {
+        'iv': np.where(valid, sigma, np.nan),
+        'converged': converged & valid,
+        'iterations': iterations
+    }
+
+def atm_implied_vol(chain, S: float, r: float = 0.01, days: int = 30) -> Optional[float]:
+    """ATM IV of the expiry nearest days out, read off its out-of-the-money smile at S.
+
+    chain has expiration, T, strike, type, bid, ask, lastPrice columns, as
+    fetched by DataHandler.get_option_chain. Returns None when no quote solves.
+    """
+    if chain is None or chain.empty:
+        return None
+    T = chain['T'].iloc[(chain['T'] - days / 365.25).abs().argmin()]
+    data = chain[(chain['T'] == T) & ((chain['type'] == 'call') == (chain['strike'] >= S))]
+    quoted = (data['bid'] > 0) & (data['ask'] > 0)
+    mid = np.where(quoted, (data['bid'] + data['ask']) / 2, data['lastPrice'])
+    solved = implied_volatility(mid, S, data['strike'].to_numpy(), T, r, data['type'].to_numpy())
+    converged = solved['converged']
+    if not converged.any():
+        return None
+    strikes = data['strike'].to_numpy()[converged]
+    order = np.argsort(strikes)
+    return float(np.interp(S, strikes[order], solved['iv'][converged][order]))
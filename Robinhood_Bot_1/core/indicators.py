@@ -0,0 +1,287 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+class IndicatorState:
+    """Incrementally maintained technical indicators for one symbol and interval.
+
+    Covers SMAs, EMAs, Wilder RSI, Wilder ATR and Bollinger bands. backfill()
+    computes full indicator columns from history in one vectorized pass and
+    leaves the state positioned after the last bar; update() then folds in a
+    new bar, or revises the current one when a tick repeats its timestamp,
+    in O(1). The state round-trips through to_dict()/save() so a restart
+    resumes without recomputing history.
+    """
+
+    def __init__(self, symbol: str, interval: str = '1d', sma_windows: Tuple = (20, 50),
+                 ema_spans: Tuple = (12, 26), rsi_window: int = 14, atr_window: int = 14,
+                 bollinger_window: int = 20, bollinger_k: float = 2.0):
+        self.symbol = symbol
+        self.interval = interval
+        self.sma_windows = tuple(sma_windows)
+        self.ema_spans = tuple(ema_spans)
+        self.rsi_window = rsi_window
+        self.atr_window = atr_window
+        self.bollinger_window = bollinger_window
+        self.bollinger_k = bollinger_k
+        self.reset()
+
+    def reset(self):
+        """Forget every bar"""
+        size = max(self.sma_windows + (self.bollinger_window,))
+        self._closes = np.zeros(size)
+        self._head = 0
+        self._count = 0
+        self._sums = {window: 0.0 for window in self._windows}
+        self._sum_squares = 0.0
+        self._recursive = {
+            'prev_close': None, 'high': None, 'low': None,
+            'ema': {span: None for span in self.ema_spans},
+            'gain_sum': 0.0, 'loss_sum': 0.0, 'tr_sum': 0.0,
+            'avg_gain': None, 'avg_loss': None, 'atr': None, 'bars': 0
+        }
+        self._undo = None
+        self.last_timestamp = None
+        self.latest = {}
+
+    @property
+    def bars(self) -> int:
+        return self._count
+
+    @property
+    def _windows(self) -> Tuple:
+        return tuple(sorted(set(self.sma_windows + (self.bollinger_window,))))
+
+    def backfill(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Indicator columns for a Close/High/Low frame, seeding the state from its last bar"""
+        data = data.copy()
+        close, high, low = self._ohlc(data)
+        for window in self.sma_windows:
+            data[f'sma_{window}'] = close.rolling(window).mean()
+        for span in self.ema_spans:
+            data[f'ema_{span}'] = close.ewm(span=span, adjust=False).mean()
+
+        change = close.diff()
+        avg_gain = self._wilder(change.clip(lower=0), self.rsi_window, start=1)
+        avg_loss = self._wilder((-change).clip(lower=0), self.rsi_window, start=1)
+        data['rsi'] = _rsi(avg_gain, avg_loss)
+        previous = close.shift(1)
+        true_range = pd.concat([high - low, (high - previous).abs(), (low - previous).abs()],
+                               axis=1).max(axis=1)
+        data['atr'] = self._wilder(true_range, self.atr_window, start=0)
+
+        middle = close.rolling(self.bollinger_window).mean()
+        spread = self.bollinger_k * close.rolling(self.bollinger_window).std(ddof=0)
+        data['bb_upper'], data['bb_middle'], data['bb_lower'] = middle + spread, middle, middle - spread
+
+        # Seed the state from all but the last bar, then step through the last
+        # one so a tick revising it has an undo point
+        self.reset()
+        n = len(close)
+        if n:
+            self._seed(close.to_numpy(dtype=float)[:-1], high.to_numpy(dtype=float)[:-1],
+                       low.to_numpy(dtype=float)[:-1], change.to_numpy(dtype=float)[:-1],
+                       true_range.to_numpy(dtype=float)[:-1], avg_gain, avg_loss, data)
+            self.update(close.iloc[-1], high.iloc[-1], low.iloc[-1], timestamp=data.index[-1])
+        return data
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None,
+               timestamp=None) -> Dict:
+        """Fold in one bar in O(1); a repeated timestamp revises the current bar instead"""
+        close = float(close)
+        high = close if high is None else float(high)
+        low = close if low is None else float(low)
+        timestamp = None if timestamp is None else str(timestamp)
+
+        if timestamp is not None and timestamp == self.last_timestamp and self._undo is not None:
+            # Tick within the current bar: widen its range, replace its close
+            current = (self._head - 1) % len(self._closes)
+            delta = close - self._closes[current]
+            for window in self._windows:
+                self._sums[window] += delta
+            self._sum_squares += close**2 - self._closes[current]**2
+            self._closes[current] = close
+            high = max(high, self._recursive['high'])
+            low = min(low, self._recursive['low'])
+            base = self._undo
+        else:
+            for window in self._windows:
+                if self._count >= window:
+                    evicted = self._closes[(self._head - window) % len(self._closes)]
+                    self._sums[window] -= evicted
+                    if window == self.bollinger_window:
+                        self._sum_squares -= evicted**2
+                self._sums[window] += close
+            self._sum_squares += close**2
+            self._closes[self._head] = close
+            self._head = (self._head + 1) % len(self._closes)
+            self._count += 1
+            base = self._recursive
+            self._undo = base
+
+        self._recursive = self._step(base, close, high, low)
+        self.last_timestamp = timestamp
+        self.latest = self._snapshot(close)
+        return self.latest
+
+    def catch_up(self, data: pd.DataFrame) -> int:
+        """Fold in the bars of data at or after the last one seen, returning how many"""
+        close, high, low = self._ohlc(data)
+        newer = data.index >= pd.Timestamp(self.last_timestamp) if self.last_timestamp \
+            else np.ones(len(data), dtype=bool)
+        for timestamp, c, h, l in zip(data.index[newer], close[newer], high[newer], low[newer]):
+            self.update(c, h, l, timestamp=timestamp)
+        return int(newer.sum())
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot of the full state"""
+        return {
+            'symbol': self.symbol,
+            'interval': self.interval,
+            'settings': {
+                'sma_windows': list(self.sma_windows), 'ema_spans': list(self.ema_spans),
+                'rsi_window': self.rsi_window, 'atr_window': self.atr_window,
+                'bollinger_window': self.bollinger_window, 'bollinger_k': self.bollinger_k
+            },
+            'closes': self._closes.tolist(),
+            'head': self._head,
+            'count': self._count,
+            'sums': {str(window): total for window, total in self._sums.items()},
+            'sum_squares': self._sum_squares,
+            'recursive': _jsonable(self._recursive),
+            'undo': _jsonable(self._undo),
+            'last_timestamp': self.last_timestamp,
+            'latest': self.latest
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'IndicatorState':
+        indicators = cls(state['symbol'], state['interval'], **state['settings'])
+        indicators._closes = np.array(state['closes'], dtype=float)
+        indicators._head = state['head']
+        indicators._count = state['count']
+        indicators._sums = {int(window): total for window, total in state['sums'].items()}
+        indicators._sum_squares = state['sum_squares']
+        indicators._recursive = _restore(state['recursive'])
+        indicators._undo = _restore(state['undo'])
+        indicators.last_timestamp = state['last_timestamp']
+        indicators.latest = state['latest']
+        return indicators
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path: str) -> 'IndicatorState':
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    def _step(self, base: Dict, close: float, high: float, low: float) -> Dict:
+        state = dict(base, ema=dict(base['ema']), high=high, low=low, prev_close=close,
+                     bars=base['bars'] + 1)
+        for span, value in base['ema'].items():
+            state['ema'][span] = close if value is None else value + 2/(span + 1)*(close - value)
+
+        previous = base['prev_close']
+        if previous is None:
+            true_range = high - low
+        else:
+            change = close - previous
+            true_range = max(high - low, abs(high - previous), abs(low - previous))
+            state['avg_gain'], state['gain_sum'] = self._wilder_step(
+                base['avg_gain'], base['gain_sum'], max(change, 0.0), base['bars'], self.rsi_window)
+            state['avg_loss'], state['loss_sum'] = self._wilder_step(
+                base['avg_loss'], base['loss_sum'], max(-change, 0.0), base['bars'], self.rsi_window)
+        state['atr'], state['tr_sum'] = self._wilder_step(
+            base['atr'], base['tr_sum'], true_range, base['bars'] + 1, self.atr_window)
+        return state
+
+    @staticmethod
+    def _wilder_step(average, total, value, samples, window):
+        """Simple mean over the first window samples, Wilder smoothing afterwards"""
+        if average is not None:
+            return average + (value - average) / window, total
+        total += value
+        return (total / window if samples == window else None), total
+
+    @staticmethod
+    def _wilder(values: pd.Series, window: int, start: int) -> pd.Series:
+        """Vectorized Wilder average seeded by the simple mean of values[start:start+window]"""
+        result = pd.Series(np.nan, index=values.index)
+        seed = start + window - 1
+        if len(values) > seed:
+            seeded = values.iloc[seed:].copy()
+            seeded.iloc[0] = values.iloc[start:seed + 1].mean()
+            result.iloc[seed:] = seeded.ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+        return result
+
+    def _seed(self, close, high, low, change, true_range, avg_gain, avg_loss, data):
+        n = len(close)
+        if n == 0:
+            return
+        size = len(self._closes)
+        recent = close[-size:]
+        self._closes[:len(recent)] = recent
+        self._head = len(recent) % size
+        self._count = n
+        for window in self._windows:
+            self._sums[window] = float(close[-window:].sum())
+        self._sum_squares = float((close[-self.bollinger_window:]**2).sum())
+
+        last = lambda series: None if np.isnan(series.iloc[n - 1]) else float(series.iloc[n - 1])
+        self._recursive = {
+            'prev_close': float(close[-1]), 'high': float(high[-1]), 'low': float(low[-1]),
+            'ema': {span: float(data[f'ema_{span}'].iloc[n - 1]) for span in self.ema_spans},
+            'gain_sum': float(np.clip(change[1:self.rsi_window + 1], 0, None).sum()),
+            'loss_sum': float(np.clip(-change[1:self.rsi_window + 1], 0, None).sum()),
+            'tr_sum': float(true_range[:self.atr_window].sum()),
+            'avg_gain': last(avg_gain), 'avg_loss': last(avg_loss), 'atr': last(data['atr']),
+            'bars': n
+        }
+        self.last_timestamp = str(data.index[n - 1])
+
+    def _snapshot(self, close: float) -> Dict:
+        latest = {'close': close}
+        for window in self.sma_windows:
+            latest[f'sma_{window}'] = self._sums[window] / window if self._count >= window else np.nan
+        for span in self.ema_spans:
+            latest[f'ema_{span}'] = self._recursive['ema'][span]
+
+        state = self._recursive
+        latest['rsi'] = float(_rsi(state['avg_gain'], state['avg_loss'])) \
+            if state['avg_gain'] is not None else np.nan
+        latest['atr'] = np.nan if state['atr'] is None else state['atr']
+
+        window = self.bollinger_window
+        if self._count >= window:
+            mean = self._sums[window] / window
+            spread = self.bollinger_k * np.sqrt(max(self._sum_squares / window - mean**2, 0.0))
+            latest.update(bb_upper=mean + spread, bb_middle=mean, bb_lower=mean - spread)
+        else:
+            latest.update(bb_upper=np.nan, bb_middle=np.nan, bb_lower=np.nan)
+        return latest
+
+    @staticmethod
+    def _ohlc(data: pd.DataFrame):
+        column = lambda name: data[name] if name in data else data[name.lower()]
+        close = column('Close').astype(float)
+        high = column('High').astype(float) if 'High' in data or 'high' in data else close
+        low = column('Low').astype(float) if 'Low' in data or 'low' in data else close
+        return close, high, low
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return np.where(np.asarray(avg_loss) == 0, 100.0,
+                        100 - 100 / (1 + np.asarray(avg_gain) / np.asarray(avg_loss)))
+
+def _jsonable(state: Optional[Dict]) -> Optional[Dict]:
+    if state is None:
+        return None
+    return dict(state, ema={str(span): value for span, value in state['ema'].items()})
+
+def _restore(state: Optional[Dict]) -> Optional[Dict]:
+    if state is None:
+        return None
+    return dict(state, ema={int(span): value for span, value in state['ema'].items()})
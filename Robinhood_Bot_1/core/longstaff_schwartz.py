@@ -0,0 +1,96 @@
+import numpy as np
+from typing import Dict
+from .deviate_bank import sobol_normals
+
+BASES = ('laguerre', 'polynomial')
+
+def price_longstaff_schwartz(S: float, K, T: float, r: float, sigma: float,
+                             option_type: str = 'put', n_paths: int = 2**17,
+                             n_steps: int = 100, basis: str = 'laguerre', degree: int = 3,
+                             seed: int = 0, max_bytes: int = 64 * 1024**2) -> Dict:
+    """American prices for a strike chain by least-squares Monte Carlo.
+
+    Paths are built backwards in time with a Brownian bridge: the terminal
+    value of each path comes from the banked Sobol deviates, which carry most
+    of the variance, and each earlier date is bridged from the one after it
+    with pseudo-random normals from a generator seeded by (seed, step). Only
+    the current date's (paths,) slice is ever held, so 100k paths x 100
+    steps needs a few MB instead of a (paths x steps) matrix. Regressions
+    for every strike in a block are solved together from batched normal
+    equations on the in-the-money paths; strikes are split into blocks so
+    the (strikes x paths x basis) design tensor stays under max_bytes, and
+    each block regenerates the same paths from the seeds.
+    """
+    if basis not in BASES:
+        raise ValueError(f"Unknown regression basis: {basis}")
+    if n_steps < 1:
+        raise ValueError("n_steps must be positive")
+
+    K = np.atleast_1d(np.asarray(K, dtype=float))
+    sign = 1.0 if option_type == 'call' else -1.0
+    z = sobol_normals(n_paths, seed=seed)
+    n = z.size
+    block = max(1, int(max_bytes // (n * (degree + 1) * 8 * 3)))
+
+    prices = np.empty(K.shape)
+    errors = np.empty(K.shape)
+    for start in range(0, K.size, block):
+        strikes = K[start:start + block]
+        values = _backward_induction(S, strikes, T, r, sigma, sign, z, n_steps,
+                                     basis, degree, seed)
+        exercise = np.maximum(sign*(S - strikes), 0)
+        prices[start:start + block] = np.maximum(values.mean(axis=1), exercise)
+        errors[start:start + block] = values.std(axis=1) / np.sqrt(n)
+
+    return {
+        'price': prices,
+        'std_error': errors,
+        'n_paths': n,
+        'n_steps': n_steps
+    }
+
+def _basis(x: np.ndarray, basis: str, degree: int) -> np.ndarray:
+    """(strikes, degree + 1, paths) regressors in moneyness x = S/K"""
+    X = np.empty((x.shape[0], degree + 1, x.shape[1]))
+    X[:, 0] = 1.0
+    if degree >= 1:
+        X[:, 1] = x if basis == 'polynomial' else 1 - x
+    for k in range(1, degree):
+        if basis == 'polynomial':
+            np.multiply(X[:, k], x, out=X[:, k + 1])
+        else:
+            # Laguerre three-term recurrence
+            X[:, k + 1] = ((2*k + 1 - x)*X[:, k] - k*X[:, k - 1]) / (k + 1)
+    if basis == 'laguerre':
+        X *= np.exp(-x/2)[:, None, :]
+    return X
+
+def _backward_induction(S, K, T, r, sigma, sign, z, n_steps, basis, degree, seed):
+    """Discounted-to-today cash flows per (strike, path) under the LSM exercise rule"""
+    dt = T / n_steps
+    drift = r - 0.5*sigma**2
+    discount = np.exp(-r*dt)
+    strikes = K[:, None]
+
+    w = np.sqrt(T) * z
+    stock = S * np.exp(drift*T + sigma*w)
+    values = np.maximum(sign*(stock - strikes), 0)
+
+    for step in range(n_steps - 1, 0, -1):
+        # W(t_k) | W(t_{k+1}) ~ N(k/(k+1) W(t_{k+1}), dt k/(k+1))
+        ratio = step / (step + 1)
+        bridge = np.random.default_rng([seed, step]).standard_normal(w.size)
+        w = ratio*w + np.sqrt(dt*ratio)*bridge
+        stock = S * np.exp(drift*step*dt + sigma*w)
+        values *= discount
+
+        exercise = np.maximum(sign*(stock - strikes), 0)
+        itm = exercise > 0
+        X = _basis(stock / strikes, basis, degree)
+        X *= itm[:, None, :]
+        # pinv stays defined for strikes with few or no in-the-money paths
+        coefficients = np.linalg.pinv(X @ X.transpose(0, 2, 1)) @ (X @ values[..., None])
+        continuation = (coefficients.transpose(0, 2, 1) @ X)[:, 0]
+        values = np.where(itm & (exercise > continuation), exercise, values)
+
+    return values * discount
@@ -0,0 +1,32 @@
+import pandas as pd
+from pandas.tseries.holiday import (AbstractHolidayCalendar, GoodFriday, Holiday,
+                                    USLaborDay, USMartinLutherKingJr, USMemorialDay,
+                                    USPresidentsDay, USThanksgivingDay, nearest_workday,
+                                    sunday_to_monday)
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE closures (early closes are still sessions)"""
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01',
+                observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+_holidays = NYSEHolidayCalendar()
+
+def is_trading_session(day=None) -> bool:
+    """Whether the exchange trades on day (default today): a weekday that is not a holiday"""
+    day = pd.Timestamp.now() if day is None else pd.Timestamp(day)
+    day = day.tz_localize(None).normalize() if day.tz is not None else day.normalize()
+    if day.weekday() >= 5:
+        return False
+    return len(_holidays.holidays(start=day, end=day)) == 0
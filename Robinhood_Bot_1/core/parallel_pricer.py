@@ -0,0 +1,212 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+from .deviate_bank import sobol_normals
+from .finite_difference import price_finite_difference
+from .lattice import price_lattice
+from .pricing_models import PricingModels
+from .qmc_engine import price_strikes
+
+ENGINES = ('black_scholes', 'qmc', 'lattice', 'finite_difference')
+INPUTS = ('S', 'K', 'T', 'r', 'sigma', 'sign')
+OUTPUTS = ('price', 'delta', 'gamma', 'vega', 'theta', 'rho', 'var')
+
+class ParallelPricer:
+    """Chain-sweep pricing split across a persistent process pool.
+
+    Contracts are written once into a shared-memory (n x 6) input buffer and
+    workers write prices, Greeks and the payoff VaR (options['var_percentile'])
+    straight into a shared (n x 7) output buffer, so only buffer names and row ranges cross process boundaries.
+    Workers are started once and warmed up front (engines imported, Sobol
+    bank loaded). Every chunk uses the same scramble seed, so results are
+    deterministic and identical to a serial run however chunks land on
+    workers. Outputs an engine doesn't produce come back as NaN.
+    """
+
+    def __init__(self, engine: str = 'qmc', workers: Optional[int] = None,
+                 chunk_size: int = 256, seed: int = 0, **options):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown pricing engine: {engine}")
+        self.engine = engine
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.options = options
+        self._pool = None
+        self._buffers = {}
+
+    def price(self, S, K, T, r, sigma, option_type='call', engine: Optional[str] = None,
+              **options) -> Dict:
+        """Price every contract; inputs broadcast like black_scholes_batch.
+
+        engine and options override the pricer's own for this sweep only, so
+        one warm pool serves every engine and setting.
+        """
+        engine = engine or self.engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown pricing engine: {engine}")
+        options = {**self.options, **options}
+        S, K, T, r, sigma = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+        )
+        shape = S.shape
+        sign = np.broadcast_to(np.where(np.asarray(option_type) == 'call', 1.0, -1.0), shape)
+        n = S.size
+        if n == 0:
+            return {name: np.empty(shape) for name in OUTPUTS}
+
+        if self.workers == 0:
+            inputs = np.column_stack([np.ravel(x) for x in (S, K, T, r, sigma, sign)])
+            outputs = _price_rows(inputs, engine, options, self.seed)
+        else:
+            inputs = self._buffer('inputs', n)
+            outputs = self._buffer('outputs', n)
+            for column, values in enumerate((S, K, T, r, sigma, sign)):
+                inputs[:n, column] = np.ravel(values)
+            pool = self._start()
+            futures = [
+                pool.submit(_price_chunk, self._buffers['inputs'][0].name,
+                            self._buffers['outputs'][0].name, len(inputs), start,
+                            min(start + self.chunk_size, n), engine, options)
+                for start in range(0, n, self.chunk_size)
+            ]
+            for future in futures:
+                future.result()
+            outputs = outputs[:n].copy()
+
+        return {name: outputs[:n, i].reshape(shape) for i, name in enumerate(OUTPUTS)}
+
+    def price_chain(self, chain: pd.DataFrame, spot: float, r: float = 0.01,
+                    sigma=None) -> pd.DataFrame:
+        """Price a get_option_chain() frame; sigma defaults to its IV column"""
+        if sigma is None:
+            sigma = chain['IV'].to_numpy()
+        result = self.price(spot, chain['strike'].to_numpy(), chain['T'].to_numpy(), r,
+                            sigma, chain['type'].to_numpy())
+        return chain.assign(**{f'model_{name}': values for name, values in result.items()})
+
+    def close(self):
+        """Stop the workers and release the shared buffers"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for shm, _ in self._buffers.values():
+            shm.close()
+            shm.unlink()
+        self._buffers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_initialize_worker,
+                initargs=(self.engine, self.options, self.seed)
+            )
+            # Submit one no-op per worker so they all spawn and warm up now
+            for future in [self._pool.submit(_warm) for _ in range(self.workers)]:
+                future.result()
+        return self._pool
+
+    def _buffer(self, role: str, n: int) -> np.ndarray:
+        """Shared (rows x columns) buffer for role, reused across sweeps and grown on demand"""
+        if role in self._buffers and len(self._buffers[role][1]) >= n:
+            return self._buffers[role][1]
+        if role in self._buffers:
+            old, _ = self._buffers.pop(role)
+            old.close()
+            old.unlink()
+        rows = max(n, self.chunk_size)
+        columns = _columns(role)
+        shm = shared_memory.SharedMemory(create=True, size=rows * columns * 8)
+        array = np.ndarray((rows, columns), dtype=float, buffer=shm.buf)
+        self._buffers[role] = (shm, array)
+        return array
+
+# Worker-process state, set once by _initialize_worker
+_worker = {}
+
+def _initialize_worker(engine: str, options: Dict, seed: int):
+    _worker.update(seed=seed, attached={})
+    if engine == 'qmc':
+        sobol_normals(options.get('n_simulations', 10000), seed=seed)
+
+def _warm():
+    return os.getpid()
+
+def _columns(role: str) -> int:
+    return len(INPUTS) if role == 'inputs' else len(OUTPUTS)
+
+def _attach(name: str, role: str, rows: int) -> np.ndarray:
+    """Map a shared buffer, keeping only the latest two attachments open"""
+    attached = _worker['attached']
+    if name not in attached:
+        while len(attached) >= 2:
+            shm, _ = attached.pop(next(iter(attached)))
+            shm.close()
+        shm = shared_memory.SharedMemory(name=name)
+        attached[name] = (shm, np.ndarray((rows, _columns(role)), dtype=float, buffer=shm.buf))
+    return attached[name][1]
+
+def _price_chunk(input_name: str, output_name: str, rows: int, start: int, stop: int,
+                 engine: str, options: Dict) -> int:
+    inputs = _attach(input_name, 'inputs', rows)
+    outputs = _attach(output_name, 'outputs', rows)
+    outputs[start:stop] = _price_rows(inputs[start:stop], engine, options, _worker['seed'])
+    return stop - start
+
+def _price_rows(inputs: np.ndarray, engine: str, options: Dict, seed: int) -> np.ndarray:
+    """Price a block of (S, K, T, r, sigma, sign) rows with one engine"""
+    S, K, T, r, sigma, sign = inputs.T
+    option_type = np.where(sign > 0, 'call', 'put')
+    outputs = np.full((len(inputs), len(OUTPUTS)), np.nan)
+
+    if engine == 'black_scholes':
+        result = PricingModels().black_scholes_batch(S, K, T, r, sigma, option_type)
+        if result['status'] != 'success':
+            raise ValueError(result['message'])
+        outputs[:, 0] = result['price']
+        for i, name in enumerate(OUTPUTS[1:-1], start=1):
+            outputs[:, i] = result['greeks'][name]
+
+    elif engine == 'lattice':
+        outputs[:, 0] = price_lattice(S, K, T, r, sigma, option_type=option_type,
+                                      american=options.get('american', True),
+                                      n_steps=options.get('n_steps', 200),
+                                      method=options.get('method', 'binomial'),
+                                      richardson=options.get('richardson', False))
+
+    elif engine == 'qmc':
+        z = sobol_normals(options.get('n_simulations', 10000), seed=seed)
+        groups = np.column_stack((S, T, r, sigma))
+        for params in np.unique(groups, axis=0):
+            rows = np.flatnonzero((groups == params).all(axis=1))
+            result = price_strikes(params[0], K[rows], params[1], params[2], params[3],
+                                   var_percentile=options.get('var_percentile', 5.0), z=z)
+            for i, name in enumerate(OUTPUTS):
+                outputs[rows, i] = np.where(sign[rows] > 0, result[f'call_{name}'],
+                                            result[f'put_{name}'])
+
+    else:
+        # One grid solve covers every (S, K) sharing T, r, sigma and type
+        groups = np.column_stack((T, r, sigma, sign))
+        for params in np.unique(groups, axis=0):
+            rows = np.flatnonzero((groups == params).all(axis=1))
+            result = price_finite_difference(
+                S[rows], K[rows], params[0], params[1], params[2],
+                option_type='call' if params[3] > 0 else 'put',
+                american=options.get('american', True),
+                grid_points=options.get('grid_points', 1000)
+            )
+            outputs[rows, 0] = result['price']
+            outputs[rows, 1] = result['delta']
+            outputs[rows, 2] = result['gamma']
+
+    return outputs
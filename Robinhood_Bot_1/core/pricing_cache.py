@@ -0,0 +1,142 @@
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# Grid each numeric pricing input is snapped to before keying (None = exact)
+DEFAULT_QUANTIZATION = {
+    'S': 0.01,
+    'K': 0.01,
+    'T': 1e-6,
+    'r': 1e-6,
+    'sigma': 1e-4
+}
+
+class PricingCache:
+    """Thread-safe memo of pricing results keyed on quantized inputs.
+
+    Numeric inputs are snapped to the configured grid (spot to a tick,
+    sigma to 1e-4, ...) and the snapped values are what actually get priced,
+    so every request that lands on the same grid point gets an identical
+    answer. Entries expire after ttl seconds and the least recently used
+    ones are evicted once their arrays exceed max_bytes. Cached arrays are
+    read-only and each hit returns fresh dicts around them.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_bytes: int = 64 * 1024**2,
+                 quantization: Optional[Dict] = None):
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self.configure(ttl, max_bytes, quantization)
+
+    def configure(self, ttl: float = 60.0, max_bytes: int = 64 * 1024**2,
+                  quantization: Optional[Dict] = None, enabled: bool = True):
+        """Apply settings (e.g. the pricing.cache config section) and drop stale entries"""
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.quantization = {**DEFAULT_QUANTIZATION, **(quantization or {})}
+        self.enabled = enabled
+        self.clear()
+
+    def key(self, method: str, **inputs) -> Tuple[tuple, Dict]:
+        """Cache key for a pricing call plus the snapped inputs to price with"""
+        parts = [method]
+        snapped = {}
+        for name, value in sorted(inputs.items()):
+            step = self.quantization.get(name)
+            if step and not isinstance(value, str):
+                grid = np.round(np.asarray(value, dtype=float) / step)
+                snapped[name] = grid * step if grid.ndim else float(grid * step)
+                parts.append((name, grid.shape, grid.astype(np.int64).tobytes()))
+            else:
+                snapped[name] = value
+                parts.append((name, np.shape(value), tuple(np.ravel(value).tolist())))
+        return tuple(parts), snapped
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], Dict]) -> Dict:
+        """Cached result for key, computing and storing it on a miss.
+
+        compute runs outside the lock; only results with status 'success'
+        are stored.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._drop(key)
+                self.stats['expirations'] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return _unpack(entry[1])
+            self.stats['misses'] += 1
+
+        result = compute()
+        if result.get('status') != 'success':
+            return result
+
+        frozen = _freeze(result)
+        size = _nbytes(frozen)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, frozen, size)
+            self._bytes += size
+            self._evict()
+        return _unpack(frozen)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self) -> Dict:
+        """Current usage, hit rate and eviction counters"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                **self.stats
+            }
+
+    def _drop(self, key: tuple):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+
+def _freeze(value):
+    """Copy of a result with every array made read-only"""
+    if isinstance(value, dict):
+        return {name: _freeze(item) for name, item in value.items()}
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.setflags(write=False)
+    return value
+
+def _unpack(value):
+    """Fresh dicts around the shared read-only arrays"""
+    if isinstance(value, dict):
+        return {name: _unpack(item) for name, item in value.items()}
+    return value
+
+def _nbytes(value) -> int:
+    """Approximate memory held by a cached result"""
+    if isinstance(value, dict):
+        return sum(64 + _nbytes(item) for item in value.values())
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    return 32
+
+pricing_cache = PricingCache()
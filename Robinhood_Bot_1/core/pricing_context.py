@@ -0,0 +1,59 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+from .pricing_dispatcher import PricingDispatcher, pricing_dispatcher
+
+class PricingContext:
+    """Cycle-scoped batch of leg pricing requests shared by every strategy.
+
+    Strategies register legs with request() while planning, resolve() then
+    prices every distinct contract in one dispatched batch per exercise
+    style, and get() hands each strategy its results. Legs requested by
+    several strategies (or several times) are priced once.
+    """
+
+    def __init__(self, dispatcher: Optional[PricingDispatcher] = None, r: float = 0.01):
+        self.dispatcher = dispatcher or pricing_dispatcher
+        self.r = r
+        self._pending = {}
+        self._results = {}
+        self.stats = {'requested': 0, 'priced': 0, 'batches': 0}
+
+    def request(self, S: float, K: float, T: float, sigma: float, option_type: str,
+                american: bool = False) -> Tuple:
+        """Register one leg and return the key its result will be stored under"""
+        key = (float(S), float(K), float(T), float(sigma), str(option_type), bool(american))
+        self.stats['requested'] += 1
+        if key not in self._results:
+            self._pending[key] = None
+        return key
+
+    def resolve(self):
+        """Price every pending leg, one dispatcher call per exercise style"""
+        for american in (False, True):
+            keys = [key for key in self._pending if key[5] == american]
+            if not keys:
+                continue
+            S, K, T, sigma = (np.array([key[i] for key in keys]) for i in range(4))
+            batch = self.dispatcher.price(S=S, K=K, T=T, r=self.r, sigma=sigma,
+                                          option_type=np.array([key[4] for key in keys]),
+                                          american=american)
+            if batch['status'] != 'success':
+                raise ValueError(f"Leg pricing failed: {batch['message']}")
+
+            for i, key in enumerate(keys):
+                self._results[key] = {
+                    'price': float(batch['price'][i]),
+                    'greeks': {greek: float(values[i])
+                               for greek, values in batch['greeks'].items()},
+                    'engine': batch['engine'],
+                    'status': 'success'
+                }
+            self.stats['priced'] += len(keys)
+            self.stats['batches'] += 1
+        self._pending.clear()
+
+    def get(self, key: Tuple) -> Dict:
+        """Result for a requested leg, resolving outstanding requests first if needed"""
+        if key in self._pending:
+            self.resolve()
+        return self._results[key]
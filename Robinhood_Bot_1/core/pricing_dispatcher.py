@@ -0,0 +1,304 @@
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, Optional
+from .parallel_pricer import ParallelPricer
+from .pricing_cache import pricing_cache
+from .pricing_models import PricingModels
+
+# Seconds per unit of work (contract for closed form, contract-step for the
+# lattice, grid node-step per grid solve for finite differences,
+# contract-path for simulation), refined online from observed timings
+DEFAULT_COSTS = {
+    'black_scholes': 5e-6,
+    'lattice': 2e-6,
+    'finite_difference': 3e-7,
+    'quasi_monte_carlo': 5e-8
+}
+MIN_STEPS = 25
+MIN_GRID_POINTS = 101
+MIN_SIMULATIONS = 2**10
+# Engines pricing.default_model may name for requests that need simulation
+SIMULATION_ENGINES = ('quasi_monte_carlo',)
+# Dispatcher engines the process pool can sweep, by ParallelPricer engine name
+PARALLEL_ENGINES = {'lattice': 'lattice', 'quasi_monte_carlo': 'qmc'}
+
+class PricingDispatcher:
+    """Picks a pricing engine per request from contract features and the cycle's latency budget.
+
+    Closed form is used whenever it is exact: European contracts and American
+    calls without dividends. Other American contracts go to whichever of the
+    lattice (pricing.binomial.steps, cost per contract) and the
+    Crank-Nicolson grid (pricing.finite_difference.grid_points, cost per
+    distinct expiry/vol/type, shared by every strike on it) is estimated
+    cheaper, so whole chains of American puts are priced from a few grid
+    solves. Only requests for tail risk (the payoff VaR, which no
+    closed-form or lattice engine produces) are simulated, with
+    pricing.default_model at pricing.qmc.simulations. Estimates come from an exponentially
+    weighted per-engine cost model. If the pick would overrun what is left
+    of the cycle budget, steps/grid points/paths are halved down to a floor and
+    then closed form is used, flagged as degraded. Greeks an engine doesn't
+    produce come from closed form. Every decision is logged with its
+    elapsed time.
+
+    Lattice and simulation batches of at least pricing.parallel.min_contracts
+    are swept across a persistent pool of pricing.parallel.workers processes;
+    costs are kept per core, so the budget check divides by the workers.
+    """
+
+    def __init__(self, pricing: Optional[PricingModels] = None, config: Optional[Dict] = None):
+        self.pricing = pricing or PricingModels(cache=pricing_cache)
+        self.costs = dict(DEFAULT_COSTS)
+        self.history = deque(maxlen=1000)
+        self.deadline = None
+        self._parallel = None
+        self.configure(config or {})
+
+    def configure(self, config: Dict):
+        """Read engine settings, latency_budget and parallel from the pricing config"""
+        self.default_model = config.get('default_model', 'quasi_monte_carlo')
+        if self.default_model not in SIMULATION_ENGINES:
+            raise ValueError(f"Unknown simulation model: {self.default_model}")
+        self.simulations = config.get('qmc', {}).get('simulations', 10000)
+        self.steps = config.get('binomial', {}).get('steps', 100)
+        self.grid_points = config.get('finite_difference', {}).get('grid_points', 1000)
+        self.latency_budget = config.get('latency_budget')
+        parallel = config.get('parallel', {})
+        self.workers = parallel.get('workers', 0)
+        self.min_parallel = parallel.get('min_contracts', 1024)
+        self.chunk_size = parallel.get('chunk_size', 256)
+        self.close()
+
+    def begin_cycle(self, budget: Optional[float] = None):
+        """Start a polling cycle with budget seconds of pricing time (None = unlimited)"""
+        budget = self.latency_budget if budget is None else budget
+        self.deadline = None if budget is None else time.perf_counter() + budget
+
+    @property
+    def remaining(self) -> float:
+        if self.deadline is None:
+            return np.inf
+        return max(self.deadline - time.perf_counter(), 0.0)
+
+    def choose(self, n_contracts: int, american: bool = False, has_puts: bool = True,
+               dividend_yield: float = 0.0, n_grids: Optional[int] = None,
+               tail_risk: bool = False) -> Dict:
+        """Engine and settings for a request, degraded as needed to fit the remaining budget.
+
+        n_grids is the number of distinct (expiry, rate, vol, type) groups,
+        one grid solve each; None assumes every contract needs its own.
+        tail_risk requests (European only) go to pricing.default_model.
+        """
+        remaining = self.remaining
+        if tail_risk:
+            cost = lambda sims: (self.costs[self.default_model] * n_contracts * sims /
+                                 self._speedup(self.default_model, n_contracts))
+            sims = self.simulations
+            while cost(sims) > remaining and sims > MIN_SIMULATIONS:
+                sims //= 2
+            if cost(sims) <= remaining:
+                return {'engine': self.default_model, 'n_simulations': sims,
+                        'degraded': sims < self.simulations}
+            # No VaR without simulation; the price alone is still exact
+            return {'engine': 'black_scholes', 'degraded': True}
+        if not (american and (has_puts or dividend_yield > 0)):
+            return {'engine': 'black_scholes', 'degraded': False}
+
+        n_grids = n_contracts if n_grids is None else n_grids
+        lattice = lambda steps: (self.costs['lattice'] * n_contracts * steps /
+                                 self._speedup('lattice', n_contracts))
+        grid = lambda points: self.costs['finite_difference'] * n_grids * _grid_work(points)
+
+        if grid(self.grid_points) < lattice(self.steps):
+            points = self.grid_points
+            while grid(points) > remaining and points > MIN_GRID_POINTS:
+                points //= 2
+            if grid(points) <= remaining:
+                return {'engine': 'finite_difference', 'grid_points': points,
+                        'degraded': points < self.grid_points}
+        else:
+            steps = self.steps
+            while lattice(steps) > remaining and steps > MIN_STEPS:
+                steps //= 2
+            if lattice(steps) <= remaining:
+                return {'engine': 'lattice', 'n_steps': steps, 'degraded': steps < self.steps}
+        # European value is a lower bound for the American price
+        return {'engine': 'black_scholes', 'degraded': True}
+
+    def price(self, S, K, T, r, sigma, option_type='call', american: bool = False,
+              dividend_yield: float = 0.0, tail_risk: bool = False,
+              var_percentile: float = 5.0) -> Dict:
+        """Price a batch of contracts with the chosen engine.
+
+        Inputs broadcast like black_scholes_batch. A continuous dividend
+        yield is applied by pricing off the forward-adjusted spot, which is
+        exact for European contracts and an approximation on the lattice
+        and the grid. With tail_risk the result also carries 'var', the
+        var_percentile payoff percentile per contract (NaN if the budget
+        forced closed form).
+        """
+        if tail_risk and american:
+            return {'status': 'error',
+                    'message': "Tail risk is only simulated for European contracts"}
+        S, K, T, r, sigma = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+        )
+        types = np.broadcast_to(np.asarray(option_type), S.shape)
+        spot = S * np.exp(-dividend_yield * T)
+        grids = _grid_groups(T, r, sigma, types)
+        choice = self.choose(S.size, american, bool((types != 'call').any()), dividend_yield,
+                             len(grids), tail_risk)
+
+        start = time.perf_counter()
+        closed_form = self.pricing.black_scholes_batch(spot, K, T, r, sigma, types)
+        if closed_form['status'] != 'success':
+            return closed_form
+        engine = choice['engine']
+        speedup = self._speedup(engine, S.size)
+        if engine == 'black_scholes':
+            result = closed_form
+            work = 1
+        elif speedup > 1:
+            result = self._sweep(spot, K, T, r, sigma, types, american, choice, var_percentile)
+            work = choice['n_simulations'] if engine in SIMULATION_ENGINES else choice['n_steps']
+        elif engine == 'lattice':
+            result = self.pricing.lattice(spot, K, T, r, sigma, types, american=american,
+                                          n_steps=choice['n_steps'])
+            work = choice['n_steps']
+        elif engine in SIMULATION_ENGINES:
+            result = self._simulate(spot, K, T, r, sigma, types, choice, var_percentile)
+            work = choice['n_simulations']
+        else:
+            result = self._solve_grids(spot, K, T, r, sigma, types, american, grids, choice)
+            work = _grid_work(choice['grid_points'])
+        if result['status'] != 'success':
+            return result
+        elapsed = time.perf_counter() - start
+
+        # Exponentially weighted cost per unit of work on one core
+        units = len(grids) if engine == 'finite_difference' else S.size
+        observed = elapsed * speedup / (units * work)
+        self.costs[engine] = 0.8 * self.costs[engine] + 0.2 * observed
+        self.history.append({'engine': engine, 'contracts': S.size, 'elapsed': elapsed,
+                             'degraded': choice['degraded'], 'workers': speedup,
+                             'setting': {k: v for k, v in choice.items()
+                                         if k not in ('engine', 'degraded')}})
+        priced = {
+            'price': np.asarray(result['price']).reshape(S.shape),
+            'greeks': {**closed_form['greeks'], **result.get('greeks', {})},
+            'engine': engine,
+            'degraded': choice['degraded'],
+            'elapsed': elapsed,
+            'status': 'success'
+        }
+        if tail_risk:
+            priced['var'] = result.get('var', np.full(S.shape, np.nan))
+        return priced
+
+    def stats(self) -> Dict:
+        """Calls, contracts, total seconds and degradations per engine over the recent history"""
+        summary = {}
+        for record in self.history:
+            entry = summary.setdefault(record['engine'], {'calls': 0, 'contracts': 0,
+                                                          'seconds': 0.0, 'degraded': 0})
+            entry['calls'] += 1
+            entry['contracts'] += record['contracts']
+            entry['seconds'] += record['elapsed']
+            entry['degraded'] += int(record['degraded'])
+        return summary
+
+    def close(self):
+        """Stop the parallel pricing workers (restarted on the next large batch)"""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    def _speedup(self, engine: str, n_contracts: int) -> int:
+        """Workers a batch is split across (1 = priced in this process)"""
+        if self.workers > 1 and engine in PARALLEL_ENGINES and n_contracts >= self.min_parallel:
+            return self.workers
+        return 1
+
+    def _sweep(self, S, K, T, r, sigma, types, american, choice, var_percentile) -> Dict:
+        """Chain sweep across the process pool with the chosen engine settings"""
+        if self._parallel is None:
+            self._parallel = ParallelPricer('lattice', workers=self.workers,
+                                            chunk_size=self.chunk_size)
+        options = {k: v for k, v in choice.items() if k not in ('engine', 'degraded')}
+        try:
+            result = self._parallel.price(S, K, T, r, sigma, types,
+                                          engine=PARALLEL_ENGINES[choice['engine']],
+                                          american=american, var_percentile=var_percentile,
+                                          **options)
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+        if choice['engine'] not in SIMULATION_ENGINES:
+            return {'price': result['price'], 'status': 'success'}
+        names = ('delta', 'gamma', 'vega', 'theta', 'rho')
+        return {'price': result['price'], 'var': result['var'],
+                'greeks': {name: result[name] for name in names}, 'status': 'success'}
+
+    def _solve_grids(self, S, K, T, r, sigma, types, american, grids, choice) -> Dict:
+        """One finite-difference solve per (expiry, rate, vol, type) group of the chain"""
+        shape = S.shape
+        S, K, T, r, sigma, types = (np.ravel(x) for x in (S, K, T, r, sigma, types))
+        prices = np.empty(S.size)
+        greeks = {'delta': np.empty(S.size), 'gamma': np.empty(S.size)}
+        for rows in grids:
+            i = rows[0]
+            result = self.pricing.finite_difference(S[rows], K[rows], T[i], r[i], sigma[i],
+                                                    str(types[i]), american=american,
+                                                    grid_points=choice['grid_points'])
+            if result['status'] != 'success':
+                return result
+            prices[rows] = result['price']
+            for name in greeks:
+                greeks[name][rows] = result['greeks'][name]
+        return {'price': prices.reshape(shape),
+                'greeks': {name: values.reshape(shape) for name, values in greeks.items()},
+                'status': 'success'}
+
+    def _simulate(self, S, K, T, r, sigma, types, choice, var_percentile) -> Dict:
+        """Shared-draw QMC per (spot, expiry, rate) group; strikes and vols vary within a group"""
+        shape = S.shape
+        S, K, T, r, sigma, types = (np.ravel(x) for x in (S, K, T, r, sigma, types))
+        names = ('delta', 'gamma', 'vega', 'theta', 'rho')
+        prices, var = np.empty(S.size), np.empty(S.size)
+        greeks = {name: np.empty(S.size) for name in names}
+        groups = np.column_stack((S, T, r))
+        _, inverse = np.unique(groups, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for g in range(inverse.max() + 1 if S.size else 0):
+            rows = np.flatnonzero(inverse == g)
+            i = rows[0]
+            result = self.pricing.quasi_monte_carlo_batch(
+                S[i], K[rows], T[i], r[i], sigma[rows],
+                n_simulations=choice['n_simulations'], var_percentile=var_percentile
+            )
+            if result['status'] != 'success':
+                return result
+            calls = types[rows] == 'call'
+            pick = lambda key: np.where(calls, result[f'call_{key}'], result[f'put_{key}'])
+            prices[rows] = pick('price')
+            var[rows] = pick('var')
+            for name in names:
+                greeks[name][rows] = pick(name)
+        return {'price': prices.reshape(shape), 'var': var.reshape(shape),
+                'greeks': {name: values.reshape(shape) for name, values in greeks.items()},
+                'status': 'success'}
+
+
+def _grid_work(grid_points: int) -> int:
+    """Node-steps in one Crank-Nicolson solve (time steps follow price_finite_difference)"""
+    return grid_points * max(grid_points // 4, 50)
+
+def _grid_groups(T, r, sigma, types):
+    """Flat indices of the contracts sharing each finite-difference grid"""
+    keys = np.column_stack([np.ravel(x) for x in (T, r, sigma, types == 'call')])
+    if not len(keys):
+        return []
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    return [np.flatnonzero(inverse == g) for g in range(inverse.max() + 1)]
+
+pricing_dispatcher = PricingDispatcher()
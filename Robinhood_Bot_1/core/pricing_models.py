@@ -1,38 +1,95 @@
+import math
 import numpy as np
-from scipy.stats import norm
-from qmcpy import Sobol
-from typing import Dict
+from typing import Callable, Dict, Optional
+from .deviate_bank import sobol_normals
+from .fast_math import norm_cdf, norm_pdf
+from .finite_difference import price_finite_difference
+from .fourier import price_chain, calibrate_chain
+from .implied_vol import implied_volatility
+from .lattice import price_lattice
+from .longstaff_schwartz import price_longstaff_schwartz
+from .pricing_cache import PricingCache
+from .qmc_engine import price_strikes, bump_greeks, adaptive_price, stream_price
 
 class PricingModels:
-    def __init__(self):
-        self.sobol = Sobol(d=1, scramble=True)
-        
+    def __init__(self, cache: Optional[PricingCache] = None):
+        self.cache = cache
+
     def black_scholes(self, S: float, K: float, T: float, 
                      r: float, sigma: float, option_type: str = 'call') -> Dict:
-        """Black-Scholes with Greeks"""
+        """Black-Scholes with Greeks, on math-module scalars (no array overhead)"""
         try:
-            d1 = (np.log(S/K) + (r + sigma**2/2)*T) / (sigma*np.sqrt(T))
-            d2 = d1 - sigma*np.sqrt(T)
-            
-            if option_type == 'call':
-                price = S*norm.cdf(d1) - K*np.exp(-r*T)*norm.cdf(d2)
-                delta = norm.cdf(d1)
-            else:
-                price = K*np.exp(-r*T)*norm.cdf(-d2) - S*norm.cdf(-d1)
-                delta = -norm.cdf(-d1)
-                
-            gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-            vega = S * norm.pdf(d1) * np.sqrt(T) / 100
-            theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) - 
-                   r * K * np.exp(-r*T) * norm.cdf(d2 if option_type == 'call' else -d2)) / 365
-            
+            sign = 1.0 if option_type == 'call' else -1.0
+            sqrt_t = math.sqrt(T)
+            vol_t = sigma * sqrt_t
+            d1 = (math.log(S/K) + (r + sigma**2/2)*T) / vol_t
+            d2 = d1 - vol_t
+            discount = math.exp(-r*T)
+
+            cdf_d1 = norm_cdf(sign * d1)
+            cdf_d2 = norm_cdf(sign * d2)
+            pdf_d1 = norm_pdf(d1)
+            return {
+                'price': sign * (S*cdf_d1 - K*discount*cdf_d2),
+                'greeks': {
+                    'delta': sign * cdf_d1,
+                    'gamma': pdf_d1 / (S * vol_t),
+                    'vega': S * pdf_d1 * sqrt_t / 100,
+                    'theta': (-S * pdf_d1 * sigma / (2 * sqrt_t) -
+                              sign * r * K * discount * cdf_d2) / 365,
+                    'rho': sign * K * T * discount * cdf_d2 / 100
+                },
+                'status': 'success'
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+
+    def black_scholes_batch(self, S, K, T, r, sigma, option_type='call') -> Dict:
+        """Vectorized Black-Scholes with Greeks for a whole chain.
+
+        All inputs broadcast against each other; option_type is 'call'/'put'
+        or an array of those labels. Vega and rho are per 1% move, theta per day.
+        """
+        return self._cached('black_scholes', self._black_scholes_batch, S=S, K=K, T=T,
+                            r=r, sigma=sigma, option_type=option_type)
+
+    def _black_scholes_batch(self, S, K, T, r, sigma, option_type) -> Dict:
+        try:
+            S, K, T, r, sigma = np.broadcast_arrays(
+                *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+            )
+            is_call = np.broadcast_to(np.asarray(option_type) == 'call', S.shape)
+            sign = np.where(is_call, 1.0, -1.0)
+
+            sqrt_t = np.sqrt(T)
+            vol_t = sigma * sqrt_t
+            d1 = (np.log(S/K) + (r + sigma**2/2)*T) / vol_t
+            d2 = d1 - vol_t
+            discount = np.exp(-r*T)
+
+            cdf_d1 = norm_cdf(sign * d1)
+            cdf_d2 = norm_cdf(sign * d2)
+            pdf_d1 = norm_pdf(d1)
+
+            price = sign * (S*cdf_d1 - K*discount*cdf_d2)
+            delta = sign * cdf_d1
+            gamma = pdf_d1 / (S * vol_t)
+            vega = S * pdf_d1 * sqrt_t / 100
+            theta = (-S * pdf_d1 * sigma / (2 * sqrt_t) -
+                     sign * r * K * discount * cdf_d2) / 365
+            rho = sign * K * T * discount * cdf_d2 / 100
+
             return {
                 'price': price,
                 'greeks': {
                     'delta': delta,
                     'gamma': gamma,
                     'vega': vega,
-                    'theta': theta
+                    'theta': theta,
+                    'rho': rho
                 },
                 'status': 'success'
             }
@@ -42,35 +99,101 @@ class PricingModels:
                 'message': str(e)
             }
     
+    def implied_volatility(self, price, S, K, T, r, option_type='call',
+                           max_iter: int = 20) -> Dict:
+        """Vectorized implied volatility for a chain of market prices"""
+        try:
+            result = implied_volatility(price, S, K, T, r, option_type=option_type,
+                                        max_iter=max_iter)
+            result['status'] = 'success'
+            return result
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+    
     def quasi_monte_carlo(self, S: float, K: float, T: float, 
                          r: float, sigma: float, option_type: str = 'call',
-                         n_simulations: int = 10000) -> Dict:
-        """QMC pricing with Sobol sequences"""
+                         n_simulations: int = 10000, rescramble: bool = False,
+                         greeks_method: str = 'pathwise') -> Dict:
+        """QMC pricing with banked Sobol deviates and Greeks from the same paths"""
+        result = self.quasi_monte_carlo_batch(S, K, T, r, sigma, n_simulations=n_simulations,
+                                              rescramble=rescramble, greeks_method=greeks_method)
+        if result['status'] != 'success':
+            return result
+        return {
+            'price': float(result[f'{option_type}_price'][0]),
+            'greeks': {
+                greek: float(result[f'{option_type}_{greek}'][0])
+                for greek in ('delta', 'gamma', 'vega', 'theta', 'rho')
+            },
+            'status': 'success'
+        }
+    
+    def quasi_monte_carlo_batch(self, S: float, K, T: float, r: float, sigma,
+                                n_simulations: int = 10000, var_percentile: float = 5.0,
+                                rescramble: bool = False, greeks_method: str = 'pathwise') -> Dict:
+        """QMC call/put prices, Greeks and VaR for many strikes from one shared draw.
+
+        greeks_method='bump' swaps the pathwise/likelihood-ratio Greeks for
+        central differences on common random numbers. rescramble=True
+        always bypasses the cache.
+        """
+        compute = lambda **inputs: self._quasi_monte_carlo_batch(
+            n_simulations=n_simulations, var_percentile=var_percentile,
+            rescramble=rescramble, greeks_method=greeks_method, **inputs
+        )
+        if rescramble:
+            return compute(S=S, K=K, T=T, r=r, sigma=sigma)
+        return self._cached(f'qmc_{greeks_method}_{n_simulations}_{var_percentile}', compute,
+                            S=S, K=K, T=T, r=r, sigma=sigma)
+
+    def _quasi_monte_carlo_batch(self, S, K, T, r, sigma, n_simulations, var_percentile,
+                                 rescramble, greeks_method) -> Dict:
         try:
-            u = self.sobol.random(n_simulations).flatten()
-            z = norm.ppf(u)
-            ST = S * np.exp((r - 0.5*sigma**2)*T + sigma*np.sqrt(T)*z)
-            
-            if option_type == 'call':
-                payoff = np.maximum(ST - K, 0)
-            else:
-                payoff = np.maximum(K - ST, 0)
-                
-            price = np.exp(-r*T) * np.mean(payoff)
-            
-            # Calculate Greeks using pathwise method
-            delta = np.mean(np.where(ST > K, ST/S, 0)) * np.exp(-r*T) if option_type == 'call' else -np.mean(np.where(ST < K, ST/S, 0)) * np.exp(-r*T)
-            
+            if greeks_method not in ('pathwise', 'bump'):
+                raise ValueError(f"Unknown greeks method: {greeks_method}")
+            z = sobol_normals(n_simulations, rescramble=rescramble)
+            result = price_strikes(S, K, T, r, sigma, var_percentile=var_percentile, z=z)
+            if greeks_method == 'bump':
+                result.update(bump_greeks(S, K, T, r, sigma, z=z))
+            result['status'] = 'success'
+            return result
+        except Exception as e:
             return {
-                'price': float(price),
-                'greeks': {
-                    'delta': float(delta),
-                    'gamma': None,  # Would require additional calculations
-                    'vega': None,
-                    'theta': None
-                },
-                'status': 'success'
+                'status': 'error',
+                'message': str(e)
+            }
+    
+    def adaptive_monte_carlo(self, S: float, K: float, T: float, r: float, sigma: float,
+                             option_type: str = 'call', tolerance: float = 1e-2,
+                             time_budget: float = None, method: str = 'rqmc',
+                             max_samples: int = 2**22) -> Dict:
+        """Variance-reduced MC/RQMC that samples until the standard error reaches tolerance"""
+        try:
+            result = adaptive_price(S, K, T, r, sigma, option_type=option_type,
+                                    tolerance=tolerance, time_budget=time_budget,
+                                    method=method, max_samples=max_samples)
+            result['status'] = 'success'
+            return result
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
             }
+    
+    def streaming_monte_carlo(self, S: float, K: float, T: float, r: float, sigma: float,
+                              option_type: str = 'call', n_simulations: int = 2**20,
+                              chunk_size: int = 2**16, var_percentile: float = 5.0,
+                              method: str = 'rqmc') -> Dict:
+        """Constant-memory chunked simulation with online price, VaR and CVaR"""
+        try:
+            result = stream_price(S, K, T, r, sigma, option_type=option_type,
+                                  n_simulations=n_simulations, chunk_size=chunk_size,
+                                  var_percentile=var_percentile, method=method)
+            result['status'] = 'success'
+            return result
         except Exception as e:
             return {
                 'status': 'error',
@@ -81,48 +204,122 @@ class PricingModels:
                      r: float, sigma: float, n_steps: int = 100,
                      option_type: str = 'call', american: bool = False) -> Dict:
         """Binomial tree pricing"""
+        result = self.lattice(S, K, T, r, sigma, option_type=option_type,
+                              american=american, n_steps=n_steps)
+        if result['status'] == 'success':
+            result['price'] = float(result['price'])
+        return result
+    
+    def lattice(self, S, K, T, r, sigma, option_type='put', american: bool = True,
+                n_steps: int = 200, method: str = 'binomial',
+                richardson: bool = False) -> Dict:
+        """Batched binomial/trinomial lattice pricing for American or European contracts"""
+        compute = lambda **inputs: self._lattice(
+            american=american, n_steps=n_steps, method=method, richardson=richardson, **inputs
+        )
+        return self._cached(f'lattice_{method}_{american}_{n_steps}_{richardson}', compute,
+                            S=S, K=K, T=T, r=r, sigma=sigma, option_type=option_type)
+
+    def _lattice(self, S, K, T, r, sigma, option_type, american, n_steps, method,
+                 richardson) -> Dict:
+        try:
+            price = price_lattice(S, K, T, r, sigma, option_type=option_type,
+                                  american=american, n_steps=n_steps, method=method,
+                                  richardson=richardson)
+            return {
+                'price': price,
+                'status': 'success'
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+    
+    def finite_difference(self, S, K, T: float, r: float, sigma: float,
+                          option_type: str = 'put', american: bool = True,
+                          grid_points: int = 1000) -> Dict:
+        """Crank-Nicolson PDE pricing of a strike chain from a single grid solve"""
+        compute = lambda **inputs: self._finite_difference(
+            american=american, grid_points=grid_points, **inputs
+        )
+        return self._cached(f'finite_difference_{american}_{grid_points}', compute,
+                            S=S, K=K, T=T, r=r, sigma=sigma, option_type=option_type)
+
+    def _finite_difference(self, S, K, T, r, sigma, option_type, american,
+                           grid_points) -> Dict:
+        try:
+            result = price_finite_difference(S, K, T, r, sigma, option_type=option_type,
+                                             american=american, grid_points=grid_points)
+            result['greeks'] = {
+                'delta': result.pop('delta'),
+                'gamma': result.pop('gamma')
+            }
+            result['status'] = 'success'
+            return result
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+
+    def longstaff_schwartz(self, S: float, K, T: float, r: float, sigma: float,
+                           option_type: str = 'put', n_paths: int = 2**17,
+                           n_steps: int = 100, basis: str = 'laguerre') -> Dict:
+        """American strike-chain pricing by least-squares Monte Carlo on Sobol/bridge paths"""
+        compute = lambda **inputs: self._longstaff_schwartz(
+            n_paths=n_paths, n_steps=n_steps, basis=basis, **inputs
+        )
+        return self._cached(f'longstaff_schwartz_{basis}_{n_paths}_{n_steps}', compute,
+                            S=S, K=K, T=T, r=r, sigma=sigma, option_type=option_type)
+
+    def _longstaff_schwartz(self, S, K, T, r, sigma, option_type, n_paths, n_steps,
+                            basis) -> Dict:
         try:
-            dt = T / n_steps
-            u = np.exp(sigma * np.sqrt(dt))
-            d = 1 / u
-            p = (np.exp(r * dt) - d) / (u - d)
-            
-            # Price tree
-            price_tree = np.zeros((n_steps + 1, n_steps + 1))
-            price_tree[0, 0] = S
-            for i in range(1, n_steps + 1):
-                price_tree[i, 0] = price_tree[i-1, 0] * u
-                for j in range(1, i + 1):
-                    price_tree[i, j] = price_tree[i-1, j-1] * d
-            
-            # Payoff at expiration
-            payoff_tree = np.zeros((n_steps + 1, n_steps + 1))
-            for j in range(n_steps + 1):
-                if option_type == 'call':
-                    payoff_tree[n_steps, j] = max(price_tree[n_steps, j] - K, 0)
-                else:
-                    payoff_tree[n_steps, j] = max(K - price_tree[n_steps, j], 0)
-            
-            # Backward induction
-            for i in range(n_steps - 1, -1, -1):
-                for j in range(i + 1):
-                    if american:
-                        if option_type == 'call':
-                            intrinsic = max(price_tree[i, j] - K, 0)
-                        else:
-                            intrinsic = max(K - price_tree[i, j], 0)
-                    else:
-                        intrinsic = 0
-                    
-                    discounted = np.exp(-r * dt) * (p * payoff_tree[i+1, j] + (1-p) * payoff_tree[i+1, j+1])
-                    payoff_tree[i, j] = max(discounted, intrinsic)
-            
+            result = price_longstaff_schwartz(S, K, T, r, sigma, option_type=option_type,
+                                              n_paths=n_paths, n_steps=n_steps, basis=basis)
+            result['status'] = 'success'
+            return result
+        except Exception as e:
             return {
-                'price': payoff_tree[0, 0],
+                'status': 'error',
+                'message': str(e)
+            }
+
+    def fourier(self, S: float, K, T, r: float, params: Dict, model: str = 'heston',
+                option_type='call', q: float = 0.0) -> Dict:
+        """Heston/Bates/variance-gamma chain pricing, one Carr-Madan FFT per expiry"""
+        try:
+            return {
+                'price': price_chain(model, S, K, T, r, params, option_type, q),
+                'model': model,
                 'status': 'success'
             }
         except Exception as e:
             return {
                 'status': 'error',
                 'message': str(e)
-            }
\ No newline at end of file
+            }
+
+    def calibrate(self, chain, S: float, r: float = 0.01, model: str = 'heston',
+                  T: Optional[float] = None, option_type: Optional[str] = None,
+                  initial: Optional[Dict] = None) -> Dict:
+        """Fit a characteristic-function model to an option-chain frame"""
+        try:
+            result = calibrate_chain(model, chain, S, r, T=T, option_type=option_type,
+                                     initial=initial)
+            result['model'] = model
+            result['status'] = 'success'
+            return result
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+
+    def _cached(self, method: str, compute: Callable[..., Dict], **inputs) -> Dict:
+        """Route a pricing call through the cache when one is attached"""
+        if self.cache is None or not self.cache.enabled:
+            return compute(**inputs)
+        key, snapped = self.cache.key(method, **inputs)
+        return self.cache.get_or_compute(key, lambda: compute(**snapped))
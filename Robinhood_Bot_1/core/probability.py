@@ -0,0 +1,146 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from .fast_math import norm_cdf, norm_ppf
+
+def prob_above(S, K, T, r, sigma):
+    """Risk-neutral probability that a lognormal underlying finishes above K"""
+    with np.errstate(divide='ignore'):
+        d2 = (np.log(S / np.asarray(K, dtype=float)) + (r - 0.5*sigma**2)*T) / (sigma*np.sqrt(T))
+    return norm_cdf(d2)
+
+def expected_payoff(S, K, T, r, sigma, option_type='call'):
+    """Undiscounted expected payoff at expiry of a long call or put at K"""
+    forward = S * np.exp(r*T)
+    d1 = (np.log(forward / K) + 0.5*sigma**2*T) / (sigma*np.sqrt(T))
+    d2 = d1 - sigma*np.sqrt(T)
+    call = forward * norm_cdf(d1) - K * norm_cdf(d2)
+    return np.where(np.asarray(option_type) == 'call', call, call - forward + K)
+
+def touch_probability(S, B, T, r, sigma):
+    """Probability that the underlying touches level B at any time before expiry.
+
+    Reflection principle for the running maximum (B above spot) or minimum
+    (B below spot) of a Brownian motion with drift r - sigma^2/2 in log space.
+    """
+    b = np.log(np.asarray(B, dtype=float) / S)
+    nu = r - 0.5*sigma**2
+    root_T = sigma*np.sqrt(T)
+    side = np.where(b >= 0, 1.0, -1.0)
+    with np.errstate(over='ignore'):
+        reflected = np.exp(2*nu*b / sigma**2) * norm_cdf((-side*b - side*nu*T) / root_T)
+    return np.minimum(norm_cdf((-side*b + side*nu*T) / root_T) + reflected, 1.0)
+
+class ProbabilityEngine:
+    """POP, expected P&L and touch probabilities for batches of multi-leg structures.
+
+    Structures made of vanilla legs are evaluated in closed form under a
+    lognormal terminal distribution: the expiry P&L is piecewise linear, so
+    its zero crossings split the price axis into intervals whose lognormal
+    probabilities sum to the POP. Arbitrary payoffs are integrated over a
+    stratified terminal distribution that is cached per (symbol, T, sigma)
+    and shared across spots and calls.
+    """
+
+    def __init__(self, nodes: int = 2**12, max_entries: int = 256):
+        self.nodes = nodes
+        self.max_entries = max_entries
+        self._distributions = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def evaluate(self, S: float, T: float, r: float, sigma, strikes=None, quantities=None,
+                 option_types='call', premium=0.0,
+                 payoff: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 symbol: Optional[str] = None) -> Dict:
+        """Evaluate n structures at once.
+
+        strikes, quantities (signed, long > 0) and option_types are (n, legs)
+        or a single (legs,) structure; premium is the net credit per structure.
+        payoff, when given, maps terminal prices (k,) to expiry payoffs (n, k)
+        and is integrated numerically instead of using the legs.
+        """
+        premium = np.atleast_1d(np.asarray(premium, dtype=float))
+        sigma = np.asarray(sigma, dtype=float)
+        if payoff is not None:
+            growth, weights = self.distribution(symbol, T, r, float(sigma))
+            pnl = premium[:, None] + np.atleast_2d(payoff(S * growth))
+            result = {
+                'probability_of_profit': (pnl > 0) @ weights,
+                'expected_pnl': pnl @ weights
+            }
+            if strikes is not None:
+                result['touch_probability'] = touch_probability(S, np.atleast_2d(strikes), T, r,
+                                                                sigma)
+            return result
+
+        K, quantity, types = (np.atleast_2d(x) for x in np.broadcast_arrays(
+            np.asarray(strikes, dtype=float), np.asarray(quantities, dtype=float),
+            np.asarray(option_types)))
+        premium = np.broadcast_to(premium, K.shape[:1])
+        column = sigma[:, None] if sigma.ndim else sigma
+        return {
+            'probability_of_profit': self._closed_form_pop(S, K, quantity, types, premium,
+                                                           T, r, column),
+            'expected_pnl': premium + (quantity * expected_payoff(S, K, T, r, column, types)).sum(axis=1),
+            'touch_probability': touch_probability(S, K, T, r, column)
+        }
+
+    def distribution(self, symbol: Optional[str], T: float, r: float,
+                     sigma: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Cached (growth factors, weights) of S_T / S at stratified normal quantiles"""
+        key = (symbol, round(T, 8), round(r, 8), round(sigma, 8))
+        with self._lock:
+            if key in self._distributions:
+                self._distributions.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._distributions[key]
+            self.stats['misses'] += 1
+
+        z = norm_ppf((np.arange(self.nodes) + 0.5) / self.nodes)
+        growth = np.exp((r - 0.5*sigma**2)*T + sigma*np.sqrt(T)*z)
+        weights = np.full(self.nodes, 1 / self.nodes)
+        growth.setflags(write=False)
+        weights.setflags(write=False)
+        with self._lock:
+            self._distributions[key] = (growth, weights)
+            while len(self._distributions) > self.max_entries:
+                self._distributions.popitem(last=False)
+        return growth, weights
+
+    def _closed_form_pop(self, S, K, quantity, types, premium, T, r, sigma) -> np.ndarray:
+        order = np.argsort(K, axis=1)
+        K = np.take_along_axis(K, order, axis=1)
+        quantity = np.take_along_axis(quantity, order, axis=1)
+        is_call = np.take_along_axis(types == 'call', order, axis=1)
+
+        def pnl(x):
+            # Expiry P&L of every structure at prices x of shape (n, p)
+            intrinsic = np.where(is_call[:, None, :], x[..., None] - K[:, None, :],
+                                 K[:, None, :] - x[..., None])
+            return premium[:, None] + (quantity[:, None, :] * np.maximum(intrinsic, 0)).sum(axis=2)
+
+        # P&L is linear between 0, the sorted strikes and a point past the last strike
+        far = 2*K[:, -1:] + 1
+        knots = np.concatenate([np.zeros_like(K[:, :1]), K, far], axis=1)
+        values = pnl(knots)
+        a, b, fa, fb = knots[:, :-1], knots[:, 1:], values[:, :-1], values[:, 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inner = np.where(fa * fb < 0, a - fa*(b - a)/(fb - fa), np.nan)
+            slope = (fb[:, -1] - fa[:, -1]) / (b[:, -1] - a[:, -1])
+            tail = K[:, -1] - values[:, -2] / slope
+        tail = np.where(tail > K[:, -1], tail, np.nan)
+
+        # Breakpoints (NaN sorts last) bound intervals of constant P&L sign
+        points = np.sort(np.concatenate([K, inner, tail[:, None]], axis=1), axis=1)
+        lower = np.concatenate([np.zeros_like(K[:, :1]), points], axis=1)
+        upper = np.concatenate([points, np.full_like(K[:, :1], np.inf)], axis=1)
+        upper = np.where(np.isnan(upper), np.inf, upper)
+        valid = ~np.isnan(lower) & (upper > lower)
+        lower = np.where(valid, lower, 0.0)
+        mid = np.where(np.isinf(upper), 2*lower + 1, 0.5*(lower + upper))
+        mass = prob_above(S, lower, T, r, sigma) - prob_above(S, upper, T, r, sigma)
+        return np.where(valid & (pnl(mid) > 0), mass, 0.0).sum(axis=1)
+
+probability_engine = ProbabilityEngine()
@@ -0,0 +1,299 @@
+import time
+import numpy as np
+from scipy.stats import qmc
+from typing import Dict, Optional
+from .deviate_bank import sobol_normals
+from .fast_math import norm_ppf
+
+def terminal_prices(S: float, T: float, r: float, sigma: float,
+                    z: np.ndarray) -> np.ndarray:
+    """Risk-neutral GBM terminal prices for a vector of normal deviates"""
+    return S * np.exp((r - 0.5*sigma**2)*T + sigma*np.sqrt(T)*z)
+
+def price_strikes(S: float, K, T: float, r: float, sigma,
+                  n_simulations: int = 2**14, var_percentile: float = 5.0,
+                  z: Optional[np.ndarray] = None) -> Dict:
+    """Price calls and puts for every strike in K against one shared draw.
+
+    sigma may also be one volatility per strike (e.g. read off a VolSurface);
+    strikes are then grouped by volatility and each group reuses the same
+    normal deviates.
+
+    ST is increasing in Z, so sorting the deviates sorts the terminal prices.
+    Payoff means and every Greek then come from suffix sums of ST, Z and
+    ST*Z located with searchsorted, and because both payoffs are monotone in
+    ST the payoff percentiles are read off the sorted order statistics. Cost
+    is O(n log n + m log n) with O(n + m) memory, so no (strikes x paths)
+    payoff matrix is ever built.
+
+    Greeks use the same paths: pathwise estimators for delta, vega, theta
+    and rho, and the mixed likelihood-ratio/pathwise estimator for gamma.
+    Units match black_scholes_batch (vega and rho per 1%, theta per day).
+    """
+    if z is None:
+        z = sobol_normals(n_simulations)
+    K = np.atleast_1d(np.asarray(K, dtype=float))
+    if np.ndim(sigma) > 0:
+        return _price_by_volatility(S, K, T, r, np.broadcast_to(sigma, K.shape),
+                                    var_percentile, z)
+    z = np.sort(z)
+    ST = terminal_prices(S, T, r, sigma, z)
+    n = ST.size
+    sqrt_t = np.sqrt(T)
+    discount = np.exp(-r*T)
+
+    # Sums over the paths finishing above each strike; below = total - above
+    idx = np.searchsorted(ST, K, side='right')
+    above = n - idx
+    st_sum = _suffix_sums(ST)
+    z_sum = _suffix_sums(z)
+    stz_sum = _suffix_sums(ST * z)
+    st_above, z_above, stz_above = st_sum[idx], z_sum[idx], stz_sum[idx]
+    st_below, z_below, stz_below = st_sum[0] - st_above, z_sum[0] - z_above, stz_sum[0] - stz_above
+
+    call_price = discount * (st_above - K*above) / n
+    put_price = discount * (K*idx - st_below) / n
+
+    # Percentile of a monotone payoff = payoff at the matching ST order statistic
+    h = (n - 1) * var_percentile / 100
+    lo = int(np.floor(h))
+    hi = min(lo + 1, n - 1)
+    w = h - lo
+    call_var = (1 - w)*np.maximum(ST[lo] - K, 0) + w*np.maximum(ST[hi] - K, 0)
+    put_var = (1 - w)*np.maximum(K - ST[n-1-lo], 0) + w*np.maximum(K - ST[n-1-hi], 0)
+
+    # dST/dS = ST/S, dST/dsigma = ST*(sqrt(T)*Z - sigma*T),
+    # dST/dT = ST*(r - sigma^2/2 + sigma*Z/(2*sqrt(T))), dST/dr = ST*T
+    drift = r - 0.5*sigma**2
+    result = {'strikes': K, 'n_simulations': n}
+    for option_type, sign, price, st_in, z_in, stz_in in (
+        ('call', 1.0, call_price, st_above, z_above, stz_above),
+        ('put', -1.0, put_price, st_below, z_below, stz_below)
+    ):
+        dV_dT = -r*price + sign*discount*(drift*st_in + sigma*stz_in/(2*sqrt_t)) / n
+        result[f'{option_type}_price'] = price
+        result[f'{option_type}_var'] = discount * (call_var if sign > 0 else put_var)
+        result[f'{option_type}_delta'] = sign * discount * st_in / (n*S)
+        result[f'{option_type}_gamma'] = sign * discount * K * z_in / (n * S**2 * sigma * sqrt_t)
+        result[f'{option_type}_vega'] = sign * discount * (sqrt_t*stz_in - sigma*T*st_in) / n / 100
+        result[f'{option_type}_theta'] = -dV_dT / 365
+        result[f'{option_type}_rho'] = (-T*price + sign*discount*T*st_in/n) / 100
+    return result
+
+def bump_greeks(S: float, K, T: float, r: float, sigma: float,
+                n_simulations: int = 2**14, z: Optional[np.ndarray] = None,
+                rel_bump: float = 1e-2) -> Dict:
+    """Central-difference Greeks with common random numbers (fallback estimator)"""
+    if z is None:
+        z = sobol_normals(n_simulations)
+    dS, dsigma, dr = S*rel_bump, sigma*rel_bump, 1e-4
+    dT = min(1 / 365, T / 2)
+    price = lambda **bump: price_strikes(**{'S': S, 'K': K, 'T': T, 'r': r, 'sigma': sigma,
+                                            'z': z, **bump})
+    base, up, down = price(), price(S=S + dS), price(S=S - dS)
+    vol_up, vol_down = price(sigma=sigma + dsigma), price(sigma=sigma - dsigma)
+    later, rate_up = price(T=T - dT), price(r=r + dr)
+
+    result = {'strikes': base['strikes'], 'n_simulations': base['n_simulations']}
+    for option_type in ('call', 'put'):
+        key = f'{option_type}_price'
+        result[key] = base[key]
+        result[f'{option_type}_delta'] = (up[key] - down[key]) / (2*dS)
+        result[f'{option_type}_gamma'] = (up[key] - 2*base[key] + down[key]) / dS**2
+        result[f'{option_type}_vega'] = (vol_up[key] - vol_down[key]) / (2*dsigma) / 100
+        result[f'{option_type}_theta'] = (later[key] - base[key]) / dT / 365
+        result[f'{option_type}_rho'] = (rate_up[key] - base[key]) / dr / 100
+    return result
+
+def _suffix_sums(x: np.ndarray) -> np.ndarray:
+    """out[i] = sum(x[i:]) with a trailing zero"""
+    out = np.zeros(x.size + 1)
+    out[:-1] = np.cumsum(x[::-1])[::-1]
+    return out
+
+def _price_by_volatility(S, K, T, r, sigmas, var_percentile, z) -> Dict:
+    """Run price_strikes once per distinct volatility and scatter results back"""
+    result = None
+    for sigma in np.unique(sigmas):
+        mask = sigmas == sigma
+        group = price_strikes(S, K[mask], T, r, float(sigma),
+                              var_percentile=var_percentile, z=z)
+        if result is None:
+            result = {key: np.empty(K.shape) for key, value in group.items()
+                      if isinstance(value, np.ndarray)}
+            result['n_simulations'] = group['n_simulations']
+        for key in result:
+            if key != 'n_simulations':
+                result[key][mask] = group[key]
+    return result
+
+def adaptive_price(S: float, K: float, T: float, r: float, sigma: float,
+                   option_type: str = 'call', tolerance: float = 1e-2,
+                   time_budget: Optional[float] = None, method: str = 'rqmc',
+                   initial_samples: int = 2**10, max_samples: int = 2**22,
+                   replicates: int = 16, seed: Optional[int] = None) -> Dict:
+    """Price one contract, growing the sample until the standard error hits tolerance.
+
+    Every draw is used antithetically and the discounted terminal price
+    (whose Black-Scholes mean is S) serves as a control variate with its
+    coefficient re-estimated from all samples so far. method='mc' grows a
+    pseudo-random sample geometrically and estimates the error from the
+    sample variance; method='rqmc' extends independently scrambled Sobol
+    replicates and estimates the error from the spread of replicate means.
+    Stops at tolerance, time_budget seconds or before a batch would take
+    the sample count (antithetic pairs counted twice) past max_samples.
+    """
+    if method not in ('mc', 'rqmc'):
+        raise ValueError(f"Unknown adaptive method: {method}")
+    start = time.perf_counter()
+    sign = 1.0 if option_type == 'call' else -1.0
+    discount = np.exp(-r*T)
+    rng = np.random.default_rng(seed)
+    samplers = [qmc.Sobol(d=1, scramble=True, seed=rng) for _ in range(replicates)] \
+        if method == 'rqmc' else None
+
+    # Per-stream running sums of Y, X, Y^2, X^2 and XY (one stream per replicate)
+    streams = replicates if samplers is not None else 1
+    sums = np.zeros((streams, 5))
+    batch = 2**int(np.ceil(np.log2(max(initial_samples // streams, 2))))
+    # The first batch alone must fit too
+    while 2 * streams * batch > max_samples and batch > 1:
+        batch //= 2
+    per_stream = 0
+
+    while True:
+        for stream in range(streams):
+            if samplers is None:
+                z = rng.standard_normal(batch)
+            else:
+                z = norm_ppf(samplers[stream].random(batch)).ravel()
+            up = terminal_prices(S, T, r, sigma, z)
+            down = terminal_prices(S, T, r, sigma, -z)
+            y = discount * 0.5 * (np.maximum(sign*(up - K), 0) + np.maximum(sign*(down - K), 0))
+            x = discount * 0.5 * (up + down)
+            sums[stream] += (y.sum(), x.sum(), (y*y).sum(), (x*x).sum(), (x*y).sum())
+        per_stream += batch
+
+        price, std_error = _control_variate_estimate(sums, S, per_stream, samplers is not None)
+        n = streams * per_stream
+        elapsed = time.perf_counter() - start
+        converged = std_error <= tolerance
+        # Doubling keeps every Sobol replicate at a power-of-two size, so the
+        # next round would bring the total to 4n
+        if converged or 4*n > max_samples or (time_budget is not None and elapsed >= time_budget):
+            break
+        batch = per_stream
+
+    return {
+        'price': price,
+        'std_error': std_error,
+        'samples': 2 * n,
+        'converged': bool(converged),
+        'elapsed': elapsed
+    }
+
+def _control_variate_estimate(sums: np.ndarray, S: float, n: int, by_replicate: bool):
+    """Control-variate price and standard error from running sums"""
+    pooled = sums.sum(axis=0) / (n * len(sums))
+    mean_y, mean_x, mean_yy, mean_xx, mean_xy = pooled
+    var_x = mean_xx - mean_x**2
+    cov = mean_xy - mean_x*mean_y
+    beta = cov / var_x if var_x > 0 else 0.0
+
+    if by_replicate:
+        estimates = (sums[:, 0] - beta*sums[:, 1]) / n + beta*S
+        return float(estimates.mean()), float(estimates.std(ddof=1) / np.sqrt(len(estimates)))
+
+    residual_var = max(mean_yy - mean_y**2 - beta*cov, 0.0)
+    return float(mean_y - beta*(mean_x - S)), float(np.sqrt(residual_var / n))
+
+def stream_price(S: float, K: float, T: float, r: float, sigma: float,
+                 option_type: str = 'call', n_simulations: int = 2**20,
+                 chunk_size: int = 2**16, var_percentile: float = 5.0,
+                 bins: int = 2**14, method: str = 'rqmc', seed: int = 0) -> Dict:
+    """Price, VaR and CVaR of one contract in constant memory.
+
+    Paths are generated chunk_size at a time into one reused buffer with
+    in-place operations. The first pass merges per-chunk count/mean/M2
+    (Chan's parallel update) and tracks the payoff range; the second pass
+    regenerates the identical chunks from the same seed and fills a fixed
+    histogram of counts and payoff sums over that range, from which the
+    var_percentile quantile (VaR) and the mean payoff below it (CVaR) are
+    read. Quantile error is at most one bin width, and the common atom at
+    the lower end of the range (worthless expiry) is counted exactly.
+    """
+    if method not in ('mc', 'rqmc'):
+        raise ValueError(f"Unknown streaming method: {method}")
+    chunk_size = 2**int(np.log2(chunk_size))
+    n = chunk_size * int(np.ceil(max(n_simulations, chunk_size) / chunk_size))
+    if method == 'rqmc':
+        n = 2**int(np.ceil(np.log2(n)))
+    chunks = lambda: _payoff_chunks(S, K, T, r, sigma, option_type, n, chunk_size,
+                                    method, seed)
+
+    count, mean, m2 = 0, 0.0, 0.0
+    lo, hi = np.inf, -np.inf
+    for payoff in chunks():
+        size = payoff.size
+        chunk_mean = payoff.mean()
+        chunk_m2 = np.dot(payoff - chunk_mean, payoff - chunk_mean)
+        delta = chunk_mean - mean
+        total = count + size
+        mean += delta * size / total
+        m2 += chunk_m2 + delta**2 * count * size / total
+        count = total
+        lo, hi = min(lo, payoff.min()), max(hi, payoff.max())
+
+    width = (hi - lo) / bins
+    counts = np.zeros(bins)
+    sums = np.zeros(bins)
+    at_lo = 0
+    if width > 0:
+        for payoff in chunks():
+            at_lo += np.count_nonzero(payoff == lo)
+            index = np.minimum(((payoff - lo) / width).astype(np.int64), bins - 1)
+            counts += np.bincount(index, minlength=bins)
+            sums += np.bincount(index, weights=payoff, minlength=bins)
+
+    rank = count * var_percentile / 100
+    if width == 0 or rank <= at_lo:
+        var, cvar = lo, lo
+    else:
+        cumulative = np.cumsum(counts)
+        j = int(np.searchsorted(cumulative, rank))
+        before = cumulative[j - 1] if j > 0 else 0.0
+        fraction = (rank - before) / counts[j]
+        var = lo + width * (j + fraction)
+        cvar = (sums[:j].sum() + fraction * sums[j]) / rank
+
+    return {
+        'price': float(mean),
+        'std_error': float(np.sqrt(m2 / (count - 1) / count)),
+        'var': float(var),
+        'cvar': float(cvar),
+        'n_simulations': count,
+        'chunk_size': chunk_size
+    }
+
+def _payoff_chunks(S, K, T, r, sigma, option_type, n, chunk_size, method, seed):
+    """Yield discounted payoffs chunk by chunk, reusing one buffer"""
+    sign = 1.0 if option_type == 'call' else -1.0
+    discount = np.exp(-r*T)
+    sampler = qmc.Sobol(d=1, scramble=True, seed=seed) if method == 'rqmc' else None
+    rng = np.random.default_rng(seed)
+    buffer = np.empty(chunk_size)
+    for _ in range(n // chunk_size):
+        if sampler is not None:
+            buffer[:] = sampler.random(chunk_size)[:, 0]
+            norm_ppf(buffer, out=buffer)
+        else:
+            rng.standard_normal(out=buffer)
+        buffer *= sigma*np.sqrt(T)
+        buffer += (r - 0.5*sigma**2)*T
+        np.exp(buffer, out=buffer)
+        buffer *= S
+        buffer -= K
+        buffer *= sign
+        np.maximum(buffer, 0, out=buffer)
+        buffer *= discount
+        yield buffer
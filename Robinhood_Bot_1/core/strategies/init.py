@@ -1,5 +1,7 @@
+from .registry import STRATEGIES, MarketSnapshot, Strategy, OptionStructureStrategy, register, create_strategies, build_fetch_plan
 from .iron_condor import IronCondor
 from .iron_butterfly import IronButterfly
 from .trend_following import TrendFollowing
 
-__all__ = ['IronCondor', 'IronButterfly', 'TrendFollowing']
\ No newline at end of file
+__all__ = ['STRATEGIES', 'MarketSnapshot', 'Strategy', 'OptionStructureStrategy', 'register',
+           'create_strategies', 'build_fetch_plan', 'IronCondor', 'IronButterfly', 'TrendFollowing']
\ No newline at end of file
@@ -0,0 +1,294 @@
+import inspect
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional
+from ..pricing_context import PricingContext
+from ..pricing_dispatcher import pricing_dispatcher
+from ..probability import probability_engine
+from ..vol_surface import VolSurface
+from .structure_optimizer import LEGS, METRICS, search_structures
+
+REQUIREMENT_KINDS = ('quote', 'iv', 'chain', 'history', 'indicators')
+
+STRATEGIES = {}
+
+def register(name: str):
+    """Class decorator adding a strategy to the registry under its config key"""
+    def decorator(cls):
+        # Fail when the class is defined, not when create_strategies first builds it
+        if inspect.isabstract(cls):
+            raise TypeError(f"Strategy {name} does not implement "
+                            f"{', '.join(sorted(cls.__abstractmethods__))}")
+        cls.name = name
+        STRATEGIES[name] = cls
+        return cls
+    return decorator
+
+def create_strategies(config: Dict) -> Dict:
+    """Instantiate every registered strategy that has a config section"""
+    return {name: cls(config[name]) for name, cls in STRATEGIES.items() if name in config}
+
+class Strategy:
+    """Base for registered strategies.
+
+    requirements() declares the per-symbol inputs a strategy reads, as dicts
+    with a 'kind' of quote, iv, chain (max_dte), history (bars, interval) or
+    indicators (interval). prepare() sees the cycle's read-only MarketSnapshot
+    and registers any option legs with the shared PricingContext;
+    complete() turns what prepare() returned into opportunities once the
+    context has priced the legs.
+    """
+    name = None
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.enabled = config['enabled']
+
+    def requirements(self) -> List[Dict]:
+        return []
+
+    def prepare(self, snapshot: 'MarketSnapshot', context) -> List:
+        return []
+
+    def complete(self, prepared: List, context) -> List[Dict]:
+        return list(prepared)
+
+class OptionStructureStrategy(Strategy, ABC):
+    """Strategy that plans one priced four-leg option structure per symbol.
+
+    With a listed chain the best structure over its strikes comes from the
+    vectorized structure search; otherwise subclasses place the strikes
+    with _calculate_strikes(price). Every leg is registered with the
+    cycle's PricingContext in plan() and read back in finish(). Symbols
+    that fail are skipped and recorded in errors for the caller to log.
+    """
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        self.pricing = pricing_dispatcher
+        self.errors = []
+
+    def requirements(self) -> List[Dict]:
+        return [{'kind': 'quote'}, {'kind': 'iv'},
+                {'kind': 'chain', 'max_dte': self.config['max_dte']}]
+
+    def prepare(self, snapshot: 'MarketSnapshot', context) -> List[Dict]:
+        self.errors = []
+        plans = []
+        for symbol in snapshot.symbols:
+            price, iv = snapshot.quotes.get(symbol), snapshot.iv.get(symbol)
+            if not price or not iv:
+                continue
+            try:
+                plans.append(self.plan(context, symbol, price, iv, snapshot.surfaces.get(symbol),
+                                       snapshot.chains.get(symbol)))
+            except Exception as e:
+                self.errors.append((symbol, str(e)))
+        return [plan for plan in plans if plan is not None]
+
+    def complete(self, prepared: List[Dict], context) -> List[Dict]:
+        self.errors = []
+        opportunities = []
+        for plan in prepared:
+            try:
+                opportunities.append(self.finish(plan, context))
+            except Exception as e:
+                self.errors.append((plan['symbol'], str(e)))
+        return [opportunity for opportunity in opportunities if opportunity is not None]
+
+    def analyze(self, symbol: str, price: float, iv: float,
+                surface: Optional[VolSurface] = None,
+                chain: Optional[pd.DataFrame] = None,
+                context: Optional[PricingContext] = None) -> Dict:
+        """Full analysis of one structure, pricing its legs in a context of its own"""
+        context = context or PricingContext(self.pricing)
+        plan = self.plan(context, symbol, price, iv, surface, chain)
+        return self.finish(plan, context) if plan else None
+    
+    def plan(self, context: PricingContext, symbol: str, price: float, iv: float,
+             surface: Optional[VolSurface] = None,
+             chain: Optional[pd.DataFrame] = None) -> Optional[Dict]:
+        """Choose strikes and expiry, registering the legs with the cycle's pricing context"""
+        if not self.enabled:
+            return None
+            
+        if chain is not None:
+            # Best structure over the listed strikes, scored on bid/ask
+            width = self.config.get('max_wing_percent', self.config['width_percent'])
+            candidates = search_structures(
+                chain, price, iv, structure=self.name, max_width=price * width,
+                min_credit=self.config['min_credit'], top_n=self.config.get('top_n', 5),
+                rank_by=self.config.get('rank_by', 'expected_value'),
+                max_T=self.config['max_dte'] / 365.25
+            )
+            if candidates.empty:
+                return None
+            best = candidates.iloc[0]
+            plan = {
+                'strikes': {leg: float(best[leg]) for leg in LEGS},
+                'T': float(best['T']),
+                'expiration': best['expiration'],
+                'listed': best,
+                'candidates': candidates.to_dict('records')
+            }
+        else:
+            plan = {
+                'strikes': self._calculate_strikes(price),
+                'T': self.config['max_dte'] / 365.25
+            }
+            
+        plan.update(symbol=symbol, price=price, iv=iv)
+        # Price all legs in one vectorized pass once the context resolves
+        plan['legs'] = self._request_legs(context, price, plan['strikes'], plan['T'], iv, surface)
+        return plan
+    
+    def finish(self, plan: Dict, context: PricingContext) -> Optional[Dict]:
+        """Build the opportunity from a plan once the context has priced its legs"""
+        legs = {leg: context.get(key) for leg, key in plan['legs'].items()}
+        strikes = plan['strikes']
+        opportunity = {
+            'symbol': plan['symbol'],
+            'strategy': self.name,
+            'expiration_days': int(round(plan['T'] * 365.25)),
+            'strikes': strikes,
+            'legs': legs
+        }
+        
+        listed = plan.get('listed')
+        if listed is not None:
+            metrics = {metric: float(listed[metric]) for metric in METRICS}
+            opportunity.update(expiration=plan['expiration'], candidates=plan['candidates'])
+        else:
+            # Calculate strategy metrics
+            net_credit = legs['sell_call']['price'] + legs['sell_put']['price'] - \
+                        legs['buy_call']['price'] - legs['buy_put']['price']
+            
+            if net_credit < self.config['min_credit']:
+                return None
+                
+            # Worst case is expiring beyond the wider wing
+            width = max(strikes['buy_call'] - strikes['sell_call'],
+                        strikes['sell_put'] - strikes['buy_put'])
+            max_loss = width - net_credit
+            metrics = {
+                'net_credit': net_credit,
+                'max_loss': max_loss,
+                'risk_reward': net_credit / max_loss
+            }
+            
+        # Listed structures keep the POP and expected value scored on bid/ask
+        probabilities = self._calculate_probability(plan['price'], strikes, metrics['net_credit'],
+                                                    plan['iv'], plan['T'])
+        for metric, value in probabilities.items():
+            metrics.setdefault(metric, value)
+        metrics['greeks'] = self._calculate_greeks(legs)
+        opportunity['metrics'] = metrics
+        return opportunity
+    
+    def _request_legs(self, context: PricingContext, S: float, strikes: Dict, T: float,
+                      iv: float, surface: Optional[VolSurface] = None) -> Dict:
+        """Register every leg with the context (lattice for American puts, else closed form)"""
+        K = np.array([strikes[leg] for leg in strikes])
+        sigma = np.broadcast_to(surface.sigma(K, T) if surface is not None else iv, K.shape)
+        american = self.config.get('american', True)
+        return {
+            leg: context.request(S, K[i], T, sigma[i], 'call' if 'call' in leg else 'put', american)
+            for i, leg in enumerate(strikes)
+        }
+    
+    def _calculate_probability(self, S: float, strikes: Dict, net_credit: float, iv: float,
+                               T: float) -> Dict:
+        """Closed-form POP, expected P&L and short-strike touch probabilities"""
+        names = list(strikes)
+        result = probability_engine.evaluate(
+            S, T, 0.01, iv, strikes=[strikes[name] for name in names],
+            quantities=[-1 if 'sell' in name else 1 for name in names],
+            option_types=['call' if 'call' in name else 'put' for name in names],
+            premium=net_credit
+        )
+        return {
+            'probability_of_profit': float(result['probability_of_profit'][0]),
+            'expected_value': float(result['expected_pnl'][0]),
+            'touch_probability': {
+                name: float(p) for name, p in zip(names, result['touch_probability'][0])
+                if 'sell' in name
+            }
+        }
+    
+    def _calculate_greeks(self, legs: Dict) -> Dict:
+        """Calculate portfolio Greeks"""
+        greeks = {
+            'delta': 0,
+            'gamma': 0,
+            'theta': 0,
+            'vega': 0
+        }
+        
+        for leg, values in legs.items():
+            multiplier = -1 if 'sell' in leg else 1
+            greeks['delta'] += values['greeks']['delta'] * multiplier
+            greeks['gamma'] += values['greeks']['gamma'] * multiplier
+            greeks['theta'] += values['greeks']['theta'] * multiplier
+            greeks['vega'] += values['greeks']['vega'] * multiplier
+            
+        return greeks
+
+    @abstractmethod
+    def _calculate_strikes(self, price: float) -> Dict:
+        """Strikes for each leg around price when there is no listed chain to search"""
+
+def build_fetch_plan(strategies: Iterable[Strategy], extra: Iterable[Dict] = ()) -> Dict:
+    """Merge every enabled strategy's requirements into one deduplicated plan.
+
+    Chains are fetched once per symbol out to the longest max_dte, history
+    once per interval for the largest bar count, so overlapping needs cost a
+    single request each.
+    """
+    plan = {'quote': False, 'iv': False, 'chain': None, 'history': {}, 'indicators': set()}
+    requirements = [r for s in strategies if s.enabled for r in s.requirements()] + list(extra)
+    for requirement in requirements:
+        kind = requirement['kind']
+        if kind not in REQUIREMENT_KINDS:
+            raise ValueError(f"Unknown data requirement: {kind}")
+        if kind in ('quote', 'iv'):
+            plan[kind] = True
+        elif kind == 'chain':
+            plan['chain'] = max(plan['chain'] or 0, requirement.get('max_dte', 60))
+        elif kind == 'history':
+            interval = requirement.get('interval', '1d')
+            plan['history'][interval] = max(plan['history'].get(interval, 0),
+                                            requirement.get('bars', 252))
+        else:
+            plan['indicators'].add(requirement.get('interval', '1d'))
+    return plan
+
+class MarketSnapshot:
+    """Read-only view of one cycle's prefetched market data.
+
+    Every attribute is a mapping proxy keyed by symbol (history by
+    (symbol, interval)). Frames and chains are shared rather than copied,
+    and nothing isolates them on pandas < 3: strategies must copy a frame
+    before editing it, as TrendFollowing does with the close panel.
+    """
+
+    def __init__(self, symbols: List[str], quotes: Dict, iv: Dict, chains: Dict,
+                 history: Dict, indicators: Dict, surfaces: Optional[Dict] = None):
+        self.symbols = tuple(symbols)
+        self.quotes = MappingProxyType(dict(quotes))
+        self.iv = MappingProxyType(dict(iv))
+        self.chains = MappingProxyType(dict(chains))
+        self.history = MappingProxyType(dict(history))
+        self.indicators = MappingProxyType(dict(indicators))
+        self.surfaces = MappingProxyType(dict(surfaces or {}))
+        self._panels = {}
+
+    def close_panel(self, interval: str = '1d') -> pd.DataFrame:
+        """Time x symbol panel of closes, forward-filled over gaps (leading NaNs kept)"""
+        if interval not in self._panels:
+            closes = {symbol: self.history[(symbol, interval)]['Close'] for symbol in self.symbols
+                      if self.history.get((symbol, interval)) is not None}
+            self._panels[interval] = (pd.concat(closes, axis=1, sort=True).ffill()
+                                      if closes else pd.DataFrame())
+        return self._panels[interval]
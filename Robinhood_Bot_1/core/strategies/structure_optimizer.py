@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from ..probability import expected_payoff, prob_above
+
+STRUCTURES = ('iron_condor', 'iron_butterfly')
+LEGS = ('buy_put', 'sell_put', 'sell_call', 'buy_call')
+METRICS = ('net_credit', 'max_loss', 'probability_of_profit', 'risk_reward', 'expected_value')
+
+def search_structures(chain: pd.DataFrame, S: float, sigma: float, r: float = 0.01,
+                      structure: str = 'iron_condor', max_width: Optional[float] = None,
+                      min_credit: float = 0.0, top_n: int = 10, rank_by: str = 'expected_value',
+                      max_T: Optional[float] = None) -> pd.DataFrame:
+    """Best iron condors or butterflies over the listed strikes of every expiry.
+
+    chain is a get_option_chain frame (strike, bid, ask, expiration, T, type).
+    Per expiry, all put and call verticals with wings up to max_width are
+    enumerated as index arrays and cross-joined, then net credit (short legs
+    at the bid, long legs at the ask), max loss, POP between the breakevens
+    and expected value under a lognormal with sigma, and risk/reward are
+    computed for every combination at once; per-strike terms are evaluated
+    once and gathered by index. Returns the top_n rows by rank_by.
+    """
+    if structure not in STRUCTURES:
+        raise ValueError(f"Unknown structure: {structure}")
+    if rank_by not in METRICS:
+        raise ValueError(f"Cannot rank by {rank_by}")
+
+    frames = []
+    for expiration, quotes in chain.groupby('expiration', sort=False):
+        T = float(quotes['T'].iloc[0])
+        if T <= 0 or (max_T is not None and T > max_T):
+            continue
+        found = _search_expiry(quotes, S, sigma, r, T, structure, max_width, min_credit,
+                               top_n, rank_by)
+        frames.append(found.assign(expiration=expiration, T=T))
+
+    columns = ['expiration', 'T', *LEGS, *METRICS]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    # The overall top_n is contained in the union of the per-expiry top_n
+    return (pd.concat(frames, ignore_index=True)[columns]
+            .sort_values(rank_by, ascending=False, kind='stable')
+            .head(top_n)
+            .reset_index(drop=True))
+
+def _search_expiry(quotes: pd.DataFrame, S, sigma, r, T, structure, max_width, min_credit,
+                   top_n, rank_by) -> pd.DataFrame:
+    put_K, put_bid, put_ask = _side(quotes, 'put')
+    call_K, call_bid, call_ask = _side(quotes, 'call')
+    max_width = np.inf if max_width is None else max_width
+
+    # Put verticals sell the higher strike, call verticals sell the lower one
+    put_long, put_short = _verticals(put_K, max_width)
+    call_short, call_long = _verticals(call_K, max_width)
+    if structure == 'iron_condor':
+        put_otm = put_K[put_short] <= S
+        call_otm = call_K[call_short] >= S
+        put_long, put_short = put_long[put_otm], put_short[put_otm]
+        call_short, call_long = call_short[call_otm], call_long[call_otm]
+        pairs = put_K[put_short][:, None] < call_K[call_short][None, :]
+    else:
+        near = lambda K: np.abs(K - S) <= max_width
+        put_near = near(put_K[put_short])
+        call_near = near(call_K[call_short])
+        put_long, put_short = put_long[put_near], put_short[put_near]
+        call_short, call_long = call_short[call_near], call_long[call_near]
+        pairs = put_K[put_short][:, None] == call_K[call_short][None, :]
+    i, j = np.nonzero(pairs)
+    put_long, put_short = put_long[i], put_short[i]
+    call_short, call_long = call_short[j], call_long[j]
+
+    credit = (put_bid[put_short] - put_ask[put_long]) + (call_bid[call_short] - call_ask[call_long])
+    width = np.maximum(put_K[put_short] - put_K[put_long], call_K[call_long] - call_K[call_short])
+    max_loss = width - credit
+    keep = (credit >= min_credit) & (credit > 0) & (max_loss > 0)
+
+    lower = np.maximum(put_K[put_short][keep] - credit[keep], 1e-12)
+    upper = call_K[call_short][keep] + credit[keep]
+    pop = prob_above(S, lower, T, r, sigma) - prob_above(S, upper, T, r, sigma)
+    put_payout = expected_payoff(S, put_K, T, r, sigma, 'put')
+    call_payout = expected_payoff(S, call_K, T, r, sigma, 'call')
+    credit, max_loss = credit[keep], max_loss[keep]
+    metrics = {
+        'net_credit': credit,
+        'max_loss': max_loss,
+        'probability_of_profit': pop,
+        'risk_reward': credit / max_loss,
+        # Credit less the expected payout of both short verticals at expiry
+        'expected_value': credit - (
+            put_payout[put_short] - put_payout[put_long] +
+            call_payout[call_short] - call_payout[call_long]
+        )[keep]
+    }
+
+    score = metrics[rank_by]
+    best = np.argpartition(-score, top_n - 1)[:top_n] if score.size > top_n else np.arange(score.size)
+    best = best[np.argsort(-score[best], kind='stable')]
+    return pd.DataFrame({
+        'buy_put': put_K[put_long[keep][best]],
+        'sell_put': put_K[put_short[keep][best]],
+        'sell_call': call_K[call_short[keep][best]],
+        'buy_call': call_K[call_long[keep][best]],
+        **{name: values[best] for name, values in metrics.items()}
+    })
+
+def _side(quotes: pd.DataFrame, option_type: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Strike-sorted strike, bid and ask arrays for the usable quotes of one side"""
+    side = quotes[(quotes['type'] == option_type) & (quotes['ask'] > 0) & (quotes['bid'] >= 0)]
+    side = side.sort_values('strike').drop_duplicates('strike')
+    return tuple(side[column].to_numpy(dtype=float) for column in ('strike', 'bid', 'ask'))
+
+def _verticals(strikes: np.ndarray, max_width: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs (lower, higher) of every strike pair at most max_width apart"""
+    lower, higher = np.triu_indices(len(strikes), k=1)
+    keep = strikes[higher] - strikes[lower] <= max_width
+    return lower[keep], higher[keep]
@@ -1,33 +1,71 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional
-from ..utils.helpers import calculate_technical_indicators
+from typing import Dict, List, Optional
+from ..indicators import IndicatorState
+from ..market_calendar import is_trading_session
+from .registry import MarketSnapshot, Strategy, register
+from .trend_scanner import scan_trends, signal_records
 
-class TrendFollowing:
-    def __init__(self, config: Dict):
-        self.config = config
-        self.enabled = config['enabled']
+@register('trend_following')
+class TrendFollowing(Strategy):
+    def requirements(self) -> List[Dict]:
+        """A year of daily bars; incremental indicators unless scanning the panel"""
+        needs = [{'kind': 'quote'}, {'kind': 'history', 'bars': 252, 'interval': '1d'}]
+        if not self.config.get('panel_scan', True):
+            needs.append({'kind': 'indicators', 'interval': '1d'})
+        return needs
+    
+    def prepare(self, snapshot: MarketSnapshot, context=None) -> List[Dict]:
+        """Signals for the whole watchlist, one panel scan or per-symbol indicator reads"""
+        if not self.enabled:
+            return []
+        if not self.config.get('panel_scan', True):
+            signals = [self.analyze(indicators=snapshot.indicators.get((symbol, '1d')))
+                       for symbol in snapshot.symbols]
+            return [signal for signal in signals if signal is not None]
+            
+        panel = snapshot.close_panel('1d')
+        if panel.empty:
+            return []
+        # Today's quotes become the forming bar, but only on a session:
+        # weekend and holiday quotes are just the last close again
+        today = pd.Timestamp.now().normalize()
+        if is_trading_session(today):
+            current = pd.Series({symbol: snapshot.quotes.get(symbol) for symbol in panel.columns},
+                                dtype=float)
+            panel = panel.copy()
+            panel.loc[today] = current.fillna(panel.iloc[-1])
+        return signal_records(self.scan(panel))
         
-    def analyze(self, data: pd.DataFrame) -> Optional[Dict]:
-        """Analyze for trend following opportunities"""
-        if not self.enabled or len(data) < 50:
+    def analyze(self, data: Optional[pd.DataFrame] = None,
+                indicators: Optional[IndicatorState] = None) -> Optional[Dict]:
+        """Analyze for trend following opportunities.
+
+        Reads the latest values of an incremental indicator state; a bare
+        history frame is backfilled into a fresh state first.
+        """
+        if not self.enabled:
+            return None
+        if indicators is None and data is not None:
+            indicators = IndicatorState(data['symbol'].iloc[0])
+            indicators.backfill(data)
+        if indicators is None or indicators.bars < 50:
             return None
             
-        indicators = calculate_technical_indicators(data)
-        latest = indicators.iloc[-1]
+        latest = indicators.latest
         
         # Bullish signal
         if (latest['close'] > latest['sma_50'] and 
             latest['sma_20'] > latest['sma_50'] and
             latest['rsi'] < 70):
             return {
-                'symbol': data['symbol'].iloc[0],
+                'symbol': indicators.symbol,
                 'strategy': 'trend_following',
                 'direction': 'long',
                 'entry': latest['close'],
                 'stop_loss': latest['close'] * (1 - self.config['stop_loss_pct']),
                 'take_profit': latest['close'] * (1 + self.config['take_profit_pct']),
-                'indicators': latest.to_dict()
+                'indicators': dict(latest)
             }
             
         # Bearish signal
@@ -35,13 +73,19 @@ class TrendFollowing:
               latest['sma_20'] < latest['sma_50'] and
               latest['rsi'] > 30):
             return {
-                'symbol': data['symbol'].iloc[0],
+                'symbol': indicators.symbol,
                 'strategy': 'trend_following',
                 'direction': 'short',
                 'entry': latest['close'],
                 'stop_loss': latest['close'] * (1 + self.config['stop_loss_pct']),
                 'take_profit': latest['close'] * (1 - self.config['take_profit_pct']),
-                'indicators': latest.to_dict()
+                'indicators': dict(latest)
             }
             
-        return None
\ No newline at end of file
+        return None
+    
+    def scan(self, panel: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized signals for a whole watchlist from a time x symbol close panel"""
+        if not self.enabled or panel.empty:
+            return pd.DataFrame()
+        return scan_trends(panel, self.config['stop_loss_pct'], self.config['take_profit_pct'])
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+def scan_trends(panel: pd.DataFrame, stop_loss_pct: float, take_profit_pct: float,
+                fast: int = 20, slow: int = 50, rsi_window: int = 14,
+                overbought: float = 70, oversold: float = 30) -> pd.DataFrame:
+    """Trend-following signals for every symbol of a close panel in one pass.
+
+    Same rules as TrendFollowing.analyze: long when close and the fast SMA
+    are above the slow SMA with RSI below overbought, short on the mirror
+    image. SMAs come from one cumulative sum down the time axis and Wilder
+    RSI from one weighted sum per symbol (the recursion unrolled, seeded at
+    each symbol's own first bars), so the cost is a handful of array
+    operations regardless of universe size. Returns one row per signal.
+    """
+    closes = panel.to_numpy(dtype=float)
+    n_bars, _ = closes.shape
+    start = np.where(np.isnan(closes).all(axis=0), n_bars, np.isnan(closes).argmin(axis=0))
+    last = closes[-1]
+
+    filled = np.nan_to_num(closes)
+    cumulative = np.vstack([np.zeros(closes.shape[1]), np.cumsum(filled, axis=0)])
+    sma = lambda window, end: (cumulative[end] - cumulative[end - window]) / window
+    sma_fast, sma_slow = sma(fast, n_bars), sma(slow, n_bars)
+    previous_gap = sma(fast, n_bars - 1) - sma(slow, n_bars - 1) if n_bars > slow else np.nan
+    rsi = _wilder_rsi(filled, start, rsi_window)
+
+    eligible = (n_bars - start >= slow) & (n_bars - start > rsi_window)
+    long = eligible & (last > sma_slow) & (sma_fast > sma_slow) & (rsi < overbought)
+    short = eligible & (last < sma_slow) & (sma_fast < sma_slow) & (rsi > oversold)
+    side = np.where(long, 1.0, -1.0)
+    signal = long | short
+    return pd.DataFrame({
+        'symbol': panel.columns[signal],
+        'direction': np.where(long, 'long', 'short')[signal],
+        'entry': last[signal],
+        'stop_loss': (last * (1 - side*stop_loss_pct))[signal],
+        'take_profit': (last * (1 + side*take_profit_pct))[signal],
+        f'sma_{fast}': sma_fast[signal],
+        f'sma_{slow}': sma_slow[signal],
+        'rsi': rsi[signal],
+        # Fast SMA crossed the slow one on the last bar
+        'crossover': ((np.sign(sma_fast - sma_slow) != np.sign(previous_gap)) &
+                      (n_bars - start > slow))[signal]
+    })
+
+def _wilder_rsi(closes: np.ndarray, start: np.ndarray, window: int) -> np.ndarray:
+    """Latest Wilder RSI per column, matching IndicatorState's seeding"""
+    n_bars, n_symbols = closes.shape
+    change = np.diff(closes, axis=0, prepend=closes[:1])
+    # Nothing before a symbol's first bar (or its first change) counts
+    rows = np.arange(n_bars)[:, None]
+    change[rows <= start] = 0.0
+    gains, losses = np.maximum(change, 0), np.maximum(-change, 0)
+
+    seed = np.minimum(start + window, n_bars - 1)
+    alpha = 1 / window
+    decay = (1 - alpha) ** (n_bars - 1 - rows)
+    after_seed = rows > seed
+
+    def average(values: np.ndarray) -> np.ndarray:
+        cumulative = np.cumsum(values, axis=0)
+        seeded = cumulative[seed, np.arange(n_symbols)] / window
+        return (seeded * (1 - alpha) ** (n_bars - 1 - seed) +
+                alpha * (values * after_seed * decay).sum(axis=0))
+
+    avg_gain, avg_loss = average(gains), average(losses)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+
+def signal_records(signals: pd.DataFrame, indicators: Tuple[str, ...] = ('sma_20', 'sma_50', 'rsi')) -> list:
+    """Opportunity dicts in TrendFollowing.analyze's shape from a scan result"""
+    return [
+        {
+            'symbol': row['symbol'],
+            'strategy': 'trend_following',
+            'direction': row['direction'],
+            'entry': row['entry'],
+            'stop_loss': row['stop_loss'],
+            'take_profit': row['take_profit'],
+            'indicators': {'close': row['entry'], **{name: row[name] for name in indicators},
+                           'crossover': bool(row['crossover'])}
+        }
+        for row in signals.to_dict('records')
+    ]
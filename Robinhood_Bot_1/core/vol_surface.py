@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from scipy.interpolate import UnivariateSpline
+from scipy.optimize import least_squares
+from typing import Dict, Optional
+from .implied_vol import implied_volatility
+
+SMOOTHING_METHODS = ('linear', 'spline', 'svi')
+
+class VolSurface:
+    """Incrementally maintained implied-volatility surface for one underlying.
+
+    Each expiry slice stores per-contract quotes and IVs on a log-forward
+    moneyness grid. update() re-solves IV only for quotes that changed since
+    the last cycle (sticky strike for unchanged quotes while spot and time
+    stay within tolerance), and each slice keeps a cached spline or SVI fit
+    of total variance that is refitted lazily only after its quotes change.
+    """
+
+    def __init__(self, symbol: str, r: float = 0.01, smoothing: str = 'spline',
+                 spot_tolerance: float = 1e-3, time_tolerance: float = 1 / (365.25 * 24)):
+        if smoothing not in SMOOTHING_METHODS:
+            raise ValueError(f"Unknown smoothing method: {smoothing}")
+        self.symbol = symbol
+        self.r = r
+        self.smoothing = smoothing
+        self.spot_tolerance = spot_tolerance
+        self.time_tolerance = time_tolerance
+        self.spot = None
+        self._slices = {}
+        self.stats = {'solved': 0, 'reused': 0, 'fits': 0}
+
+    @property
+    def expirations(self):
+        return sorted(self._slices, key=lambda e: self._slices[e]['T'])
+
+    def update(self, expiration: str, T: float, spot: float, strikes, prices,
+               option_type) -> int:
+        """Replace one expiry slice with its full set of quotes, re-solving only changed IVs"""
+        strikes = np.asarray(strikes, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        types = np.broadcast_to(np.asarray(option_type), strikes.shape)
+        self.spot = spot
+
+        previous = self._slices.get(expiration)
+        stale = (
+            previous is None or
+            abs(spot / previous['spot'] - 1) > self.spot_tolerance or
+            abs(T - previous['T']) > self.time_tolerance
+        )
+        old_quotes = {} if stale else previous['quotes']
+
+        keys = list(zip(strikes.tolist(), types.tolist()))
+        changed = np.array([old_quotes.get(key, (None,))[0] != price
+                            for key, price in zip(keys, prices.tolist())], dtype=bool)
+
+        ivs = np.array([old_quotes[key][1] if not flag else np.nan
+                        for key, flag in zip(keys, changed)], dtype=float)
+        if changed.any():
+            solved = implied_volatility(prices[changed], spot, strikes[changed], T,
+                                        self.r, types[changed])
+            # Unconverged solves are left out of the fit like unquotable prices
+            ivs[changed] = np.where(solved['converged'], solved['iv'], np.nan)
+
+        quotes = {key: (price, iv) for key, price, iv in zip(keys, prices.tolist(), ivs.tolist())}
+        dirty = stale or changed.any() or quotes.keys() != old_quotes.keys()
+        self._slices[expiration] = {
+            'T': T if stale else previous['T'],
+            'spot': spot if stale else previous['spot'],
+            'quotes': quotes,
+            'fit': None if dirty else previous['fit'],
+            'params': previous['params'] if previous else None
+        }
+        self.stats['solved'] += int(changed.sum())
+        self.stats['reused'] += int((~changed).sum())
+        return int(changed.sum())
+
+    def update_from_chain(self, chain: pd.DataFrame, spot: float) -> int:
+        """Update every expiry in a chain with expiration, T, strike, type, bid, ask, lastPrice columns"""
+        quoted = (chain['bid'] > 0) & (chain['ask'] > 0)
+        market = np.where(quoted, (chain['bid'] + chain['ask']) / 2, chain['lastPrice'])
+        chain = chain.assign(market=market)
+
+        solved = 0
+        for expiration, data in chain.groupby('expiration'):
+            T = float(data['T'].iloc[0])
+            if T <= 0:
+                self._slices.pop(expiration, None)
+                continue
+            solved += self.update(expiration, T, spot, data['strike'].to_numpy(),
+                                  data['market'].to_numpy(), data['type'].to_numpy())
+
+        for expiration in set(self._slices) - set(chain['expiration']):
+            del self._slices[expiration]
+        return solved
+
+    def sigma(self, K, T):
+        """Volatility for any (K, T) from the cached slice fits"""
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        slices = sorted((s for s in self._slices.values() if self._fit(s) is not None),
+                        key=lambda s: s['T'])
+        if not slices:
+            raise ValueError(f"No volatility data for {self.symbol}")
+
+        flat_t = T.ravel()
+        k = np.log(K.ravel() / (self.spot * np.exp(self.r * flat_t)))
+        expiries = np.array([s['T'] for s in slices])
+        total_var = np.array([s['fit'](k) for s in slices])
+
+        # Linear in total variance between slices, flat volatility outside them
+        pos = np.searchsorted(expiries, flat_t)
+        hi = np.clip(pos, 0, len(slices) - 1)
+        lo = np.clip(pos - 1, 0, len(slices) - 1)
+        columns = np.arange(flat_t.size)
+        t_lo, t_hi = expiries[lo], expiries[hi]
+        w_lo, w_hi = total_var[lo, columns], total_var[hi, columns]
+        span = t_hi - t_lo
+        weight = np.divide(flat_t - t_lo, span, out=np.zeros_like(flat_t), where=span > 0)
+        w = np.where(span > 0, w_lo + weight * (w_hi - w_lo), w_lo / t_lo * flat_t)
+
+        result = np.sqrt(np.maximum(w, 1e-12) / flat_t).reshape(T.shape)
+        return float(result) if result.ndim == 0 else result
+
+    def smile(self, expiration: str) -> Dict:
+        """Raw per-contract moneyness and IV for one slice"""
+        s = self._slices[expiration]
+        strikes = np.array([key[0] for key in s['quotes']])
+        ivs = np.array([value[1] for value in s['quotes'].values()])
+        return {
+            'moneyness': np.log(strikes / (s['spot'] * np.exp(self.r * s['T']))),
+            'iv': ivs,
+            'T': s['T']
+        }
+
+    def _fit(self, s: Dict):
+        """Cached total-variance fit for a slice, refitted only when dirty"""
+        if s['fit'] is not None:
+            return s['fit']
+
+        forward = s['spot'] * np.exp(self.r * s['T'])
+        points = {}
+        for (strike, option_type), (_, iv) in s['quotes'].items():
+            otm = (option_type == 'call') == (strike >= forward)
+            if np.isfinite(iv) and (otm or strike not in points):
+                points[strike] = iv
+        if not points:
+            return None
+
+        strikes = np.array(sorted(points))
+        k = np.log(strikes / forward)
+        w = np.array([points[x] for x in strikes])**2 * s['T']
+        self.stats['fits'] += 1
+
+        if self.smoothing == 'svi' and len(k) >= 5:
+            s['params'] = _fit_svi(k, w, s['params'])
+            s['fit'] = lambda x, p=s['params']: _svi(x, p)
+        elif self.smoothing == 'spline' and len(k) >= 4:
+            spline = UnivariateSpline(k, w, k=3, s=len(k) * (0.01 * w.mean())**2)
+            s['fit'] = lambda x: spline(np.clip(x, k[0], k[-1]))
+        else:
+            s['fit'] = lambda x: np.interp(x, k, w)
+        return s['fit']
+
+def _svi(k, params) -> np.ndarray:
+    """Raw SVI total variance"""
+    a, b, rho, m, s = params
+    return a + b * (rho * (k - m) + np.sqrt((k - m)**2 + s**2))
+
+def _fit_svi(k: np.ndarray, w: np.ndarray, initial: Optional[np.ndarray]) -> np.ndarray:
+    """Least-squares raw SVI fit, warm-started from the previous cycle's parameters"""
+    if initial is None:
+        initial = np.array([w.min() * 0.5, 0.1, 0.0, 0.0, 0.1])
+    lower = [-w.max(), 0.0, -0.999, -1.0, 1e-4]
+    upper = [w.max(), 5.0, 0.999, 1.0, 2.0]
+    result = least_squares(lambda p: _svi(k, p) - w, np.clip(initial, lower, upper),
+                           bounds=(lower, upper))
+    return result.x
@@ -7,32 +7,44 @@ import os
 from pathlib import Path
 from typing import Optional, Dict, Any
 import pandas as pd
+from core.bar_store import BarStore, migrate_csv
 
 # Initialize directories
 DATA_DIR = Path(__file__).parent
 HISTORICAL_DIR = DATA_DIR / "historical"
+STORE_DIR = DATA_DIR / "store"
 OUTPUTS_DIR = DATA_DIR / "outputs"
 
 # Create directories if they don't exist
 os.makedirs(HISTORICAL_DIR, exist_ok=True)
 os.makedirs(OUTPUTS_DIR, exist_ok=True)
 
+store = BarStore(STORE_DIR)
+
 def get_historical_path(symbol: str) -> Path:
-    """Get path for historical data file"""
+    """Get path for a legacy historical CSV file"""
     return HISTORICAL_DIR / f"{symbol.upper()}.csv"
 
-def save_historical_data(symbol: str, data: pd.DataFrame) -> None:
-    """Save historical data to CSV"""
-    path = get_historical_path(symbol)
-    data.to_csv(path, index=False)
-    print(f"Saved historical data to {path}")
+def save_historical_data(symbol: str, data: pd.DataFrame, interval: str = '1d') -> None:
+    """Save historical data (DatetimeIndex or Date column) to the columnar store"""
+    if not isinstance(data.index, pd.DatetimeIndex):
+        data = data.set_index(pd.DatetimeIndex(pd.to_datetime(data['Date']), name='Date')) \
+            .drop(columns='Date')
+    store.write(symbol, data, interval)
+    print(f"Saved historical data for {symbol.upper()} to {STORE_DIR}")
+
+def append_historical_data(symbol: str, bars: pd.DataFrame, interval: str = '1d') -> int:
+    """Atomically merge new bars into the stored history"""
+    return store.append(symbol, bars, interval)
+
+def load_historical_data(symbol: str, start=None, end=None,
+                         interval: str = '1d') -> Optional[pd.DataFrame]:
+    """Load stored bars between start and end (inclusive), memory-mapped"""
+    return store.load(symbol, interval, start=start, end=end)
 
-def load_historical_data(symbol: str) -> Optional[pd.DataFrame]:
-    """Load historical data from CSV"""
-    path = get_historical_path(symbol)
-    if path.exists():
-        return pd.read_csv(path)
-    return None
+def migrate_historical_csvs(interval: str = '1d', remove: bool = False) -> Dict[str, int]:
+    """One-shot import of the per-symbol CSVs in historical/ into the store"""
+    return migrate_csv(store, HISTORICAL_DIR, interval, remove)
 
 def save_backtest_results(strategy: str, results: Dict[str, Any]) -> Path:
     """Save backtest results to JSON"""
@@ -51,6 +63,8 @@ def cleanup_old_files(max_files: int = 100) -> None:
 __all__ = [
     'get_historical_path',
     'save_historical_data',
+    'append_historical_data',
     'load_historical_data',
+    'migrate_historical_csvs',
     'save_backtest_results'
 ]
\ No newline at end of file
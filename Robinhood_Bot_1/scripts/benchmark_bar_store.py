@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.bar_store import BarStore  # noqa: E402
+
+MINUTES_PER_SESSION = 390
+
+def minute_bars(years: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic regular-session OHLCV minute bars for about years of trading days"""
+    sessions = pd.bdate_range('2020-01-02', periods=252 * years)
+    index = (sessions.repeat(MINUTES_PER_SESSION) + pd.Timedelta(hours=9, minutes=30) +
+             pd.to_timedelta(np.tile(np.arange(MINUTES_PER_SESSION), len(sessions)), unit='min'))
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(0.0005 * rng.standard_normal(len(index))))
+    spread = np.abs(0.0003 * rng.standard_normal(len(index))) * close
+    return pd.DataFrame({
+        'Open': np.roll(close, 1), 'High': close + spread, 'Low': close - spread,
+        'Close': close, 'Volume': rng.integers(100, 10000, len(index))
+    }, index=pd.DatetimeIndex(index, name='Datetime'))
+
+def best_time(load: Callable[[], pd.DataFrame], repeats: int) -> Dict:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        data = load()
+        # Touch every close so lazily mapped pages are actually read
+        float(np.asarray(data['Close']).sum())
+        times.append(time.perf_counter() - start)
+    return {'seconds': min(times), 'rows': len(data)}
+
+def time_append(store: BarStore, bars: pd.DataFrame) -> Dict:
+    """One new session appended to the last year's partition"""
+    session = bars.iloc[-MINUTES_PER_SESSION:]
+    session = session.set_axis(session.index + pd.Timedelta(days=1))
+    start = time.perf_counter()
+    added = store.append('SPY', session, '1m')
+    return {'seconds': time.perf_counter() - start, 'rows': added}
+
+def run_benchmarks(years: int = 3, repeats: int = 3) -> Dict:
+    """CSV versus columnar store load times for one symbol's multi-year minute bars"""
+    bars = minute_bars(years)
+    last_month = (bars.index[-1] - pd.DateOffset(months=1), bars.index[-1])
+    with tempfile.TemporaryDirectory() as root:
+        csv = Path(root) / 'SPY.csv'
+        start = time.perf_counter()
+        bars.to_csv(csv)
+        csv_write = time.perf_counter() - start
+        store = BarStore(Path(root) / 'store')
+        start = time.perf_counter()
+        store.write('SPY', bars, '1m')
+        store_write = time.perf_counter() - start
+
+        read_csv = lambda: pd.read_csv(csv, parse_dates=['Datetime'], index_col='Datetime')
+        results = {
+            'csv_write': {'seconds': csv_write, 'rows': len(bars)},
+            'store_write': {'seconds': store_write, 'rows': len(bars)},
+            'csv_full': best_time(read_csv, repeats),
+            'store_full': best_time(lambda: store.load('SPY', '1m'), repeats),
+            'csv_last_month': best_time(lambda: read_csv().loc[last_month[0]:last_month[1]], repeats),
+            'store_last_month': best_time(lambda: store.load('SPY', '1m', *last_month), repeats),
+            'store_append_day': time_append(store, bars)
+        }
+    return {
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'pandas': pd.__version__, 'platform': platform.platform()},
+        'bars': len(bars),
+        'results': results
+    }
+
+def print_report(results: Dict):
+    print(f"{results['bars']} minute bars")
+    print(f"{'case':20} {'seconds':>10} {'rows':>10}")
+    for case, r in results['results'].items():
+        print(f"{case:20} {r['seconds']:10.4f} {r['rows']:10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark CSV against columnar store loads')
+    parser.add_argument('--years', type=int, default=3, help='Years of minute bars to generate')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', default=None, help='Also write this run as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.years, args.repeats)
+    print_report(results)
+    if args.output:
+        target = Path(args.output)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(results, indent=2))
+        print(f"Wrote {target}")
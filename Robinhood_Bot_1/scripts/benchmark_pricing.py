@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.fast_math import norm_cdf, norm_pdf, norm_ppf  # noqa: E402
+from core.pricing_models import PricingModels  # noqa: E402
+from core.strategies.structure_optimizer import search_structures  # noqa: E402
+from core.strategies.trend_scanner import scan_trends  # noqa: E402
+
+MONEYNESS = (0.8, 0.9, 1.0, 1.1, 1.2)
+EXPIRIES = (0.05, 0.25, 1.0)
+VOLS = (0.15, 0.3, 0.6)
+BATCH_SIZES = (1, 64, 1024)
+RATE = 0.02
+SPOT = 100.0
+# Wall-clock ceilings a case must meet regardless of the baseline: seconds, or
+# for cases timed against a reference_seconds, a fraction of that reference
+BUDGETS = {
+    'structure_search[condors]': 1.0,
+    'trend_scan[500]': 0.1,
+    'norm_cdf[scalar]': 0.2,
+    'norm_pdf[scalar]': 0.2,
+    'norm_ppf[scalar]': 0.2
+}
+SCALAR_CALLS = 2000
+
+def contract_grid(batch_size: int) -> Dict[str, np.ndarray]:
+    """Moneyness x expiry x vol grid, tiled or truncated to batch_size contracts"""
+    grid = np.array(list(itertools.product(MONEYNESS, EXPIRIES, VOLS)))
+    rows = np.resize(np.arange(len(grid)), batch_size)
+    moneyness, T, sigma = grid[rows].T
+    return {
+        'K': SPOT / moneyness,
+        'T': T,
+        'sigma': sigma,
+        'option_type': np.where(np.arange(batch_size) % 2 == 0, 'call', 'put')
+    }
+
+def engines(pricing: PricingModels) -> Dict[str, Callable[[Dict], np.ndarray]]:
+    """Every engine priced European so the closed form is an exact reference"""
+    per_contract = lambda price: lambda c: np.array([
+        price(K, T, sigma, option_type)
+        for K, T, sigma, option_type in zip(c['K'], c['T'], c['sigma'], c['option_type'])
+    ])
+    return {
+        'black_scholes': per_contract(lambda K, T, sigma, option_type: pricing.black_scholes(
+            SPOT, K, T, RATE, sigma, option_type)['price']),
+        'black_scholes_batch': lambda c: pricing.black_scholes_batch(
+            SPOT, c['K'], c['T'], RATE, c['sigma'], c['option_type'])['price'],
+        'quasi_monte_carlo': per_contract(lambda K, T, sigma, option_type: pricing.quasi_monte_carlo(
+            SPOT, K, T, RATE, sigma, option_type, n_simulations=2**14)['price']),
+        'binomial_tree': per_contract(lambda K, T, sigma, option_type: pricing.binomial_tree(
+            SPOT, K, T, RATE, sigma, n_steps=100, option_type=option_type)['price']),
+        'lattice': lambda c: pricing.lattice(
+            SPOT, c['K'], c['T'], RATE, c['sigma'], c['option_type'], american=False,
+            n_steps=200, richardson=True)['price'],
+        'finite_difference': per_contract(lambda K, T, sigma, option_type: pricing.finite_difference(
+            SPOT, K, T, RATE, sigma, option_type, american=False, grid_points=400)['price']),
+    }
+
+def listed_chain(pricing: PricingModels, strikes: np.ndarray, expiries) -> pd.DataFrame:
+    """Quoted calls and puts at every strike for each (expiration, T), 0.05 either side of mid"""
+    rows = []
+    for expiration, T in expiries:
+        for option_type in ('call', 'put'):
+            mid = pricing.black_scholes_batch(SPOT, strikes, T, 0.01, 0.3, option_type)['price']
+            rows.append(pd.DataFrame({'strike': strikes, 'bid': np.maximum(mid - 0.05, 0),
+                                      'ask': mid + 0.05, 'expiration': expiration, 'T': T,
+                                      'type': option_type}))
+    return pd.concat(rows, ignore_index=True)
+
+def time_structure_search(pricing: PricingModels, repeats: int) -> Dict:
+    """Hundreds of thousands of condors across two expiries, as searched in one cycle"""
+    chain = listed_chain(pricing, np.arange(50.0, 151.0), (('near', 0.05), ('far', 0.12)))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        search_structures(chain, SPOT, 0.3, max_width=10, top_n=3)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    search_structures(chain, SPOT, 0.3, max_width=10, top_n=3)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds': min(times),
+        'per_contract_us': min(times) / len(chain) * 1e6,
+        'peak_bytes': peak,
+        'max_abs_error': 0.0,
+        'max_rel_error': 0.0
+    }
+
+def trend_panel(n_symbols: int, bars: int = 252) -> pd.DataFrame:
+    """A year of closes for n_symbols, with staggered listing dates, forward-filled as scanned"""
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2024-01-01', periods=bars, name='Date')
+    columns = {}
+    for i in range(n_symbols):
+        start = int(rng.integers(0, bars - 32))
+        drift = 0.003 * rng.standard_normal()
+        close = 100 * np.exp(np.cumsum(drift + 0.015 * rng.standard_normal(bars - start)))
+        columns[f'S{i}'] = pd.Series(close, index=index[start:])
+    return pd.concat(columns, axis=1, sort=True).ffill()
+
+def time_trend_scan(repeats: int, n_symbols: int = 500) -> Dict:
+    """One vectorized trend scan over a whole watchlist panel"""
+    panel = trend_panel(n_symbols)
+    scan_trends(panel, 0.05, 0.1)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scan_trends(panel, 0.05, 0.1)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    scan_trends(panel, 0.05, 0.1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds': min(times),
+        'per_contract_us': min(times) / n_symbols * 1e6,
+        'peak_bytes': peak,
+        'max_abs_error': 0.0,
+        'max_rel_error': 0.0
+    }
+
+def time_scalar_kernels(repeats: int) -> Dict:
+    """Per-call cost of the scalar fast_math kernels against scipy.stats.norm"""
+    kernels = {'norm_cdf': (norm_cdf, norm.cdf, np.linspace(-37, 8, 901)),
+               'norm_pdf': (norm_pdf, norm.pdf, np.linspace(-37, 8, 901)),
+               'norm_ppf': (norm_ppf, norm.ppf, np.linspace(1e-6, 1 - 1e-6, 999))}
+    results = {}
+    for name, (fast, reference, grid) in kernels.items():
+        best = lambda f: min(timeit.repeat(lambda: f(0.3), number=SCALAR_CALLS,
+                                           repeat=max(repeats, 5)))
+        seconds = best(fast)
+        error = np.abs(np.array([fast(float(x)) for x in grid]) - reference(grid))
+        results[f'{name}[scalar]'] = {
+            'seconds': seconds,
+            'reference_seconds': best(reference),
+            'per_contract_us': seconds / SCALAR_CALLS * 1e6,
+            'peak_bytes': 0,
+            'max_abs_error': float(error.max()),
+            'max_rel_error': float((error / np.maximum(np.abs(reference(grid)), 1e-300)).max())
+        }
+    return results
+
+def measure(price: Callable[[Dict], np.ndarray], contracts: Dict, reference: np.ndarray,
+            repeats: int) -> Dict:
+    """Best wall time over repeats, peak traced memory and error against reference"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        prices = price(contracts)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    price(contracts)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    error = np.abs(np.asarray(prices, dtype=float) - reference)
+    return {
+        'seconds': min(times),
+        'per_contract_us': min(times) / len(reference) * 1e6,
+        'peak_bytes': peak,
+        'max_abs_error': float(error.max()),
+        'max_rel_error': float((error / np.maximum(reference, 1e-2)).max())
+    }
+
+def run_benchmarks(batch_sizes=BATCH_SIZES, repeats: int = 3,
+                   only: List[str] = None) -> Dict:
+    """Run every engine over the standard grid at each batch size"""
+    pricing = PricingModels()
+    results = {}
+    for batch_size in batch_sizes:
+        contracts = contract_grid(batch_size)
+        reference = pricing.black_scholes_batch(SPOT, contracts['K'], contracts['T'], RATE,
+                                                contracts['sigma'],
+                                                contracts['option_type'])['price']
+        for name, price in engines(pricing).items():
+            if only and name not in only:
+                continue
+            # Per-contract engines scale linearly, so cap their largest batches
+            if batch_size > 64 and name in ('quasi_monte_carlo', 'finite_difference',
+                                            'binomial_tree'):
+                continue
+            results[f'{name}[{batch_size}]'] = measure(price, contracts, reference, repeats)
+    if not only or 'structure_search' in only:
+        results['structure_search[condors]'] = time_structure_search(pricing, repeats)
+    if not only or 'scalar_kernels' in only:
+        results.update(time_scalar_kernels(repeats))
+    if not only or 'trend_scan' in only:
+        results['trend_scan[500]'] = time_trend_scan(repeats)
+    return {
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'platform': platform.platform()},
+        'results': results
+    }
+
+def compare(results: Dict, baseline: Dict, time_tolerance: float = 0.25,
+            error_tolerance: float = 0.5, min_seconds: float = 1e-3) -> List[str]:
+    """Regressions of results against baseline (slower or less accurate beyond tolerance)
+    and cases over their absolute time budget"""
+    regressions = []
+    for case, current in results['results'].items():
+        if case in BUDGETS:
+            budget = BUDGETS[case] * current.get('reference_seconds', 1.0)
+            if current['seconds'] > budget:
+                regressions.append(f"{case}: {current['seconds']:.4f}s over the "
+                                   f"{budget:.4f}s budget")
+        previous = baseline['results'].get(case)
+        if previous is None:
+            continue
+        allowed = max(previous['seconds'] * (1 + time_tolerance), previous['seconds'] + min_seconds)
+        if current['seconds'] > allowed:
+            regressions.append(f"{case}: {current['seconds']:.4f}s vs baseline "
+                               f"{previous['seconds']:.4f}s")
+        allowed = previous['max_abs_error'] * (1 + error_tolerance) + 1e-12
+        if current['max_abs_error'] > allowed:
+            regressions.append(f"{case}: max error {current['max_abs_error']:.2e} vs baseline "
+                               f"{previous['max_abs_error']:.2e}")
+    return regressions
+
+def print_report(results: Dict):
+    print(f"{'case':32} {'seconds':>10} {'us/contract':>12} {'peak KB':>10} {'max abs err':>12}")
+    for case, r in results['results'].items():
+        print(f"{case:32} {r['seconds']:10.4f} {r['per_contract_us']:12.1f} "
+              f"{r['peak_bytes'] / 1024:10.1f} {r['max_abs_error']:12.2e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark pricing engines for speed and accuracy')
+    parser.add_argument('--output', default='benchmarks/pricing_results.json',
+                        help='Where to write this run as JSON')
+    parser.add_argument('--baseline', default='benchmarks/pricing_baseline.json',
+                        help='Stored baseline to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store this run as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed fractional slowdown before a case fails')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--engine', action='append', help='Only run these engines')
+    args = parser.parse_args()
+
+    results = run_benchmarks(repeats=args.repeats, only=args.engine)
+    print_report(results)
+
+    target = Path(args.baseline if args.save_baseline else args.output)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {target}")
+
+    baseline = Path(args.baseline)
+    if not args.save_baseline and baseline.exists():
+        regressions = compare(results, json.loads(baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.bar_store import BarStore, migrate_csv  # noqa: E402
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import per-symbol historical CSVs into the columnar store")
+    parser.add_argument('--source', default='data/historical', help="Directory of <SYMBOL>.csv files")
+    parser.add_argument('--store', default='data/store', help="Columnar store root")
+    parser.add_argument('--interval', default='1d', help="Bar interval of the CSVs (e.g. 1d, 1m)")
+    parser.add_argument('--remove', action='store_true', help="Delete each CSV once imported")
+    args = parser.parse_args()
+
+    try:
+        migrated = migrate_csv(BarStore(args.store), args.source, args.interval, args.remove)
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+    for symbol, rows in migrated.items():
+        print(f"{symbol}: {rows} bars")
+    print(f"Migrated {len(migrated)} symbols to {args.store}")
@@ -0,0 +1,218 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from core.data_cache import DataCache, interval_ttl
+from core.data_handler import DataHandler
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({'Close': np.arange(rows, dtype=float)},
+                        index=pd.date_range('2024-01-01', periods=rows, name='Date'))
+
+def test_data_cache_ttl_budget_and_stale_refresh():
+    assert interval_ttl('5m') == 300 and interval_ttl('1d') == 86400
+    with pytest.raises(ValueError):
+        interval_ttl('1y')
+
+    size = int(frame(100).memory_usage(deep=True, index=True).sum())
+    cache = DataCache(max_bytes=3 * size, quote_ttl=0.05, stale_factor=4.0)
+    assert cache.ttl(('history', 'SPY', '1h', '1mo')) == 3600
+    for symbol in ('SPY', 'QQQ', 'IWM'):
+        cache.put(('history', symbol, '1d', '1y'), frame(100))
+    cache.get(('history', 'SPY', '1d', '1y'))
+    cache.put(('history', 'DIA', '1d', '1y'), frame(100))
+    # QQQ was least recently used
+    assert cache.lookup(('history', 'QQQ', '1d', '1y')) is None
+    assert cache.info()['bytes'] == 3 * size and cache.stats['evictions'] == 1
+
+    loads = []
+    def load():
+        loads.append(time.monotonic())
+        return 100.0 + len(loads)
+    assert cache.get(('quote', 'SPY'), load) == 101.0
+    assert cache.get(('quote', 'SPY'), load) == 101.0
+    time.sleep(0.08)
+    # Expired but within the stale window: served while a worker reloads it
+    assert cache.get(('quote', 'SPY'), load) == 101.0
+    deadline = time.monotonic() + 2
+    while cache.stats['refreshes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get(('quote', 'SPY'), load) == 102.0
+    assert cache.stats['stale_hits'] == 1 and len(loads) == 2
+
+    time.sleep(0.4)
+    # Past the stale window the caller reloads synchronously
+    assert cache.get(('quote', 'SPY'), load) == 103.0
+    assert cache.stats['expirations'] == 1
+    cache.close()
+
+
+def test_data_handler_caches_history_and_quotes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'historical').mkdir(parents=True)
+    for symbol in ('SPY', 'QQQ'):
+        frame(300).assign(High=lambda d: d['Close'] + 1, Low=lambda d: d['Close'] - 1) \
+            .to_csv(tmp_path / 'data' / 'historical' / f'{symbol}.csv')
+
+    handler = DataHandler(offline_mode=True, cache={'max_bytes': 1024**2})
+    reads = []
+    load = handler._load_from_disk
+    monkeypatch.setattr(handler, '_load_from_disk', lambda symbol, *args: reads.append(symbol) or load(symbol, *args))
+    first = handler.get_historical_bulk(['SPY', 'QQQ'])
+    again = handler.get_historical('SPY')
+    assert again is first['SPY'] and sorted(reads) == ['QQQ', 'SPY']
+    assert handler.get_quotes(['SPY', 'QQQ']) == {'SPY': 299.0, 'QQQ': 299.0}
+    assert handler.cache.lookup(('quote', 'SPY')) == 299.0
+    assert len(reads) == 2 and handler.cache.stats['evictions'] == 0
+
+
+def test_data_handler_reloads_expired_quotes_in_one_batch(monkeypatch):
+    handler = DataHandler(cache={'quote_ttl': 0.05, 'stale_factor': 10.0})
+    batches = []
+    def load_quotes(symbols):
+        batches.append(list(symbols))
+        return {symbol: 100.0 + len(batches) for symbol in symbols}
+    monkeypatch.setattr(handler, '_load_quotes', load_quotes)
+
+    assert handler.get_quotes(['SPY', 'QQQ']) == {'SPY': 101.0, 'QQQ': 101.0}
+    assert handler.get_quotes(['SPY', 'QQQ']) == {'SPY': 101.0, 'QQQ': 101.0}
+    assert batches == [['SPY', 'QQQ']]
+    time.sleep(0.08)
+    # Still inside the stale window, but quotes are only ever served fresh
+    assert handler.get_quotes(['SPY', 'QQQ']) == {'SPY': 102.0, 'QQQ': 102.0}
+    assert batches == [['SPY', 'QQQ']] * 2 and handler.cache.stats['stale_hits'] == 0
+
+
+def test_fetch_solves_atm_iv_from_the_chain(monkeypatch):
+    from core.pricing_models import PricingModels
+    pricing = PricingModels()
+    strikes = np.arange(80.0, 121.0, 5.0)
+    rows = []
+    for T, sigma in ((0.02, 0.4), (30 / 365.25, 0.3)):
+        for option_type in ('call', 'put'):
+            mid = pricing.black_scholes_batch(100.0, strikes, T, 0.01, sigma, option_type)['price']
+            rows.append(pd.DataFrame({'strike': strikes, 'bid': mid - 0.01, 'ask': mid + 0.01,
+                                      'lastPrice': mid, 'expiration': str(T), 'T': T,
+                                      'type': option_type}))
+    chain = pd.concat(rows, ignore_index=True)
+
+    handler = DataHandler()
+    requested = []
+    monkeypatch.setattr(handler, 'get_quotes', lambda symbols: {s: 100.0 for s in symbols})
+    monkeypatch.setattr(handler, 'get_option_chain',
+                        lambda symbol, max_dte: requested.append(max_dte) or
+                        (chain if symbol != 'IWM' else None))
+    plan = {'quote': False, 'iv': True, 'chain': None, 'history': {}, 'indicators': set()}
+    data = handler.fetch(plan, ['SPY', 'QQQ', 'IWM'], {'iv': {'QQQ': 0.2}})
+    # The expiry nearest a month out, unless the caller already knows the IV
+    assert data['iv']['SPY'] == pytest.approx(0.3, abs=1e-4)
+    assert data['iv']['QQQ'] == 0.2 and 'IWM' not in data['iv']
+    assert requested == [60] * 3
+    handler.cache.close()
+
+
+def test_background_history_refresh_leaves_indicator_state_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'historical').mkdir(parents=True)
+    frame(300).assign(High=lambda d: d['Close'] + 1, Low=lambda d: d['Close'] - 1) \
+        .to_csv(tmp_path / 'data' / 'historical' / 'SPY.csv')
+    handler = DataHandler(offline_mode=True, cache={'stale_factor': 100.0})
+    state = handler.get_indicators('SPY')
+    state.update(500.0, timestamp=pd.Timestamp('2024-10-27'))
+    saved = tmp_path / 'data' / 'indicators' / 'SPY_1d.json'
+    written = saved.stat().st_mtime_ns
+
+    key = ('history', 'SPY', '1d', '1y')
+    handler.cache.put(key, handler.cache.lookup(key), ttl=0.01)
+    time.sleep(0.02)
+    stale = handler.get_historical('SPY')
+    deadline = time.monotonic() + 2
+    while handler.cache.stats['refreshes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    refreshed = handler.get_historical('SPY')
+    # The worker rebuilt the frame's indicator columns but not the live state or its file
+    assert refreshed is not stale and 'sma_20' in refreshed.columns
+    assert handler.indicators[('SPY', '1d')] is state and state.bars == 301
+    assert saved.stat().st_mtime_ns == written
+    handler.cache.close()
+
+
+def test_bar_store_ranges_appends_and_migrates(tmp_path, monkeypatch):
+    from core.bar_store import BarStore, migrate_csv
+    index = pd.date_range('2022-12-30 15:58', periods=6, freq='min', name='Datetime')
+    bars = pd.DataFrame({'Close': np.arange(6.0), 'Volume': np.arange(6) * 100}, index=index)
+    bars.index = pd.DatetimeIndex([*index[:3], *(index[3:] + pd.DateOffset(days=3))], name='Datetime')
+    store = BarStore(tmp_path / 'store')
+    store.write('spy', bars, '1m')
+    assert store.years('SPY', '1m') == [2022, 2023]
+    pd.testing.assert_frame_equal(store.load('SPY', '1m'), bars)
+
+    january = store.load('SPY', '1m', start='2023-01-01')
+    assert list(january['Close']) == [3.0, 4.0, 5.0] and january['Volume'].dtype == np.int64
+    # Single-partition ranges are views of the memory-mapped files
+    values = january['Close'].to_numpy()
+    while values.base is not None and not isinstance(values, np.memmap):
+        values = values.base
+    assert isinstance(values, np.memmap)
+
+    update = bars.iloc[-2:].assign(Close=[40.0, 50.0])
+    update.index = update.index + pd.Timedelta(minutes=1)
+    assert store.append('SPY', update, '1m') == 1
+    assert list(store.load('SPY', '1m', start='2023-01-01')['Close']) == [3.0, 4.0, 40.0, 50.0]
+    assert store.last_timestamp('SPY', '1m') == update.index[-1]
+    assert len(list((tmp_path / 'store' / '1m' / 'SPY' / '2023').iterdir())) == 2
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'historical').mkdir(parents=True)
+    frame(400).assign(High=lambda d: d['Close'] + 1, Low=lambda d: d['Close'] - 1) \
+        .to_csv(tmp_path / 'data' / 'historical' / 'QQQ.csv')
+    assert migrate_csv(BarStore('data/store')) == {'QQQ': 400}
+    handler = DataHandler(offline_mode=True)
+    history = handler.get_historical('QQQ', period='3mo')
+    # Only the period ending at the last stored bar is read
+    assert history.index[0] == pd.Timestamp('2024-11-03') and history['Close'].iloc[-1] == 399.0
+
+
+def test_data_handler_persists_only_new_or_revised_bars(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bars = frame(10).assign(Volume=np.arange(10) * 100)
+    handler = DataHandler(offline_mode=True)
+    appended = []
+    append = handler.store.append
+    monkeypatch.setattr(handler.store, 'append',
+                        lambda symbol, data, *args: appended.append(len(data)) or
+                        append(symbol, data, *args))
+    handler._persist('SPY', bars.iloc[:8], '1d')
+    # An unchanged download writes nothing; new bars come with the last stored one
+    handler._persist('SPY', bars.iloc[:8], '1d')
+    handler._persist('SPY', bars, '1d')
+    revised = bars.copy()
+    revised.iloc[-1, 0] = 99.0
+    handler._persist('SPY', revised, '1d')
+    assert appended == [8, 3, 1]
+    assert list(handler.store.load('SPY')['Close']) == list(revised['Close'])
+    handler.cache.close()
+
+
+def test_bar_store_flattens_yfinance_columns(tmp_path, monkeypatch):
+    from core.bar_store import BarStore
+    bars = frame(30).assign(High=lambda d: d['Close'] + 1, Low=lambda d: d['Close'] - 1)
+    # yf.download(symbol) shape: (Price, Ticker) column levels
+    downloaded = bars.copy()
+    downloaded.columns = pd.MultiIndex.from_product([bars.columns, ['AAPL']],
+                                                    names=['Price', 'Ticker'])
+    monkeypatch.chdir(tmp_path)
+    handler = DataHandler()
+    handler._persist('AAPL', downloaded, '1d')
+    stored = BarStore('data/store').load('AAPL')
+    pd.testing.assert_frame_equal(stored, bars, check_names=False, check_freq=False)
+    version = next((tmp_path / 'data' / 'store' / '1d' / 'AAPL').glob('*/v*'))
+    assert sorted(p.name for p in version.iterdir()) == \
+        ['Close.npy', 'High.npy', 'Low.npy', 'index.npy', 'meta.json']
+
+    handler = DataHandler(offline_mode=True)
+    assert handler.get_indicators('AAPL').latest['close'] == 29.0
+    with pytest.raises(ValueError):
+        BarStore('data/store').write('BAD', bars.rename(columns={'Close': '../Close'}))
+    with pytest.raises(ValueError):
+        BarStore('data/store').write('BAD', pd.concat({'AAPL': bars, 'MSFT': bars}, axis=1))
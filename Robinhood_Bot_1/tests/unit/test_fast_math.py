@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from scipy.stats import norm
+from core.fast_math import norm_cdf, norm_pdf, norm_ppf
+
+def test_scalar_kernels_match_scipy():
+    for x in np.linspace(-37, 8, 901):
+        assert norm_cdf(float(x)) == pytest.approx(norm.cdf(x), rel=1e-10, abs=1e-300)
+        assert norm_pdf(float(x)) == pytest.approx(norm.pdf(x), rel=1e-14, abs=1e-300)
+
+    tails = np.logspace(-300, -2, 300)
+    for p in np.concatenate([tails, np.linspace(0.01, 0.99, 981), 1 - tails[tails > 1e-15]]):
+        assert norm_ppf(float(p)) == pytest.approx(norm.ppf(p), rel=1e-13, abs=1e-13)
+    assert norm_ppf(0.0) == -np.inf and norm_ppf(1.0) == np.inf
+    assert np.isnan(norm_ppf(1.5))
+
+
+def test_array_kernels_match_scipy():
+    x = np.linspace(-10, 10, 2001).reshape(3, -1)
+    assert np.allclose(norm_cdf(x), norm.cdf(x), rtol=1e-14, atol=0)
+    assert np.allclose(norm_pdf(x), norm.pdf(x), rtol=1e-14, atol=0)
+
+    p = np.linspace(1e-6, 1 - 1e-6, 999)
+    assert np.allclose(norm_ppf(p), norm.ppf(p), rtol=1e-14, atol=1e-14)
+    out = np.empty_like(p)
+    assert norm_ppf(p, out=out) is out
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.data_handler import DataHandler
+from core.indicators import IndicatorState
+from core.strategies.trend_following import TrendFollowing
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(0.01 * rng.standard_normal(300)))
+    return pd.DataFrame({'Close': close, 'High': close * 1.01, 'Low': close * 0.99},
+                        index=pd.date_range('2024-01-01', periods=300, name='Date'))
+
+def test_incremental_updates_match_backfill(bars):
+    full = IndicatorState('SPY').backfill(bars).iloc[-1]
+
+    state = IndicatorState('SPY')
+    state.backfill(bars.iloc[:80])
+    for timestamp, bar in bars.iloc[80:].iterrows():
+        # An intraday tick first, then the bar's final values revise it
+        state.update(bar['Close'] * 1.003, timestamp=timestamp)
+        latest = state.update(bar['Close'], bar['High'], bar['Low'], timestamp=timestamp)
+
+    assert state.bars == len(bars)
+    for name, value in latest.items():
+        expected = full['Close'] if name == 'close' else full[name]
+        assert value == pytest.approx(expected, rel=1e-9)
+
+    restored = IndicatorState.from_dict(state.to_dict())
+    assert restored.update(101.0, 102.0, 99.0) == state.update(101.0, 102.0, 99.0)
+
+
+def test_wilder_rsi_and_atr_warm_up():
+    state = IndicatorState('SPY', rsi_window=3, atr_window=3)
+    for close in (10.0, 11.0, 10.5):
+        assert np.isnan(state.update(close)['rsi'])
+    latest = state.update(11.5)
+    # Seeded with simple means of the first three gains/losses and true ranges
+    assert latest['rsi'] == pytest.approx(100 - 100 / (1 + (2.0 / 3) / (0.5 / 3)))
+    seed = (0.0 + 1.0 + 0.5) / 3
+    assert latest['atr'] == pytest.approx(seed + (1.0 - seed) / 3)
+
+
+def test_data_handler_resumes_saved_state(bars, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'historical').mkdir(parents=True)
+    bars.iloc[:250].to_csv(tmp_path / 'data' / 'historical' / 'SPY.csv')
+
+    handler = DataHandler(offline_mode=True)
+    assert handler.get_indicators('SPY').bars == 250
+    handler.save_indicators()
+
+    bars.to_csv(tmp_path / 'data' / 'historical' / 'SPY.csv')
+    resumed = DataHandler(offline_mode=True).get_indicators('SPY')
+    expected = IndicatorState('SPY').backfill(bars).iloc[-1]
+    assert resumed.bars == len(bars)
+    assert resumed.latest['sma_50'] == pytest.approx(expected['sma_50'])
+    assert resumed.latest['rsi'] == pytest.approx(expected['rsi'])
+
+    signal = TrendFollowing({'enabled': True, 'stop_loss_pct': 0.05,
+                             'take_profit_pct': 0.1}).analyze(indicators=resumed)
+    if signal is not None:
+        assert signal['symbol'] == 'SPY' and signal['entry'] == bars['Close'].iloc[-1]
+
+
+def test_forming_bar_only_on_trading_sessions(bars, tmp_path, monkeypatch):
+    import core.data_handler
+    import core.strategies.trend_following
+    from core.market_calendar import is_trading_session
+    from core.strategies.registry import MarketSnapshot
+    assert is_trading_session('2024-07-05') and is_trading_session('2024-11-29')
+    # Independence Day, Good Friday, a Saturday, Saturday New Year's Day observed neither side
+    assert not any(map(is_trading_session, ('2024-07-04', '2024-03-29', '2024-10-26')))
+    assert is_trading_session('2021-12-31') and not is_trading_session('2022-01-01')
+
+    strategy = TrendFollowing({'enabled': True, 'stop_loss_pct': 0.05, 'take_profit_pct': 0.1})
+    scanned = []
+    monkeypatch.setattr(strategy, 'scan', lambda panel: scanned.append(panel) or pd.DataFrame())
+    snapshot = MarketSnapshot(['SPY'], {'SPY': 101.0}, {}, {}, {('SPY', '1d'): bars}, {})
+    for session in (False, True):
+        monkeypatch.setattr(core.strategies.trend_following, 'is_trading_session',
+                            lambda day: session)
+        strategy.prepare(snapshot)
+    assert len(scanned[0]) == len(bars)
+    assert len(scanned[1]) == len(bars) + 1 and scanned[1]['SPY'].iloc[-1] == 101.0
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'historical').mkdir(parents=True)
+    bars.to_csv(tmp_path / 'data' / 'historical' / 'SPY.csv')
+    handler = DataHandler(offline_mode=True)
+    monkeypatch.setattr(core.data_handler, 'is_trading_session', lambda day: False)
+    assert handler.update_bar('SPY', 101.0).bars == len(bars)
+    monkeypatch.setattr(core.data_handler, 'is_trading_session', lambda day: True)
+    assert handler.update_bar('SPY', 101.0).bars == len(bars) + 1
+
+
+def test_data_handler_rebuilds_stale_or_corrupt_state(bars, tmp_path, monkeypatch):
+    from core.bar_store import BarStore
+    monkeypatch.chdir(tmp_path)
+    store = BarStore('data/store')
+    store.write('SPY', bars.iloc[:150])
+    handler = DataHandler(offline_mode=True)
+    assert handler.get_indicators('SPY').bars == 150
+    handler.save_indicators()
+    path = tmp_path / 'data' / 'indicators' / 'SPY_1d.json'
+
+    # The catch-up download starts months after the saved bar: rebuild, don't skip the gap
+    store.write('SPY', bars)
+    handler = DataHandler(offline_mode=True)
+    resumed = handler.get_indicators('SPY')
+    expected = IndicatorState('SPY').backfill(bars).iloc[-1]
+    assert resumed.bars == len(bars)
+    assert resumed.latest['sma_50'] == pytest.approx(expected['sma_50'])
+    handler.save_indicators()
+
+    # A failed download is not corruption: the saved state survives for the next run
+    handler = DataHandler(offline_mode=True)
+    def offline(*args):
+        raise ConnectionError("network down")
+    monkeypatch.setattr(handler, '_download', offline)
+    assert handler.get_indicators('SPY') is None and path.exists()
+
+    path.write_text('{"symbol": "SPY"')
+    handler = DataHandler(offline_mode=True)
+    assert handler.get_indicators('SPY').bars == len(bars)
+    assert IndicatorState.load(str(path)).bars == len(bars)
+
+
+def test_panel_scan_matches_per_symbol_analysis():
+    from core.strategies.trend_scanner import scan_trends
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2024-01-01', periods=252, name='Date')
+    frames = {}
+    for i in range(500):
+        start = int(rng.integers(0, 220))
+        drift = 0.003 * rng.standard_normal()
+        close = 100 * np.exp(np.cumsum(drift + 0.015 * rng.standard_normal(252 - start)))
+        frames[f'S{i}'] = pd.DataFrame({'Close': close, 'symbol': f'S{i}'}, index=index[start:])
+    panel = pd.concat({symbol: frame['Close'] for symbol, frame in frames.items()}, axis=1,
+                      sort=True).ffill()
+
+    config = {'enabled': True, 'stop_loss_pct': 0.05, 'take_profit_pct': 0.1}
+    signals = scan_trends(panel, config['stop_loss_pct'],
+                          config['take_profit_pct']).set_index('symbol')
+
+    strategy = TrendFollowing(config)
+    for symbol, frame in list(frames.items())[:100]:
+        expected = strategy.analyze(frame)
+        if expected is None:
+            assert symbol not in signals.index
+            continue
+        row = signals.loc[symbol]
+        assert row['direction'] == expected['direction']
+        assert row['stop_loss'] == pytest.approx(expected['stop_loss'])
+        assert row['rsi'] == pytest.approx(expected['indicators']['rsi'])
+        assert row['sma_50'] == pytest.approx(expected['indicators']['sma_50'])
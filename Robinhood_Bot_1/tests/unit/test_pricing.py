@@ -1,5 +1,17 @@
+import numpy as np
 import pytest
 from core.pricing_models import PricingModels
+from core.deviate_bank import DeviateBank
+from core.implied_vol import implied_volatility
+from core.lattice import price_lattice
+from core.parallel_pricer import ParallelPricer
+from core.pricing_cache import PricingCache
+from core.pricing_context import PricingContext
+from core.pricing_dispatcher import PricingDispatcher
+from core.probability import ProbabilityEngine, touch_probability
+from core.vol_surface import VolSurface
+from core.qmc_engine import price_strikes, sobol_normals, terminal_prices
+from core.strategies.structure_optimizer import search_structures
 
 @pytest.fixture
 def pricing():
@@ -10,4 +22,578 @@ def test_qmc_pricing(pricing):
         S=100, K=105, T=0.25, r=0.01, sigma=0.2
     )
     assert result['status'] == 'success'
-    assert 0 < result['price'] < 20
\ No newline at end of file
+    assert 0 < result['price'] < 20
+
+def test_black_scholes_batch_matches_scalar(pricing):
+    strikes = np.array([90.0, 100.0, 110.0, 100.0])
+    types = np.array(['call', 'call', 'put', 'put'])
+    batch = pricing.black_scholes_batch(S=100, K=strikes, T=0.5, r=0.02,
+                                        sigma=0.3, option_type=types)
+    assert batch['status'] == 'success'
+    for i, (K, option_type) in enumerate(zip(strikes, types)):
+        single = pricing.black_scholes(S=100, K=K, T=0.5, r=0.02, sigma=0.3,
+                                       option_type=option_type)
+        assert batch['price'][i] == pytest.approx(single['price'])
+        for greek, value in single['greeks'].items():
+            assert batch['greeks'][greek][i] == pytest.approx(value)
+
+
+def test_black_scholes_batch_put_call_parity(pricing):
+    strikes = np.linspace(50, 150, 201)
+    calls = pricing.black_scholes_batch(100, strikes, 0.25, 0.01, 0.2, 'call')
+    puts = pricing.black_scholes_batch(100, strikes, 0.25, 0.01, 0.2, 'put')
+    parity = calls['price'] - puts['price'] - (100 - strikes * np.exp(-0.01 * 0.25))
+    assert np.allclose(parity, 0, atol=1e-10)
+    assert np.allclose(calls['greeks']['delta'] - puts['greeks']['delta'], 1)
+
+
+def test_shared_draw_qmc_matches_per_strike_payoffs():
+    z = sobol_normals(2**12, seed=7)
+    strikes = np.array([80.0, 100.0, 125.0])
+    result = price_strikes(100, strikes, 0.5, 0.02, 0.3, z=z)
+
+    ST = terminal_prices(100, 0.5, 0.02, 0.3, z)
+    discount = np.exp(-0.02 * 0.5)
+    for i, K in enumerate(strikes):
+        calls = discount * np.maximum(ST - K, 0)
+        puts = discount * np.maximum(K - ST, 0)
+        assert result['call_price'][i] == pytest.approx(calls.mean())
+        assert result['put_price'][i] == pytest.approx(puts.mean())
+        assert result['call_var'][i] == pytest.approx(np.percentile(calls, 5))
+        assert result['put_var'][i] == pytest.approx(np.percentile(puts, 5))
+
+
+def test_deviate_bank_reuses_evicts_and_persists(tmp_path):
+    bank = DeviateBank(max_bytes=2**10 * 8, cache_dir=tmp_path)
+    first = bank.get(1, 10)
+    assert bank.get(1, 10) is first
+    assert not first.flags.writeable
+    assert abs(first.mean()) < 0.01
+
+    bank.get(1, 10, seed=1)  # second bank pushes the first over budget
+    assert bank.info()['evictions'] == 1
+
+    warm = DeviateBank(cache_dir=tmp_path)
+    assert np.array_equal(warm.get(1, 10), first)
+    assert warm.info()['disk_loads'] == 1
+    assert not np.array_equal(bank.get(1, 10, rescramble=True), first)
+
+
+def test_lattice_european_converges_to_black_scholes(pricing):
+    bs = pricing.black_scholes(100, 105, 0.5, 0.03, 0.25, 'put')['price']
+    for method in ('binomial', 'trinomial'):
+        price = price_lattice(100, 105, 0.5, 0.03, 0.25, 'put', american=False,
+                              n_steps=400, method=method)
+        assert price == pytest.approx(bs, abs=5e-3)
+
+
+def test_lattice_american_chain_batch(pricing):
+    strikes = np.array([90.0, 100.0, 110.0])
+    batch = pricing.lattice(100, strikes, 0.5, 0.03, 0.25, 'put', n_steps=100)
+    assert batch['status'] == 'success'
+    for K, price in zip(strikes, batch['price']):
+        single = pricing.binomial_tree(100, K, 0.5, 0.03, 0.25, n_steps=100,
+                                       option_type='put', american=True)
+        assert price == pytest.approx(single['price'])
+        assert price >= max(K - 100, 0)
+
+    reference = price_lattice(100, strikes, 0.5, 0.03, 0.25, 'put', n_steps=2000)
+    extrapolated = price_lattice(100, strikes, 0.5, 0.03, 0.25, 'put',
+                                 n_steps=100, richardson=True)
+    assert np.allclose(extrapolated, reference, atol=2e-3)
+
+
+def test_implied_volatility_round_trips_chain(pricing):
+    strikes = np.linspace(80, 140, 50)
+    sigmas = np.linspace(0.15, 0.9, 50)
+    types = np.where(strikes < 100, 'put', 'call')
+    prices = pricing.black_scholes_batch(100, strikes, 0.3, 0.02, sigmas, types)['price']
+
+    result = implied_volatility(prices, 100, strikes, 0.3, 0.02, types)
+    assert result['converged'].all()
+    assert np.allclose(result['iv'], sigmas, atol=1e-6)
+
+    # Below intrinsic has no solution and is flagged rather than guessed
+    flagged = implied_volatility(np.array([1.0]), 100, 80, 0.3, 0.02, 'call')
+    assert not flagged['converged'][0]
+    assert np.isnan(flagged['iv'][0])
+
+
+def test_vol_surface_updates_only_changed_quotes(pricing):
+    strikes = np.tile(np.arange(80.0, 121.0, 5.0), 2)
+    types = np.repeat(['call', 'put'], strikes.size // 2)
+    smile = lambda K: 0.2 + 0.5 * np.log(K / 100)**2
+    surface = VolSurface('SPY', r=0.01, smoothing='svi')
+    for expiration, T in (('near', 0.1), ('far', 0.4)):
+        prices = pricing.black_scholes_batch(100, strikes, T, 0.01, smile(strikes), types)['price']
+        assert surface.update(expiration, T, 100, strikes, prices, types) == strikes.size
+
+    assert surface.sigma(100, 0.1) == pytest.approx(0.2, abs=2e-3)
+    assert surface.sigma(110, 0.25) == pytest.approx(smile(110), abs=5e-3)
+
+    prices = pricing.black_scholes_batch(100, strikes, 0.4, 0.01, smile(strikes), types)['price']
+    prices[0] += 0.05
+    assert surface.update('far', 0.4, 100, strikes, prices, types) == 1
+
+
+def test_vol_surface_drops_unsolved_quotes(pricing, monkeypatch):
+    import core.vol_surface
+    strikes = np.arange(80.0, 121.0, 5.0)
+    prices = pricing.black_scholes_batch(100, strikes, 0.25, 0.01, 0.2, 'call')['price']
+    # The 90 call quoted below intrinsic, an arbitrage no volatility can price
+    prices[2] = 100 - 90 * np.exp(-0.01 * 0.25) - 0.5
+    surface = VolSurface('SPY', r=0.01, smoothing='linear')
+    surface.update('june', 0.25, 100, strikes, prices, 'call')
+    ivs = surface.smile('june')['iv']
+    assert np.isnan(ivs[2]) and np.isfinite(np.delete(ivs, 2)).all()
+    assert surface.sigma(90, 0.25) == pytest.approx(0.2, abs=1e-6)
+
+    # Solves cut off before converging are dropped too, not fitted as if exact
+    solve = core.vol_surface.implied_volatility
+    monkeypatch.setattr(core.vol_surface, 'implied_volatility',
+                        lambda *args: solve(*args, max_iter=1))
+    prices = pricing.black_scholes_batch(100, strikes, 0.25, 0.01, 0.5, 'call')['price']
+    surface.update('june', 0.25, 100, strikes, prices, 'call')
+    unconverged = ~solve(prices, 100, strikes, 0.25, 0.01, max_iter=1)['converged']
+    assert unconverged.any() and np.isnan(surface.smile('june')['iv'][unconverged]).all()
+
+
+def test_qmc_greeks_match_black_scholes(pricing):
+    for option_type in ('call', 'put'):
+        bs = pricing.black_scholes(100, 105, 0.5, 0.03, 0.25, option_type)
+        for method in ('pathwise', 'bump'):
+            qmc = pricing.quasi_monte_carlo(100, 105, 0.5, 0.03, 0.25, option_type,
+                                            n_simulations=2**15, greeks_method=method)
+            assert qmc['status'] == 'success'
+            assert qmc['price'] == pytest.approx(bs['price'], rel=1e-3)
+            for greek, value in bs['greeks'].items():
+                assert qmc['greeks'][greek] == pytest.approx(value, rel=5e-3, abs=1e-4)
+
+
+def test_adaptive_monte_carlo_hits_tolerance(pricing):
+    bs = pricing.black_scholes(100, 110, 0.5, 0.03, 0.25, 'put')['price']
+    for method in ('mc', 'rqmc'):
+        result = pricing.adaptive_monte_carlo(100, 110, 0.5, 0.03, 0.25, 'put',
+                                              tolerance=5e-3, method=method)
+        assert result['converged']
+        assert result['std_error'] <= 5e-3
+        assert result['price'] == pytest.approx(bs, abs=5 * 5e-3)
+
+    capped = pricing.adaptive_monte_carlo(100, 110, 0.5, 0.03, 0.25, 'put',
+                                          tolerance=1e-9, time_budget=0.01, method='mc')
+    assert not capped['converged']
+    assert capped['samples'] > 0
+
+    for method in ('mc', 'rqmc'):
+        for max_samples in (3 * 2**12, 2**16, 100):
+            limited = pricing.adaptive_monte_carlo(100, 110, 0.5, 0.03, 0.25, 'put',
+                                                   tolerance=1e-9, method=method,
+                                                   max_samples=max_samples)
+            # Stops only once another doubling would overshoot
+            assert not limited['converged']
+            assert max_samples / 2 < limited['samples'] <= max_samples
+
+
+def test_finite_difference_prices_chain(pricing):
+    strikes = np.linspace(80, 120, 41)
+    for option_type in ('call', 'put'):
+        european = pricing.finite_difference(100, strikes, 0.5, 0.03, 0.25, option_type,
+                                             american=False)
+        bs = pricing.black_scholes_batch(100, strikes, 0.5, 0.03, 0.25, option_type)
+        assert european['status'] == 'success'
+        assert np.allclose(european['price'], bs['price'], atol=2e-3)
+        assert np.allclose(european['greeks']['delta'], bs['greeks']['delta'], atol=2e-3)
+        assert np.allclose(european['greeks']['gamma'], bs['greeks']['gamma'], atol=2e-4)
+
+    american = pricing.finite_difference(100, strikes, 0.5, 0.03, 0.25, 'put')
+    tree = price_lattice(100, strikes, 0.5, 0.03, 0.25, 'put', n_steps=1000, richardson=True)
+    assert np.allclose(american['price'], tree, atol=2e-3)
+
+
+def test_pricing_cache_quantizes_and_evicts():
+    cache = PricingCache(ttl=60, quantization={'S': 0.01})
+    cached = PricingModels(cache=cache)
+    strikes = np.array([95.0, 100.0, 105.0])
+
+    first = cached.quasi_monte_carlo_batch(100.001, strikes, 0.25, 0.01, 0.2)
+    second = cached.quasi_monte_carlo_batch(100.004, strikes, 0.25, 0.01, 0.2)
+    assert cache.info()['hits'] == 1 and cache.info()['misses'] == 1
+    assert np.array_equal(first['call_price'], second['call_price'])
+    assert not second['call_price'].flags.writeable
+    assert np.allclose(first['call_price'],
+                       PricingModels().quasi_monte_carlo_batch(100, strikes, 0.25, 0.01, 0.2)['call_price'])
+
+    cached.black_scholes_batch(100.1, 100, 0.25, 0.01, 0.2)
+    assert cache.info()['misses'] == 2
+    assert cached.quasi_monte_carlo_batch(100.2, strikes, 0.25, 0.01, 0.2, rescramble=True)['status'] == 'success'
+    assert cache.info()['entries'] == 2
+
+    cache.ttl = 0
+    cached.black_scholes_batch(99, 100, 0.25, 0.01, 0.2)
+    cached.black_scholes_batch(99, 100, 0.25, 0.01, 0.2)
+    assert cache.info()['expirations'] == 1
+
+    cache.max_bytes = 1
+    cached.black_scholes_batch(98, 100, 0.25, 0.01, 0.2)
+    assert cache.info()['entries'] == 0
+    assert cache.info()['evictions'] > 0
+
+
+def test_parallel_pricer_matches_serial(pricing):
+    strikes = np.tile(np.linspace(80, 120, 21), 3)
+    expiries = np.repeat([0.1, 0.25, 0.5], 21)
+    types = np.where(strikes > 100, 'call', 'put')
+    serial = ParallelPricer('qmc', workers=0).price(100, strikes, expiries, 0.01, 0.25, types)
+    with ParallelPricer('qmc', workers=2, chunk_size=16) as pool:
+        first = pool.price(100, strikes, expiries, 0.01, 0.25, types)
+        again = pool.price(100, strikes[:10], expiries[:10], 0.01, 0.25, types[:10])
+    for name in serial:
+        assert np.array_equal(first[name], serial[name])
+    assert np.array_equal(again['price'], serial['price'][:10])
+
+    bs = pricing.black_scholes_batch(100, strikes, expiries, 0.01, 0.25, types)
+    assert np.allclose(first['price'], bs['price'], atol=5e-3)
+
+
+def test_longstaff_schwartz_matches_lattice(pricing):
+    strikes = np.array([90.0, 100.0, 110.0])
+    tree = price_lattice(100, strikes, 0.5, 0.03, 0.25, 'put', n_steps=1000, richardson=True)
+    for basis in ('laguerre', 'polynomial'):
+        result = pricing.longstaff_schwartz(100, strikes, 0.5, 0.03, 0.25, 'put',
+                                            n_paths=2**15, n_steps=50, basis=basis)
+        assert result['status'] == 'success'
+        assert np.all(np.abs(result['price'] - tree) < 4 * result['std_error'] + 0.02)
+
+    european = pricing.black_scholes_batch(100, strikes, 0.5, 0.03, 0.25, 'put')['price']
+    assert np.all(result['price'] > european)
+
+
+def test_streaming_monte_carlo_tail_risk(pricing):
+    for option_type, K in (('call', 60.0), ('put', 140.0), ('call', 120.0)):
+        result = pricing.streaming_monte_carlo(100, K, 0.5, 0.03, 0.25, option_type,
+                                               n_simulations=2**18, chunk_size=2**12)
+        assert result['status'] == 'success'
+        assert result['n_simulations'] == 2**18
+        bs = pricing.black_scholes(100, K, 0.5, 0.03, 0.25, option_type)['price']
+        assert result['price'] == pytest.approx(bs, abs=1e-3)
+
+        z = sobol_normals(2**18)
+        sign = 1 if option_type == 'call' else -1
+        payoff = np.exp(-0.015) * np.maximum(sign * (terminal_prices(100, 0.5, 0.03, 0.25, z) - K), 0)
+        var = np.percentile(payoff, 5)
+        assert result['var'] == pytest.approx(var, abs=0.02)
+        assert result['cvar'] <= result['var']
+        if var > 0:
+            assert result['cvar'] == pytest.approx(payoff[payoff <= var].mean(), abs=0.02)
+
+
+def test_benchmark_harness_flags_regressions():
+    from scripts.benchmark_pricing import run_benchmarks, compare
+    results = run_benchmarks(batch_sizes=(8,), repeats=1,
+                             only=['black_scholes_batch', 'lattice'])
+    assert set(results['results']) == {'black_scholes_batch[8]', 'lattice[8]'}
+    assert results['results']['lattice[8]']['max_abs_error'] < 5e-3
+    assert compare(results, results) == []
+    search = run_benchmarks(batch_sizes=(), repeats=1, only=['structure_search'])
+    assert set(search['results']) == {'structure_search[condors]'}
+    case = dict(search['results']['structure_search[condors]'], seconds=2.0)
+    over = {'results': {'structure_search[condors]': case}}
+    assert compare(over, over) == ['structure_search[condors]: 2.0000s over the 1.0000s budget']
+    kernels = run_benchmarks(batch_sizes=(), repeats=1, only=['scalar_kernels'])
+    assert set(kernels['results']) == {'norm_cdf[scalar]', 'norm_pdf[scalar]', 'norm_ppf[scalar]'}
+    assert all(r['max_abs_error'] < 1e-12 for r in kernels['results'].values())
+    # Kernel budgets are fractions of scipy's time on the same machine
+    slow = {'results': {'norm_cdf[scalar]': dict(kernels['results']['norm_cdf[scalar]'],
+                                                 seconds=1.0, reference_seconds=2.0)}}
+    assert compare(slow, slow) == ['norm_cdf[scalar]: 1.0000s over the 0.4000s budget']
+    scan = run_benchmarks(batch_sizes=(), repeats=1, only=['trend_scan'])
+    assert set(scan['results']) == {'trend_scan[500]'}
+
+    faster = {'results': {case: dict(r, seconds=r['seconds'] / 10 - 1e-2, max_abs_error=0.0)
+                          for case, r in results['results'].items()}}
+    assert len(compare(results, faster, min_seconds=0)) == 3
+
+
+def test_dispatcher_picks_engine_and_respects_budget(pricing):
+    dispatcher = PricingDispatcher(pricing, {'binomial': {'steps': 200}, 'qmc': {'simulations': 2**14}})
+    strikes = np.array([90.0, 100.0, 110.0])
+    bs = pricing.black_scholes_batch(100, strikes, 0.5, 0.03, 0.25, 'put')
+
+    european = dispatcher.price(100, strikes, 0.5, 0.03, 0.25, 'put')
+    assert european['engine'] == 'black_scholes'
+    assert np.allclose(european['price'], bs['price'])
+    assert dispatcher.price(100, strikes, 0.5, 0.03, 0.25, 'call', american=True)['engine'] == 'black_scholes'
+
+    american = dispatcher.price(100, strikes, 0.5, 0.03, 0.25, 'put', american=True)
+    assert american['engine'] == 'lattice' and not american['degraded']
+    assert np.all(american['price'] > bs['price'])
+    assert set(american['greeks']) == set(bs['greeks'])
+
+    dispatcher.costs['lattice'] = 1.0
+    dispatcher.begin_cycle(budget=0.0)
+    starved = dispatcher.price(100, strikes, 0.5, 0.03, 0.25, 'put', american=True)
+    assert starved['engine'] == 'black_scholes' and starved['degraded']
+    assert dispatcher.stats()['lattice']['calls'] == 1
+    assert dispatcher.stats()['black_scholes']['degraded'] == 1
+
+
+def test_dispatcher_simulates_only_tail_risk_requests(pricing):
+    dispatcher = PricingDispatcher(pricing, {'default_model': 'quasi_monte_carlo',
+                                             'qmc': {'simulations': 2**14}})
+    strikes = np.array([90.0, 100.0, 110.0])
+    types = np.array(['put', 'call', 'call'])
+    assert dispatcher.price(100, strikes, 0.5, 0.03, 0.25, types)['engine'] == 'black_scholes'
+
+    risk = dispatcher.price(100, strikes, 0.5, 0.03, 0.25, types, tail_risk=True)
+    assert risk['engine'] == 'quasi_monte_carlo' and not risk['degraded']
+    assert dispatcher.history[-1]['setting'] == {'n_simulations': 2**14}
+    qmc = pricing.quasi_monte_carlo_batch(100, strikes, 0.5, 0.03, 0.25, n_simulations=2**14)
+    assert np.allclose(risk['price'], np.where(types == 'call', qmc['call_price'], qmc['put_price']))
+    assert np.allclose(risk['var'], np.where(types == 'call', qmc['call_var'], qmc['put_var']))
+    bs = pricing.black_scholes_batch(100, strikes, 0.5, 0.03, 0.25, types)['price']
+    assert np.allclose(risk['price'], bs, atol=0.02)
+
+    assert dispatcher.price(100, strikes, 0.5, 0.03, 0.25, types, american=True,
+                            tail_risk=True)['status'] == 'error'
+    dispatcher.costs['quasi_monte_carlo'] = 1.0
+    dispatcher.begin_cycle(budget=0.0)
+    starved = dispatcher.price(100, strikes, 0.5, 0.03, 0.25, types, tail_risk=True)
+    assert starved['engine'] == 'black_scholes' and starved['degraded']
+    assert np.isnan(starved['var']).all()
+    with pytest.raises(ValueError):
+        PricingDispatcher(pricing, {'default_model': 'monte_carlo'})
+
+
+def test_dispatcher_prices_american_put_chains_on_one_grid(pricing):
+    dispatcher = PricingDispatcher(pricing, {'binomial': {'steps': 200},
+                                             'finite_difference': {'grid_points': 800}})
+    strikes = np.linspace(60, 140, 401)
+    # One expiry and vol: the whole chain is a single grid solve
+    assert dispatcher.choose(401, american=True, n_grids=1)['engine'] == 'finite_difference'
+    assert dispatcher.choose(401, american=True, n_grids=10)['engine'] == 'lattice'
+
+    chain = dispatcher.price(100, strikes, 0.5, 0.03, 0.25, 'put', american=True)
+    tree = price_lattice(100, strikes[::40], 0.5, 0.03, 0.25, 'put', n_steps=1000, richardson=True)
+    assert chain['engine'] == 'finite_difference' and not chain['degraded']
+    assert np.allclose(chain['price'][::40], tree, atol=0.01)
+    assert np.all(chain['greeks']['delta'] < 0) and chain['greeks']['delta'].shape == strikes.shape
+    assert dispatcher.history[-1]['setting'] == {'grid_points': 800}
+
+    dispatcher.costs['finite_difference'] = 1.0
+    assert dispatcher.choose(401, american=True, n_grids=1)['engine'] == 'lattice'
+
+
+def test_dispatcher_sweeps_large_chains_in_parallel(pricing):
+    strikes = np.tile(np.linspace(80, 120, 20), 4)
+    expiries = np.repeat([0.1, 0.25, 0.5, 1.0], 20)
+    config = {'binomial': {'steps': 100}, 'parallel': {'workers': 2, 'min_contracts': 64,
+                                                       'chunk_size': 16}}
+    serial = PricingDispatcher(pricing, {'binomial': {'steps': 100}})
+    parallel = PricingDispatcher(pricing, config)
+    try:
+        expected = serial.price(100, strikes, expiries, 0.03, 0.25, 'put', american=True)
+        swept = parallel.price(100, strikes, expiries, 0.03, 0.25, 'put', american=True)
+        small = parallel.price(100, strikes[:8], expiries[:8], 0.03, 0.25, 'put', american=True)
+        # Tail-risk simulations sweep on the same pool, VaR included
+        risk = [dispatcher.price(100, strikes, expiries, 0.03, 0.25, 'put', tail_risk=True,
+                                 var_percentile=10.0) for dispatcher in (serial, parallel)]
+    finally:
+        parallel.close()
+    assert swept['engine'] == 'lattice' and parallel.history[0]['workers'] == 2
+    assert np.allclose(swept['price'], expected['price'])
+    assert parallel.history[1]['workers'] == 1
+    assert np.allclose(small['price'], expected['price'][:8])
+    assert risk[1]['engine'] == 'quasi_monte_carlo' and parallel.history[2]['workers'] == 2
+    assert serial.history[-1]['workers'] == 1
+    for key in ('price', 'var'):
+        assert np.allclose(risk[1][key], risk[0][key])
+    assert np.allclose(risk[1]['greeks']['delta'], risk[0]['greeks']['delta'])
+
+
+def test_fourier_pricer_and_calibration(pricing):
+    import pandas as pd
+    strikes = np.linspace(70, 140, 29)
+    flat = {'kappa': 2.0, 'theta': 0.04, 'xi': 1e-4, 'rho': 0.0, 'v0': 0.04}
+    for option_type in ('call', 'put'):
+        heston = pricing.fourier(100, strikes, 0.5, 0.03, flat, option_type=option_type)
+        bs = pricing.black_scholes_batch(100, strikes, 0.5, 0.03, 0.2, option_type)
+        assert heston['status'] == 'success'
+        assert np.allclose(heston['price'], bs['price'], atol=1e-4)
+
+    bates = {'kappa': 1.5, 'theta': 0.05, 'xi': 0.6, 'rho': -0.7, 'v0': 0.04,
+             'lam': 0.3, 'mu_j': -0.1, 'delta_j': 0.15}
+    calls = pricing.fourier(100, strikes, 0.5, 0.03, bates, 'bates', 'call')['price']
+    puts = pricing.fourier(100, strikes, 0.5, 0.03, bates, 'bates', 'put')['price']
+    assert np.allclose(calls - puts, 100 - strikes * np.exp(-0.03 * 0.5))
+    assert np.all(np.diff(calls) < 0) and np.all(puts > 0)
+    assert pricing.fourier(100, strikes, 0.5, 0.03, {}, 'merton')['status'] == 'error'
+
+    true = {'kappa': 3.0, 'theta': 0.06, 'xi': 0.7, 'rho': -0.5, 'v0': 0.05}
+    expiries = np.repeat([0.1, 0.3, 0.8], len(strikes))
+    K = np.tile(strikes, 3)
+    mid = pricing.fourier(100, K, expiries, 0.03, true, option_type='put')['price']
+    chain = pd.DataFrame({'strike': K, 'T': expiries, 'type': 'put', 'lastPrice': mid,
+                          'bid': np.maximum(mid - 0.05, 0.0), 'ask': mid + 0.05})
+    fit = pricing.calibrate(chain, 100, r=0.03)
+    assert fit['status'] == 'success' and fit['rmse'] < 1e-3
+    for name, value in true.items():
+        assert fit['params'][name] == pytest.approx(value, rel=0.05, abs=0.01)
+
+
+def test_structure_search_matches_brute_force(pricing):
+    import itertools
+    import pandas as pd
+
+    def listed(strikes, expiries):
+        rows = []
+        for expiration, T in expiries:
+            for option_type in ('call', 'put'):
+                mid = pricing.black_scholes_batch(100, strikes, T, 0.01, 0.3, option_type)['price']
+                rows.append(pd.DataFrame({'strike': strikes, 'bid': np.maximum(mid - 0.05, 0),
+                                          'ask': mid + 0.05, 'expiration': expiration, 'T': T,
+                                          'type': option_type}))
+        return pd.concat(rows, ignore_index=True)
+
+    # Hundreds of thousands of condors across two expiries in one cycle
+    chain = listed(np.arange(50.0, 151.0), (('near', 0.05), ('far', 0.12)))
+    best = search_structures(chain, 100, 0.3, max_width=10, top_n=3)
+    assert len(best) == 3 and best['expected_value'].is_monotonic_decreasing
+
+    small = listed(np.arange(90.0, 111.0), (('far', 0.12),))
+    found = search_structures(small, 100, 0.3, max_width=4, min_credit=0.5, top_n=1,
+                              rank_by='risk_reward')
+    quote = small.set_index(['type', 'strike'])
+    top = -np.inf
+    for bp, sp, sc, bc in itertools.product(np.arange(90.0, 111.0), repeat=4):
+        if not (sp - 4 <= bp < sp <= 100 <= sc < bc <= sc + 4) or sp == sc:
+            continue
+        credit = (quote.loc[('put', sp), 'bid'] - quote.loc[('put', bp), 'ask'] +
+                  quote.loc[('call', sc), 'bid'] - quote.loc[('call', bc), 'ask'])
+        loss = max(sp - bp, bc - sc) - credit
+        if credit >= 0.5 and loss > 0:
+            top = max(top, credit / loss)
+    assert found['risk_reward'].iloc[0] == pytest.approx(top)
+
+    butterflies = search_structures(chain, 100, 0.3, structure='iron_butterfly', max_width=5)
+    assert (butterflies['sell_put'] == butterflies['sell_call']).all()
+    assert np.all(butterflies['buy_put'] < butterflies['sell_put'])
+    assert np.all((butterflies['probability_of_profit'] > 0) &
+                  (butterflies['probability_of_profit'] < 1))
+
+
+def test_pricing_context_dedupes_legs_across_strategies(pricing):
+    from core.strategies.iron_condor import IronCondor
+    from core.strategies.iron_butterfly import IronButterfly
+    dispatcher = PricingDispatcher(pricing)
+    config = {'enabled': True, 'width_percent': 0.04, 'min_credit': 0.0, 'max_dte': 30}
+    condor, butterfly = IronCondor(config), IronButterfly(config)
+    condor.pricing = butterfly.pricing = dispatcher
+
+    context = PricingContext(dispatcher)
+    plans = [(strategy, strategy.plan(context, symbol, 100.0, 0.25))
+             for symbol in ('SPY', 'QQQ') for strategy in (condor, butterfly)]
+    assert context.stats['priced'] == 0
+    context.resolve()
+    # Same width_percent and expiry, so the butterfly legs repeat the condor's
+    assert context.stats == {'requested': 16, 'priced': 4, 'batches': 1}
+
+    opportunities = [strategy.finish(plan, context) for strategy, plan in plans]
+    standalone = condor.analyze('SPY', 100.0, 0.25)
+    assert opportunities[0]['metrics']['net_credit'] == pytest.approx(standalone['metrics']['net_credit'])
+    assert opportunities[0]['legs'] == standalone['legs']
+    assert opportunities[0]['legs']['sell_put']['engine'] == 'lattice'
+    assert opportunities[1]['strategy'] == 'iron_butterfly'
+    metrics = opportunities[0]['metrics']
+    strikes = opportunities[0]['strikes']
+    assert metrics['max_loss'] == pytest.approx(
+        strikes['buy_call'] - strikes['sell_call'] - metrics['net_credit'])
+    assert metrics['max_loss'] > 0
+
+
+def test_strategy_registry_plans_fetch_and_reads_snapshot(pricing, monkeypatch):
+    import pandas as pd
+    from core.strategies.registry import MarketSnapshot, build_fetch_plan, create_strategies
+    from core.strategies import iron_condor, iron_butterfly, trend_following
+    # Run as if during a session, whatever day the suite runs on
+    monkeypatch.setattr(trend_following, 'is_trading_session', lambda day: True)
+    config = {
+        'iron_condor': {'enabled': True, 'width_percent': 0.04, 'min_credit': 0.0, 'max_dte': 45},
+        'iron_butterfly': {'enabled': True, 'width_percent': 0.04, 'min_credit': 0.0, 'max_dte': 30},
+        'trend_following': {'enabled': True, 'stop_loss_pct': 0.05, 'take_profit_pct': 0.1}
+    }
+    strategies = create_strategies(config)
+    assert set(strategies) == set(config)
+    plan = build_fetch_plan(strategies.values(), [{'kind': 'chain', 'max_dte': 30}])
+    assert plan == {'quote': True, 'iv': True, 'chain': 45, 'history': {'1d': 252},
+                    'indicators': set()}
+    with pytest.raises(ValueError):
+        build_fetch_plan([], [{'kind': 'fundamentals'}])
+
+    t = np.arange(252)
+    index = pd.date_range('2024-01-01', periods=252, name='Date')
+    history = {(symbol, '1d'): pd.DataFrame({'Close': start + slope*t + 3*np.sin(t / 2)}, index=index)
+               for symbol, start, slope in (('SPY', 100, 0.2), ('QQQ', 150, -0.2))}
+    quotes = {symbol: frame['Close'].iloc[-1] * 1.001 for (symbol, _), frame in history.items()}
+    snapshot = MarketSnapshot(['SPY', 'QQQ'], quotes,
+                              {'SPY': 0.25, 'QQQ': 0.25}, {}, history, {})
+    with pytest.raises(TypeError):
+        snapshot.quotes['SPY'] = 0.0
+
+    dispatcher = PricingDispatcher(pricing)
+    for strategy in (strategies['iron_condor'], strategies['iron_butterfly']):
+        strategy.pricing = dispatcher
+    context = PricingContext(dispatcher)
+    prepared = {name: strategy.prepare(snapshot, context) for name, strategy in strategies.items()}
+    assert len(prepared['iron_condor']) == len(prepared['iron_butterfly']) == 2
+    context.resolve()
+    opportunities = {name: strategies[name].complete(items, context)
+                     for name, items in prepared.items()}
+    assert [o['symbol'] for o in opportunities['iron_condor']] == ['SPY', 'QQQ']
+    assert not strategies['iron_condor'].errors
+
+    # The trend signals read today's quote as the forming bar of the history panel
+    assert {o['symbol']: o['direction'] for o in opportunities['trend_following']} == \
+        {'SPY': 'long', 'QQQ': 'short'}
+    assert all(o['entry'] == quotes[o['symbol']] for o in opportunities['trend_following'])
+
+
+def test_option_strategies_must_place_strikes():
+    from core.strategies.registry import STRATEGIES, OptionStructureStrategy, register
+    class NoStrikes(OptionStructureStrategy):
+        pass
+    with pytest.raises(TypeError):
+        NoStrikes({'enabled': True})
+    with pytest.raises(TypeError, match='_calculate_strikes'):
+        register('no_strikes')(NoStrikes)
+    assert 'no_strikes' not in STRATEGIES
+
+
+def test_probability_engine_matches_simulation():
+    S, T, r, sigma = 100.0, 0.25, 0.02, 0.3
+    ST = S * np.exp((r - sigma**2 / 2) * T + sigma * np.sqrt(T) * sobol_normals(2**18))
+    strikes = np.array([[90, 95, 105, 110], [95, 100, 100, 105], [100, 100, 100, 100]], dtype=float)
+    quantities = np.array([[1, -1, -1, 1], [1, -1, -1, 1], [1, -1, 0, 0]])
+    types = np.array([['put', 'put', 'call', 'call']] * 2 + [['call', 'put', 'call', 'call']])
+    premium = np.array([1.5, 3.0, 0.5])
+    payoff = lambda x: np.stack([
+        sum(q * np.maximum(x - k if t == 'call' else k - x, 0) for k, q, t in zip(*row))
+        for row in zip(strikes, quantities, types)
+    ])
+
+    engine = ProbabilityEngine()
+    closed = engine.evaluate(S, T, r, sigma, strikes, quantities, types, premium)
+    pnl = premium[:, None] + payoff(ST)
+    assert np.allclose(closed['probability_of_profit'], (pnl > 0).mean(axis=1), atol=2e-3)
+    assert np.allclose(closed['expected_pnl'], pnl.mean(axis=1), atol=2e-2)
+
+    numeric = engine.evaluate(S, T, r, sigma, premium=premium, payoff=payoff, symbol='SPY')
+    engine.evaluate(S * 1.1, T, r, sigma, premium=premium, payoff=payoff, symbol='SPY')
+    assert engine.stats == {'hits': 1, 'misses': 1}
+    assert np.allclose(numeric['probability_of_profit'], closed['probability_of_profit'], atol=1e-3)
+    assert np.allclose(numeric['expected_pnl'], closed['expected_pnl'], atol=1e-3)
+
+    # Touching is at least as likely as finishing beyond, and certain at spot
+    touch = touch_probability(S, np.array([80.0, 100.0, 120.0]), T, r, sigma)
+    assert touch[1] == pytest.approx(1.0)
+    assert touch[0] > (ST <= 80).mean() and touch[2] > (ST >= 120).mean()
+    assert touch[2] < 2.2 * (ST >= 120).mean()
@@ -1,22 +1,16 @@
-from .momentum import score as momentum_score
-from .monte_carlo import score as montecarlo_score
-from .black_scholes import score as blackscholes_score
-from .iron_condor import score as ironcondor_score
-from .iron_butterfly import score as ironbutterfly_score
+from .registry import REGISTRY, register
+from . import momentum, monte_carlo, black_scholes, iron_condor, iron_butterfly
+from utils.data_fetcher import prefetch
 
 def load_all_strategies(enabled):
-    strategy_map = {
-        'momentum': momentum_score,
-        'monte_carlo': montecarlo_score,
-        'black_scholes': blackscholes_score,
-        'iron_condor': ironcondor_score,
-        'iron_butterfly': ironbutterfly_score
-    }
-    return [strategy_map[name] for name in enabled]
+    return [REGISTRY[name] for name in enabled]
 
 def score_stocks(strategies, stock_pool):
+    # One fetch of the union of everything the strategies declare
+    requirements = {need for s in strategies for need in s.requires}
+    data = prefetch(stock_pool, requirements)
     scores = {}
     for stock in stock_pool:
-        total = sum([s(stock) for s in strategies])
+        total = sum([s(stock, data[stock]) for s in strategies])
         scores[stock] = round(total / len(strategies), 4)
-    return scores
\ No newline at end of file
+    return scores
@@ -1,19 +1,20 @@
-from scipy.stats import norm
 from math import log, sqrt, exp
-import yfinance as yf
+from utils.fast_math import norm_cdf
+from .registry import register
 
-def score(symbol):
+@register('black_scholes', requires=('price', 'iv'))
+def score(symbol, data):
     try:
-        S = yf.Ticker(symbol).info['regularMarketPrice']
+        S = data['price']
         K = S  # assume at-the-money
         T = 30 / 365
         r = 0.01
-        sigma = 0.25  # fixed or could be inferred
+        sigma = data['iv']  # atm_implied_vol falls back to 0.25
 
         d1 = (log(S/K) + (r + 0.5 * sigma**2) * T) / (sigma * sqrt(T))
         d2 = d1 - sigma * sqrt(T)
 
-        call_price = S * norm.cdf(d1) - K * exp(-r*T) * norm.cdf(d2)
+        call_price = S * norm_cdf(d1) - K * exp(-r*T) * norm_cdf(d2)
         return round(call_price / S, 4)
     except Exception:
         return 0.5
\ No newline at end of file
@@ -1,6 +1,9 @@
-def score(symbol):
+from .registry import register
+
+@register('iron_butterfly', requires=('chain',))
+def score(symbol, data):
     try:
-        chain = r.options.find_options_by_expiration(symbol, optionType='all')
+        chain = data['chain']
         if not chain:
             return 0.0
         center = len(chain) // 2
@@ -1,8 +1,9 @@
-import robin_stocks.robinhood as r
+from .registry import register
 
-def score(symbol):
+@register('iron_condor', requires=('chain',))
+def score(symbol, data):
     try:
-        chain = r.options.find_options_by_expiration(symbol, expirationDate=None, strikePrice=None, optionType='all')
+        chain = data['chain']
         calls = [c for c in chain if c['type'] == 'call']
         puts = [p for p in chain if p['type'] == 'put']
         if len(calls) < 2 or len(puts) < 2:
@@ -1,11 +1,12 @@
-import yfinance as yf
+from .registry import register
 
-def score(symbol):
+@register('momentum', requires=('history',))
+def score(symbol, data):
     try:
-        hist = yf.download(symbol, period='30d', interval='1d')
-        if len(hist) < 15:
+        hist = data['history']
+        if hist is None or len(hist) < 15:
             return 0.5  # not enough data
-        momentum = hist['Close'][-1] / hist['Close'][0] - 1
+        momentum = hist['Close'].iloc[-1] / hist['Close'].iloc[0] - 1
         return round(momentum, 4)
     except Exception:
         return 0.5
\ No newline at end of file
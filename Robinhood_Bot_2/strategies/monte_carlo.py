@@ -1,13 +1,15 @@
 import numpy as np
-import yfinance as yf
+from math import sqrt
+from .registry import register
 
-def score(symbol, num_simulations=10000):
+@register('monte_carlo', requires=('price', 'iv'))
+def score(symbol, data, num_simulations=10000):
     try:
-        S = yf.Ticker(symbol).info['regularMarketPrice']
+        S = data['price']
         K = S
         T = 30 / 365
         r = 0.01
-        sigma = 0.25
+        sigma = data['iv']  # atm_implied_vol falls back to 0.25
 
         Z = np.random.standard_normal(num_simulations)
         ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * sqrt(T) * Z)
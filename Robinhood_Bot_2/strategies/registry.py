@@ -0,0 +1,16 @@
+REGISTRY = {}
+
+# Inputs a scorer can declare; prefetch() fetches each once per symbol
+REQUIREMENTS = ('price', 'iv', 'history', 'chain')
+
+def register(name, requires=()):
+    unknown = set(requires) - set(REQUIREMENTS)
+    if unknown:
+        raise ValueError(f"Unknown data requirements: {sorted(unknown)}")
+
+    def decorator(score):
+        score.name = name
+        score.requires = tuple(requires)
+        REGISTRY[name] = score
+        return score
+    return decorator
@@ -1 +1,54 @@
-from broker.robinhood_interface import get_price
\ No newline at end of file
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+import yfinance as yf
+import robin_stocks.robinhood as r
+from broker.robinhood_interface import get_price
+from utils.implied_vol import atm_implied_vol
+
+def prefetch(symbols, requirements, workers=8):
+    """Fetch every required input for all symbols in as few calls as possible.
+
+    Prices come from one batched quote, history from one multi-ticker
+    download and chains concurrently once per symbol, however many
+    strategies need them. Returns a read-only dict of inputs per symbol.
+    """
+    symbols = list(symbols)
+    requirements = set(requirements)
+    data = {symbol: {} for symbol in symbols}
+
+    if requirements & {'price', 'iv'}:
+        try:
+            prices = r.stocks.get_latest_price(symbols)
+        except Exception:
+            prices = [None] * len(symbols)
+        for symbol, price in zip(symbols, prices):
+            data[symbol]['price'] = float(price) if price else None
+
+    if 'history' in requirements:
+        try:
+            hist = yf.download(symbols, period='30d', interval='1d', group_by='ticker', progress=False)
+        except Exception:
+            hist = None
+        for symbol in symbols:
+            try:
+                data[symbol]['history'] = hist[symbol].dropna(how='all')
+            except Exception:
+                data[symbol]['history'] = None
+
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(symbols)), 1)) as pool:
+        if 'chain' in requirements:
+            for symbol, chain in zip(symbols, pool.map(_chain, symbols)):
+                data[symbol]['chain'] = chain
+        if 'iv' in requirements:
+            ivs = pool.map(lambda s: atm_implied_vol(s, data[s]['price'], days=30)
+                           if data[s]['price'] else None, symbols)
+            for symbol, iv in zip(symbols, ivs):
+                data[symbol]['iv'] = iv
+
+    return {symbol: MappingProxyType(inputs) for symbol, inputs in data.items()}
+
+def _chain(symbol):
+    try:
+        return r.options.find_options_by_expiration(symbol, expirationDate=None, strikePrice=None, optionType='all')
+    except Exception:
+        return None
@@ -0,0 +1,17 @@
+import math
+import numpy as np
+from scipy.special import ndtr
+
+SQRT2 = math.sqrt(2.0)
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+def norm_cdf(x):
+    # math.erfc on scalars avoids scipy.stats' per-call overhead; arrays use the ndtr ufunc
+    if isinstance(x, (float, int)):
+        return 0.5 * math.erfc(-x / SQRT2)
+    return ndtr(x)
+
+def norm_pdf(x):
+    if isinstance(x, (float, int)):
+        return INV_SQRT_2PI * math.exp(-0.5 * x * x)
+    return INV_SQRT_2PI * np.exp(-0.5 * np.square(x))
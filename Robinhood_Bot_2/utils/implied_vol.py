@@ -0,0 +1,54 @@
+import sys
+import threading
+import time
+import numpy as np
+import yfinance as yf
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# The chain IV solver lives in Robinhood_Bot_1's core, shared by every bot in the repo
+ROOT = str(Path(__file__).resolve().parents[2])
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+from Robinhood_Bot_1.core.implied_vol import implied_volatility  # noqa: E402
+
+DEFAULT_SIGMA = 0.25
+SMILE_TTL = 300  # seconds a fetched call smile is reused before refetching
+
+# (symbol, days, r) -> (expires, strikes, ivs); failed fetches are not cached
+_smiles = {}
+_smiles_lock = threading.Lock()
+
+def atm_implied_vol(symbol, S, days=30, r=0.01):
+    key = (symbol, days, r)
+    now = time.monotonic()
+    with _smiles_lock:
+        cached = _smiles.get(key)
+    if cached is None or cached[0] <= now:
+        smile = _call_smile(symbol, S, days, r)
+        if smile is None:
+            return DEFAULT_SIGMA
+        cached = (now + SMILE_TTL, *smile)
+        with _smiles_lock:
+            _smiles[key] = cached
+    # The smile is reused across spot moves; only the ATM read-off follows S
+    return float(np.interp(S, cached[1], cached[2]))
+
+def _call_smile(symbol, S, days, r):
+    try:
+        ticker = yf.Ticker(symbol)
+        target = datetime.now() + timedelta(days=days)
+        expiration = min(ticker.options, key=lambda d: abs(datetime.strptime(d, '%Y-%m-%d') - target))
+        T = max((datetime.strptime(expiration, '%Y-%m-%d') - datetime.now()).days, 1) / 365
+
+        calls = ticker.option_chain(expiration).calls
+        quoted = (calls['bid'] > 0) & (calls['ask'] > 0)
+        mid = np.where(quoted, (calls['bid'] + calls['ask']) / 2, calls['lastPrice'])
+        strikes = calls['strike'].to_numpy()
+        solved = implied_volatility(mid, S, strikes, T, r)
+        converged = solved['converged']
+        if not converged.any():
+            return None
+        return strikes[converged], solved['iv'][converged]
+    except Exception:
+        return None
@@ -4,7 +4,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import datetime
+from functools import lru_cache
+from scipy.special import ndtri
 from scipy.stats import qmc, norm
+from Robinhood_Bot_1.core.implied_vol import implied_volatility
 
 def get_best_expiration(ticker, min_days=7, max_days=60):
     """
@@ -99,47 +102,92 @@ def generate_signals(options_data, option_type):
         options_data['Signal'] = False
     return options_data
 
-def quasi_monte_carlo_call_price(S, K, T, r, sigma, num_simulations=2**14):
+@lru_cache(maxsize=8)
+def sobol_normals(m, seed=0):
     """
-    Estimate European Call option price using Quasi-Monte Carlo simulation with a Sobol sequence.
+    Generate 2**m scrambled Sobol standard-normal deviates once per (m, seed) and
+    reuse them across calls, skipping Sobol generation and norm.ppf on repeat calls.
+
+    Param:
+        m (int): log2 of the number of points.
+        seed (int): Scramble seed.
+
+    Returns:
+        ndarray: Read-only 1-D array of standard-normal deviates.
+    """
+    samples = qmc.Sobol(d=1, scramble=True, seed=seed).random_base2(m=m)
+    Z = norm.ppf(samples).flatten()
+    Z.setflags(write=False)
+    return Z
+
+def quasi_monte_carlo_chain_price(S, strikes, T, r, sigma, num_simulations=2**14, var_percentile=5, rescramble=False):
+    """
+    Estimate European call and put prices for a whole vector of strikes from one
+    Quasi-Monte Carlo draw with a Sobol sequence.
+
+    Terminal prices are simulated and sorted once per (S, T, r, sigma). Mean payoffs
+    for every strike come from running sums over the sorted prices, and since both
+    payoffs are monotone in ST, their VaR percentiles are read directly from the
+    sorted prices. Memory stays O(num_simulations + len(strikes)).
 
     Param:
         S (float): Current price of the underlying asset.
-        K (float): Strike price.
+        strikes (array-like): Strike prices.
         T (float): Time to expiration (in years).
         r (float): Annual risk-free interest rate.
         sigma (float): Volatility of the underlying asset.
         num_simulations (int): Number of simulation paths (Power of 2 for Sobol).
+        var_percentile (float): Percentile of the discounted payoff used as VaR.
+        rescramble (bool): Draw a freshly scrambled sequence instead of the cached one.
 
     Returns:
-        tuple: (Estimated call option price, 95% Value-at-Risk for the discounted payoff)
+        tuple: (call prices, call VaRs, put prices, put VaRs) as numpy arrays
     """
-    #Create Sobol sequence
-    sampler = qmc.Sobol(d=1, scramble=True)
-    #Generate samples in [0,1)
-    samples = sampler.random_base2(m=int(np.log2(num_simulations)))
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=float))
 
-    Z = norm.ppf(samples)
-    Z = Z.flatten() #Flatten into 1-D array
+    #Standard normals from the cached Sobol deviates (fresh scramble on request)
+    m = int(np.log2(num_simulations))
+    if rescramble:
+        Z = norm.ppf(qmc.Sobol(d=1, scramble=True).random_base2(m=m)).flatten()
+    else:
+        Z = sobol_normals(m)
 
-    #Simulate terminal asset price using risk-neutral dynamics
-    ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z)
+    #Simulate terminal asset price once and sort it
+    ST = np.sort(S * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z))
+    n = ST.size
+    discount = np.exp(-r * T)
 
-    #Compute payoffs for call option
-    payoffs = np.maximum(ST - K, 0)
+    #Sum of terminal prices above each strike
+    suffix_sum = np.zeros(n + 1)
+    suffix_sum[:-1] = np.cumsum(ST[::-1])[::-1]
+    idx = np.searchsorted(ST, strikes, side='right')
 
-    #Discount average payoff to obtain price
-    call_price = np.exp(-r * T) * np.mean(payoffs)
+    call_prices = discount * (suffix_sum[idx] - strikes * (n - idx)) / n
+    #Put-call parity holds path by path: max(K-ST,0) = max(ST-K,0) - ST + K
+    put_prices = call_prices - discount * (suffix_sum[0] / n - strikes)
 
-    #Calculate risk measure: 95% Value-at-Risk (VaR) of discounted payoff
-    discounted_payoffs = np.exp(-r * T) * payoffs
-    call_var = np.percentile(discounted_payoffs, 5)
+    #VaR: percentile of a monotone payoff is the payoff at the matching ST order statistic
+    h = (n - 1) * var_percentile / 100
+    lo = int(np.floor(h))
+    hi = min(lo + 1, n - 1)
+    w = h - lo
+    call_vars = discount * ((1 - w) * np.maximum(ST[lo] - strikes, 0) + w * np.maximum(ST[hi] - strikes, 0))
+    put_vars = discount * ((1 - w) * np.maximum(strikes - ST[n - 1 - lo], 0) + w * np.maximum(strikes - ST[n - 1 - hi], 0))
 
-    return call_price, call_var
+    return call_prices, call_vars, put_prices, put_vars
 
-def quasi_monte_carlo_put_price(S, K, T, r, sigma, num_simulations=2**14):
+#Above this many paths the single-contract pricers switch to the constant-memory streaming mode
+STREAMING_THRESHOLD = 2**18
+
+def streaming_quasi_monte_carlo_price(S, K, T, r, sigma, option_type='call', num_simulations=2**20,
+                                      chunk_size=2**16, var_percentile=5, bins=2**14):
     """
-    Estimate European Put option price using Quasi-Monte Carlo simulation with a Sobol sequence.
+    Estimate a European option price, VaR and CVaR with Quasi-Monte Carlo in constant memory.
+
+    Paths are simulated chunk_size at a time into one reused buffer. A first pass merges the
+    running mean/variance and payoff range chunk by chunk; a second pass replays the same
+    Sobol chunks into a fixed histogram of counts and payoff sums, from which the VaR
+    percentile and the mean payoff below it (CVaR) are read to within one bin width.
 
     Param:
         S (float): Current price of the underlying asset.
@@ -147,35 +195,111 @@ def quasi_monte_carlo_put_price(S, K, T, r, sigma, num_simulations=2**14):
         T (float): Time to expiration (in years).
         r (float): Annual risk-free interest rate.
         sigma (float): Volatility of the underlying asset.
-        num_simulations (int): Number of simulation paths (Power of 2 for Sobol).
+        option_type (str): 'call' or 'put'.
+        num_simulations (int): Number of simulation paths (rounded up to a power of 2).
+        chunk_size (int): Paths held in memory at once (Power of 2).
+        var_percentile (float): Percentile of the discounted payoff used as VaR.
+        bins (int): Histogram resolution for the VaR/CVaR pass.
 
     Returns:
-        tuple: (Estimated put option price, 95% Value-at-Risk for the discounted payoff)
+        tuple: (Estimated price, VaR, CVaR) for the discounted payoff
     """
-    #Create Sobol sequence
-    sampler = qmc.Sobol(d=1, scramble=True)
-    #Generate samples in [0,1)
-    samples = sampler.random_base2(m=int(np.log2(num_simulations)))
+    sign = 1.0 if option_type == 'call' else -1.0
+    discount = np.exp(-r * T)
+    m = int(np.ceil(np.log2(max(num_simulations, chunk_size))))
+    chunks = 2**m // chunk_size
+
+    def payoff_chunks():
+        #Same scramble seed on every pass, so both passes see identical paths
+        sampler = qmc.Sobol(d=1, scramble=True, seed=0)
+        buffer = np.empty(chunk_size)
+        for _ in range(chunks):
+            buffer[:] = sampler.random(chunk_size)[:, 0]
+            ndtri(buffer, out=buffer)
+            buffer *= sigma * np.sqrt(T)
+            buffer += (r - 0.5 * sigma**2) * T
+            np.exp(buffer, out=buffer)
+            buffer *= S
+            buffer -= K
+            buffer *= sign
+            np.maximum(buffer, 0, out=buffer)
+            buffer *= discount
+            yield buffer
+
+    #Pass 1: running mean and payoff range
+    n, mean = 0, 0.0
+    lo, hi = np.inf, -np.inf
+    for payoff in payoff_chunks():
+        n += payoff.size
+        mean += (payoff.mean() - mean) * payoff.size / n
+        lo, hi = min(lo, payoff.min()), max(hi, payoff.max())
+    if hi == lo:
+        return mean, lo, lo
+
+    #Pass 2: histogram of counts and payoff sums over [lo, hi]
+    width = (hi - lo) / bins
+    counts = np.zeros(bins)
+    sums = np.zeros(bins)
+    at_lo = 0
+    for payoff in payoff_chunks():
+        at_lo += np.count_nonzero(payoff == lo)
+        index = np.minimum(((payoff - lo) / width).astype(np.int64), bins - 1)
+        counts += np.bincount(index, minlength=bins)
+        sums += np.bincount(index, weights=payoff, minlength=bins)
+
+    #Expiring worthless is an atom at lo, so count it exactly
+    rank = n * var_percentile / 100
+    if rank <= at_lo:
+        return mean, lo, lo
+    cumulative = np.cumsum(counts)
+    j = int(np.searchsorted(cumulative, rank))
+    before = cumulative[j - 1] if j > 0 else 0.0
+    fraction = (rank - before) / counts[j]
+    var = lo + width * (j + fraction)
+    cvar = (sums[:j].sum() + fraction * sums[j]) / rank
+    return mean, var, cvar
 
-    Z = norm.ppf(samples)
-    Z = Z.flatten() #Flattern into 1-D array
-
-    #Simulate terminal asset price using risk-neutral dynamics
-    ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z)
+def quasi_monte_carlo_call_price(S, K, T, r, sigma, num_simulations=2**14):
+    """
+    Estimate European Call option price using Quasi-Monte Carlo simulation with a Sobol sequence.
 
-    #Compute payoffs for put option
-    payoffs = np.maximum(K - ST, 0)
+    Param:
+        S (float): Current price of the underlying asset.
+        K (float): Strike price.
+        T (float): Time to expiration (in years).
+        r (float): Annual risk-free interest rate.
+        sigma (float): Volatility of the underlying asset.
+        num_simulations (int): Number of simulation paths (Power of 2 for Sobol).
 
-    #Discount average payoff to obtain price
-    discounted_payoffs = np.exp(-r * T) * payoffs
+    Returns:
+        tuple: (Estimated call option price, 95% Value-at-Risk for the discounted payoff)
+    """
+    if num_simulations > STREAMING_THRESHOLD:
+        price, var, _ = streaming_quasi_monte_carlo_price(S, K, T, r, sigma, 'call', num_simulations)
+        return price, var
+    call_prices, call_vars, _, _ = quasi_monte_carlo_chain_price(S, K, T, r, sigma, num_simulations)
+    return call_prices[0], call_vars[0]
 
-    #Estimate the put option price as the average of discounted payoffs
-    put_price = np.mean(discounted_payoffs)
+def quasi_monte_carlo_put_price(S, K, T, r, sigma, num_simulations=2**14):
+    """
+    Estimate European Put option price using Quasi-Monte Carlo simulation with a Sobol sequence.
 
-    #Calculate risk measure: 95% Value-at-Risk (VaR) of discounted payoff
-    put_var = np.percentile(discounted_payoffs, 5)          #5 would be for 95% VaR
+    Param:
+        S (float): Current price of the underlying asset.
+        K (float): Strike price.
+        T (float): Time to expiration (in years).
+        r (float): Annual risk-free interest rate.
+        sigma (float): Volatility of the underlying asset.
+        num_simulations (int): Number of simulation paths (Power of 2 for Sobol).
 
-    return put_price, put_var
+    Returns:
+        tuple: (Estimated put option price, 95% Value-at-Risk for the discounted payoff)
+    """
+    if num_simulations > STREAMING_THRESHOLD:
+        price, var, _ = streaming_quasi_monte_carlo_price(S, K, T, r, sigma, 'put', num_simulations)
+        return price, var
+    _, _, put_prices, put_vars = quasi_monte_carlo_chain_price(S, K, T, r, sigma, num_simulations)
+    return put_prices[0], put_vars[0]
 
 def monte_carlo_call_price(S, K, T, r, sigma, num_simulations=10000):
     """
@@ -225,6 +349,109 @@ def monte_carlo_put_price(S, K, T, r, sigma, num_simulations=10000):
     put_price = np.exp(-r * T) * np.mean(payoffs)
     return put_price
 
+def adaptive_monte_carlo_price(S, K, T, r, sigma, option_type='call', tolerance=0.01, time_budget=1.0,
+                               initial_samples=4096, max_samples=2**22):
+    """
+    Estimate a European option price with antithetic Monte Carlo and a control variate,
+    doubling the sample until the standard error is within tolerance.
+
+    The discounted terminal price, whose risk-neutral mean is S, is the control variate.
+    Sampling stops at the tolerance, the time budget or max_samples antithetic pairs,
+    whichever comes first; the last batch is clipped so max_samples is never exceeded.
+
+    Param:
+        S (float): Current price of the underlying asset.
+        K (float): Strike price.
+        T (float): Time to expiration (in years).
+        r (float): Annual risk-free interest rate.
+        sigma (float): Volatility of the underlying asset.
+        option_type (str): 'call' or 'put'.
+        tolerance (float): Target standard error of the price estimate.
+        time_budget (float): Maximum seconds to spend.
+        initial_samples (int): Antithetic pairs in the first batch.
+        max_samples (int): Upper bound on antithetic pairs.
+
+    Returns:
+        tuple: (Estimated price, standard error, number of simulated paths)
+    """
+    start = time.perf_counter()
+    sign = 1.0 if option_type == 'call' else -1.0
+    discount = np.exp(-r * T)
+    drift = (r - 0.5 * sigma**2) * T
+    #Running sums of payoff Y, control X, Y^2, X^2 and XY
+    sums = np.zeros(5)
+    n = 0
+    batch = initial_samples
+
+    while True:
+        batch = min(batch, max_samples - n)
+        Z = np.random.standard_normal(batch)
+        ST_up = S * np.exp(drift + sigma * np.sqrt(T) * Z)
+        ST_down = S * np.exp(drift - sigma * np.sqrt(T) * Z)
+        Y = discount * 0.5 * (np.maximum(sign * (ST_up - K), 0) + np.maximum(sign * (ST_down - K), 0))
+        X = discount * 0.5 * (ST_up + ST_down)
+        sums += (Y.sum(), X.sum(), (Y * Y).sum(), (X * X).sum(), (X * Y).sum())
+        n += batch
+
+        mean_y, mean_x, mean_yy, mean_xx, mean_xy = sums / n
+        cov = mean_xy - mean_x * mean_y
+        var_x = mean_xx - mean_x**2
+        beta = cov / var_x if var_x > 0 else 0.0
+        price = mean_y - beta * (mean_x - S)
+        std_error = np.sqrt(max(mean_yy - mean_y**2 - beta * cov, 0) / n)
+
+        if std_error <= tolerance or n >= max_samples or time.perf_counter() - start >= time_budget:
+            return price, std_error, 2 * n
+        batch = n
+
+def add_implied_vols(options_data, S, T, r, option_type):
+    """
+    Add an implied volatility column for every contract in the chain.
+
+    Uses the bid/ask mid when both sides are quoted and falls back to lastPrice.
+
+    Param:
+        options_data (DataFrame): Options chain data.
+        S (float): Current price of the underlying asset.
+        T (float): Time to expiration (in years).
+        r (float): Annual risk-free interest rate.
+        option_type (str): 'call' or 'put'.
+
+    Returns:
+        DataFrame: Options data with an 'IV' column (NaN where the solver did not converge).
+    """
+    quoted = (options_data['bid'] > 0) & (options_data['ask'] > 0)
+    market = np.where(quoted, (options_data['bid'] + options_data['ask']) / 2, options_data['lastPrice'])
+    solved = implied_volatility(market, S, options_data['strike'].to_numpy(), T, r, option_type)
+    options_data['IV'] = np.where(solved['converged'], solved['iv'], np.nan)
+    return options_data
+
+def atm_volatility(calls, puts, S, fallback=0.25):
+    """
+    At-the-money implied volatility read off the chain's smile.
+
+    Uses out-of-the-money contracts only (puts below S, calls at or above it),
+    whose quotes carry the most time value, and interpolates their IVs at S.
+    Pricing a contract at this volatility instead of its own IV keeps its
+    market quote out of the model price it is compared against.
+
+    Param:
+        calls (DataFrame): Call chain with an 'IV' column.
+        puts (DataFrame): Put chain with an 'IV' column.
+        S (float): Current price of the underlying asset.
+        fallback (float): Volatility to use when no contract has a usable IV.
+
+    Returns:
+        float: ATM implied volatility.
+    """
+    wings = [chain.loc[otm, ['strike', 'IV']]
+             for chain, otm in ((calls, calls['strike'] >= S), (puts, puts['strike'] < S))
+             if 'IV' in chain]
+    smile = pd.concat(wings).dropna().sort_values('strike') if wings else None
+    if smile is None or smile.empty:
+        return fallback
+    return float(np.interp(S, smile['strike'], smile['IV']))
+
 def evaluate_trade(option_type, market_price, mc_price, var, threshold=0.05, var_threshold=None):
     """
     Compare the market price to Monte Carlo estimate and provide advice.
@@ -342,21 +569,30 @@ def main():
                 T_days = (expiration_date - datetime.datetime.now()).days
                 T = T_days / 365 if T_days > 0 else 0.01 #Avoid 0 or negative T
 
-                #Set risk-free rate and volatility assumptions
+                #Set risk-free rate and fallback volatility for a chain without a usable IV
                 r = 0.01        #Example: r = 0.01, 1% risk-free rate
                 sigma = 0.25    #Example: sigma = 0.25, 25% volatility
 
+                #Implied volatility for the whole chain in one vectorized pass
+                if not calls.empty:
+                    calls = add_implied_vols(calls, S, T, r, 'call')
+                if not puts.empty:
+                    puts = add_implied_vols(puts, S, T, r, 'put')
+                #Contracts are priced at the ATM vol, never at the IV of their own quote
+                sigma = atm_volatility(calls, puts, S, fallback=sigma)
+
                 #Estimate call options
                 if not calls.empty and not bullish_calls.empty:
                     best_call = bullish_calls.loc[bullish_calls['volume'].idxmax()]
                     K_call = best_call['strike']
                     market_call_price = best_call['lastPrice']
+                    sigma_call = sigma
 
                     #Set acceptable risk threshold (Minimum acceptable VaR of $2.00)
                     acceptable_var_threshold = 2.00     #Adjust as needed
 
                     #Quasi-Monte Carlo
-                    qmc_call_price, var_95_call = quasi_monte_carlo_call_price(S, K_call, T, r, sigma)
+                    qmc_call_price, var_95_call = quasi_monte_carlo_call_price(S, K_call, T, r, sigma_call)
                     call_advice = evaluate_trade('call', market_call_price, qmc_call_price, var=var_95_call, threshold=0.05, var_threshold=acceptable_var_threshold)
 
                     # mc_call_price = monte_carlo_call_price(S, K_call, T, r, sigma)
@@ -370,6 +606,7 @@ def main():
                     print(best_call.to_string())
                     print(f"Underlying Price: {S:.2f}")
                     print(f"Market Call Price: {market_call_price:.2f}")
+                    print(f"ATM Implied Volatility Used: {sigma_call:.4f}")
                     print(f"Quasi-Monte Carlo Estimated Call Price: {qmc_call_price:.2f}")
                     print(f"95% VaR on Discounted Payoff: {var_95_call:.2f}")
                     # print(f"Monte Carlo Estimated Call Price: {mc_call_price:.2f}")
@@ -386,12 +623,13 @@ def main():
                     best_put = bullish_puts.loc[bullish_puts['volume'].idxmax()]
                     K_put = best_put['strike']
                     market_put_price = best_put['lastPrice']
+                    sigma_put = sigma
 
                     #Set acceptable risk threshold (Minimum acceptable VaR of $2.00)
                     acceptable_var_threshold = 2.00     #Adjust as needed
 
                     #Quasi-Monte Carlo
-                    qmc_put_price, var_95_put = quasi_monte_carlo_put_price(S, K_put, T, r, sigma)
+                    qmc_put_price, var_95_put = quasi_monte_carlo_put_price(S, K_put, T, r, sigma_put)
                     put_advice = evaluate_trade('put', market_put_price, qmc_put_price, var=var_95_put, threshold=0.05, var_threshold=acceptable_var_threshold)
 
                     # mc_put_price = monte_carlo_put_price(S, K_put, T, r, sigma)
@@ -405,6 +643,7 @@ def main():
                     print(best_put.to_string())
                     print(f"Underlying Price: {S:.2f}")
                     print(f"Market Put Price: {market_put_price:.2f}")
+                    print(f"ATM Implied Volatility Used: {sigma_put:.4f}")
                     print(f"Quasi-Monte Carlo Estimated Put Price: {qmc_put_price:.2f}")
                     print(f"95% VaR on Discounted Payoff: {var_95_put:.2f}")
                     # print(f"Monte Carlo Estimated Put Price: {mc_put_price:.2f}")